@@ -0,0 +1,74 @@
+"""Debounce latency and correctness against a simulated bouncing contact.
+
+Every trial presses one pin, then releases it with 0-6 chatter edges spread
+over 3 ms, the way a worn contact opens. Times the first release edge ->
+single_press event, checks that exactly one event fired per trial and that
+the accepted pin level settled to released. The original integration slept
+a fixed 10 ms in the interrupt callback before reading the port, so every
+event there was at least 10 ms late, bouncing or not.
+
+    python -m benchmarks.debounce [--trials 500] [--debounce 10] [--seed 1]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.simulator import rig
+
+from .pipeline import percentiles
+
+CHATTER_SPAN = 0.003
+LEGACY_SLEEP = 0.010
+
+
+def run(trials: int, debounce: int, seed: int) -> tuple[dict[int, list[float]], int, int]:
+    rng = random.Random(seed)
+    samples: dict[int, list[float]] = {}
+    extra = wrong = 0
+    with rig(1, debounce=debounce) as r:
+        chip = r.chips[0]
+        bus = mcp23017.buses[1]
+        for n in range(trials):
+            pin = n % mcp23017.PINS_PER_CHIP
+            edges = rng.randint(0, 3) * 2
+            chip.set_input(pin, 0)
+            time.sleep(0.02)
+
+            fired = len(r.hass.bus.fired)
+            released = time.perf_counter()
+            chip.set_input(pin, 1)
+            for level in (0, 1) * (edges // 2):
+                time.sleep(CHATTER_SPAN / max(edges, 1))
+                chip.set_input(pin, level)
+            if not r.hass.bus.wait_for(fired + 1):
+                raise RuntimeError("Event was not delivered")
+            samples.setdefault(edges, []).append(r.hass.bus.fired[fired][0] - released)
+
+            # Let the quiet window run out and the settle read land
+            time.sleep(debounce / 1000 + 0.01)
+            extra += len(r.hass.bus.fired) - fired - 1
+            if not bus.debouncer.state[pin >> 3] & (1 << (pin & 7)):
+                wrong += 1
+    return samples, extra, wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--debounce", type=int, default=10, help="stable time, ms")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    samples, extra, wrong = run(args.trials, args.debounce, args.seed)
+    print(f"release -> single_press, {args.trials} trials, debounce {args.debounce} ms")
+    for edges in sorted(samples):
+        print(f"  {edges} chatter edges  {percentiles(samples[edges])}")
+    print(f"  original floor    {LEGACY_SLEEP * 1000:.3f} ms (fixed sleep before every read)")
+    print(f"  extra events {extra}, wrong final level {wrong}")
+
+
+if __name__ == "__main__":
+    main()
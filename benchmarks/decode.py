@@ -0,0 +1,119 @@
+"""Per-interrupt decode cost: the original string-keyed loop vs the bus today.
+
+Feeds INTFA..GPIOB snapshots with 1, 8 or 16 changed pins straight into
+Mcp23017Bus.process_state, which debounces the ports and queues the changes
+for the event loop, and into a copy of the original decode loop, which
+walked all 8 bits of each port, built a "0x20-0x12-3" key per bit and
+formatted its debug messages whether or not debug logging was on. Nothing is
+delivered to a loop, only the worker thread's share is measured. Sensors sit
+on every pin, so each changed pin is handed to a handler.
+
+    python -m benchmarks.decode [--interrupts 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.bridge import bridge
+
+_LOGGER = logging.getLogger("decode")
+
+ADDRESS = mcp23017.MCP23017_BASE_ADDRESS
+
+
+class Sensor:
+    def __init__(self, pin: int) -> None:
+        self.bus = 1
+        self.address = ADDRESS
+        self.pin = pin
+        self.debounce = 1
+
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
+        pass
+
+
+def legacy_decode(snapshot, prev_datas, code2buttons, code2sensors) -> None:
+    """The original per-port loop, debug formatting included."""
+    for port, data in ((mcp23017.GPIOA, snapshot[2]), (mcp23017.GPIOB, snapshot[3])):
+        data_code = "{}-{}".format(ADDRESS, port)
+        prev_data = prev_datas.get(data_code, 0xFF)
+        prev_datas[data_code] = data
+        _LOGGER.debug("port {} data {}".format(hex(port), bin(data)))
+        for x in range(8):
+            value = data & (1 << x)
+            button_code = "{}-{}-{}".format(hex(ADDRESS), hex(port), x)
+            if prev_data & (1 << x) != value:
+                _LOGGER.debug("Changed pin {} to {}".format(button_code, value))
+                button = code2buttons.get(button_code)
+                sensor = code2sensors.get(button_code)
+                if button is not None:
+                    button.onChange(value)
+                elif sensor is not None:
+                    _LOGGER.debug("Send change event to binary sensor {}".format(button_code))
+                    sensor.onChange(value)
+
+
+def snapshots(changed: int) -> list[tuple[int, ...]]:
+    """Press then release the lowest changed pins, as two snapshots."""
+    mask = (1 << changed) - 1
+    pressed = ~mask & 0xFFFF
+    flags_a, flags_b = mask & 0xFF, mask >> 8
+    return [
+        (flags_a, flags_b, pressed & 0xFF, pressed >> 8, pressed & 0xFF, pressed >> 8),
+        (flags_a, flags_b, 0xFF, 0xFF, 0xFF, 0xFF),
+    ]
+
+
+def run_legacy(changed: int, interrupts: int) -> float:
+    sensors = {
+        "{}-{}-{}".format(hex(ADDRESS), hex(port), pin): Sensor(pin)
+        for port in (mcp23017.GPIOA, mcp23017.GPIOB)
+        for pin in range(8)
+    }
+    prev_datas: dict[str, int] = {}
+    states = snapshots(changed)
+    start = time.perf_counter()
+    for n in range(interrupts):
+        legacy_decode(states[n & 1], prev_datas, {}, sensors)
+    return (time.perf_counter() - start) / interrupts
+
+
+def run_current(changed: int, interrupts: int) -> float:
+    bus = mcp23017.Mcp23017Bus(1)
+    bus.logger = _LOGGER
+    for pin in range(mcp23017.PINS_PER_CHIP):
+        sensor = Sensor(pin)
+        idx = mcp23017.get_pin_index(ADDRESS, pin)
+        bus.pin_sensors[idx] = bus.pin_handlers[idx] = sensor
+        bus.debouncer.stable_times[idx] = sensor.debounce / 1000
+    states = snapshots(changed)
+    # Far enough apart that the debouncer accepts every edge
+    timestamp = 0.0
+    start = time.perf_counter()
+    for n in range(interrupts):
+        timestamp += 1.0
+        bridge.begin()
+        bus.process_state(ADDRESS, states[n & 1], timestamp, timestamp)
+        bridge.end()
+    return (time.perf_counter() - start) / interrupts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interrupts", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Queued calls are dropped at the end of every pass
+    bridge.hass = None
+    print(f"{'changed pins':14}{'original':>12}{'current':>12}")
+    for changed in (1, 8, 16):
+        legacy = run_legacy(changed, args.interrupts)
+        current = run_current(changed, args.interrupts)
+        print(f"{changed:<14}{legacy * 1e6:>9.2f} us{current * 1e6:>9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
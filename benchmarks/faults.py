@@ -0,0 +1,92 @@
+"""Press latency of a healthy chip while another chip on the bus fails.
+
+Two chips share bus 1. The second one loses power (it stops answering, each
+transaction costs the simulated bus timeout) while its INT line keeps
+producing spurious edges, and buttons on the first chip are pressed. Run once
+with the circuit breaker and once with it disabled, then power the failed
+chip back up and time how long it takes to come back online.
+
+    python -m benchmarks.faults [--presses 50] [--timeout-ms 25]
+"""
+from __future__ import annotations
+
+import argparse
+import threading as th
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.simulator import rig
+
+from .pipeline import percentiles
+
+NOISE_INTERVAL = 0.005  # seconds between spurious INT edges of the failed chip
+
+
+def run(presses: int, timeout: float, breaker: bool) -> tuple[list[float], int, float | None]:
+    threshold = mcp23017.BREAKER_THRESHOLD
+    if not breaker:
+        mcp23017.BREAKER_THRESHOLD = 1 << 30
+    samples = []
+    try:
+        with rig(2, debounce=10) as r:
+            healthy, failing = r.chips
+            bus = mcp23017.buses[1]
+            r.i2c.buses[1].absent_delay = timeout
+            failing.power(False)
+
+            stop = th.Event()
+
+            def noise() -> None:
+                level = 0
+                while not stop.wait(NOISE_INTERVAL):
+                    level ^= 1
+                    r.gpio.set_level(failing.int_pin, level)
+
+            noise_thread = th.Thread(target=noise, daemon=True)
+            noise_thread.start()
+            try:
+                for n in range(presses):
+                    pin = n % mcp23017.PINS_PER_CHIP
+                    healthy.set_input(pin, 0)
+                    time.sleep(0.02)
+                    expected = len(r.hass.bus.fired) + 1
+                    released = time.perf_counter()
+                    healthy.set_input(pin, 1)
+                    if not r.hass.bus.wait_for(expected):
+                        raise RuntimeError("Event was not delivered")
+                    samples.append(r.hass.bus.fired[expected - 1][0] - released)
+                    time.sleep(0.015)
+            finally:
+                stop.set()
+                noise_thread.join()
+
+            errors = bus.stats[1].i2c_errors
+            recovery = None
+            if breaker:
+                failing.power(True)
+                start = time.perf_counter()
+                while 0x21 not in bus.online and time.perf_counter() - start < 10:
+                    time.sleep(0.001)
+                if 0x21 in bus.online:
+                    recovery = time.perf_counter() - start
+    finally:
+        mcp23017.BREAKER_THRESHOLD = threshold
+    return samples, errors, recovery
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presses", type=int, default=50)
+    parser.add_argument("--timeout-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    print(f"healthy chip latency, other chip failing with {args.timeout_ms} ms timeouts")
+    for label, breaker in (("no breaker", False), ("breaker", True)):
+        samples, errors, recovery = run(args.presses, args.timeout_ms / 1000, breaker)
+        print(f"  {label:10} {percentiles(samples)}, {errors} failed transactions")
+        if recovery is not None:
+            print(f"  {'':10} back online {recovery:.2f} s after power returned")
+
+
+if __name__ == "__main__":
+    main()
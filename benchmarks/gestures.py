@@ -0,0 +1,95 @@
+"""Gesture recognition throughput with every button toggling at once.
+
+Puts buttons on all pins of N chips (default 8, i.e. 128 pins) and toggles
+every one of them together, press and release, for a number of cycles. Each
+port change is delivered once pin by pin through Button.onChange, like the
+per-pin handler dispatch did, and once through Mcp23017Bus.dispatch, which
+hands the whole port to the chip's GestureEngine. Timers run on a virtual
+clock, so only the recognition cost is measured.
+
+    python -m benchmarks.gestures [--chips 8] [--cycles 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from custom_components.sweet_home import gesture as gesture_module
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.bridge import bridge
+from custom_components.sweet_home.button import Button
+
+from .replay import Output, ReplayHass, VirtualClock, VirtualScheduler
+
+_LOGGER = logging.getLogger("gestures")
+
+# Cycle timing, seconds: hold, then idle long enough for multi-press timeouts
+HOLD = 0.05
+PERIOD = 0.5
+
+
+def build(chips: int, hass) -> mcp23017.Mcp23017Bus:
+    bus = mcp23017.Mcp23017Bus(1)
+    bus.logger = _LOGGER
+    for chip in range(chips):
+        address = mcp23017.MCP23017_BASE_ADDRESS + chip
+        for pin in range(mcp23017.PINS_PER_CHIP):
+            bus.pin_buttons[mcp23017.get_pin_index(address, pin)] = Button(
+                hass, f"switch_{chip}", f"button_{pin + 1}", address, pin, pin % 3 + 1
+            )
+    bus.rebuild_pin_handlers()
+    return bus
+
+
+def run(chips: int, cycles: int, per_pin: bool) -> tuple[float, int]:
+    """Return CPU seconds per pin transition and the events recognized."""
+    clock = VirtualClock(1000.0)
+    scheduler = VirtualScheduler(clock)
+    output = Output(clock, clock.now, quiet=True)
+    hass = ReplayHass(output)
+    gesture_module.time = clock
+    gesture_module.loop_scheduler = scheduler
+    bridge.setup(hass, 0)
+
+    bus = build(chips, hass)
+    stats = bus.stats[0]
+    ports = range(chips * 2)
+    buttons = bus.pin_buttons
+
+    cpu = time.process_time()
+    for cycle in range(cycles):
+        start = 1000.0 + cycle * PERIOD
+        for timestamp, data in ((start, 0x00), (start + HOLD, 0xFF)):
+            scheduler.run_until(timestamp)
+            for port in ports:
+                port_base = port * 8
+                if per_pin:
+                    for bit in range(8):
+                        buttons[port_base + bit].onChange(data & (1 << bit), timestamp)
+                else:
+                    bus.dispatch(port_base, 0xFF, data, stats, timestamp)
+    cpu = time.process_time() - cpu
+    scheduler.run_until(1000.0 + cycles * PERIOD + 5)
+    transitions = cycles * 2 * chips * mcp23017.PINS_PER_CHIP
+    return cpu / transitions, sum(output.counts.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chips", type=int, default=8)
+    parser.add_argument("--cycles", type=int, default=2000)
+    args = parser.parse_args()
+
+    pins = args.chips * mcp23017.PINS_PER_CHIP
+    print(f"{pins} buttons toggling together, {args.cycles} press/release cycles")
+    for label, per_pin in (("pin by pin", True), ("whole port", False)):
+        per_transition, events = run(args.chips, args.cycles, per_pin)
+        print(
+            f"  {label:12} {per_transition * 1e6:6.2f} us/pin transition, "
+            f"{1 / per_transition / 1e6:5.2f} M transitions/s ({events} events)"
+        )
+
+
+if __name__ == "__main__":
+    main()
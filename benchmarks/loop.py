@@ -0,0 +1,86 @@
+"""Thread count and event loop lag with the pipeline under load.
+
+Brings N simulated chips online (default 8 on one bus), lists the threads
+the integration runs, then presses and releases every pin of every chip
+together for a few seconds while a probe coroutine in the loop measures how
+late its 1 ms sleeps wake up. Gesture and sensor logic runs in that loop, so
+the lag shows what it costs other integrations.
+
+    python -m benchmarks.loop [--chips 8] [--seconds 3]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading as th
+import time
+from collections import Counter
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.simulator import rig
+
+from .pipeline import percentiles
+
+PROBE_INTERVAL = 0.001
+
+
+def thread_names(baseline: set[int]) -> Counter:
+    """Threads started since baseline, counted by name without the bus number."""
+    return Counter(
+        thread.name.rstrip("0123456789").rstrip("_")
+        for thread in th.enumerate()
+        if thread.ident not in baseline
+    )
+
+
+async def probe(stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+def run(chips: int, seconds: float) -> None:
+    baseline = {thread.ident for thread in th.enumerate()}
+    with rig(chips, debounce=1) as r:
+        # The stand-in Home Assistant loop thread is not the integration's
+        baseline.add(r.hass.thread.ident)
+        threads = thread_names(baseline)
+        print(f"{chips} chips online, {sum(threads.values())} threads started besides the loop:")
+        for name, count in sorted(threads.items()):
+            print(f"  {count} x {name}")
+
+        for label, load in (("idle", False), ("all pins toggling", True)):
+            lags: list[float] = []
+            stop = asyncio.Event()
+            task = asyncio.run_coroutine_threadsafe(probe(stop, lags), r.hass.loop)
+            fired = len(r.hass.bus.fired)
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                if load:
+                    for data in (0x00, 0xFF):
+                        for chip in r.chips:
+                            chip.set_port(0, data)
+                            chip.set_port(1, data)
+                        time.sleep(0.002)
+                else:
+                    time.sleep(0.01)
+            r.hass.loop.call_soon_threadsafe(stop.set)
+            task.result()
+            events = len(r.hass.bus.fired) - fired
+            print(f"  {label:18} loop lag {percentiles(lags)}, {events / seconds:.0f} events/s")
+        peak = thread_names(baseline)
+        print(f"  threads after load: {sum(peak.values())}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chips", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    run(args.chips, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""End-to-end interrupt pipeline benchmark on the MCP23017 simulator.
+
+Runs the real bus workers, debouncer, Button gesture logic and event bridge
+against simulated chips, and reports interrupt-to-HA-event latency
+percentiles, events per second per chip and CPU time per event.
+
+    python -m benchmarks.pipeline [--chips 1 8 16] [--presses 200] [--gpiod]
+
+--gpiod delivers the INT edges through GpiodBackend with kernel-style
+timestamped edge events instead of direct callbacks.
+
+Needs Home Assistant installed (the integration modules import it), no
+I2C or GPIO hardware.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.const import CONF_SUBTYPE, EVENT_SINGLE_PRESS
+from custom_components.sweet_home.simulator import rig
+
+
+def percentiles(values: list[float]) -> str:
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    p = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return "p50 {:.3f} / p90 {:.3f} / p99 {:.3f} / max {:.3f} ms".format(
+        p(0.5) * 1000, p(0.9) * 1000, p(0.99) * 1000, values[-1] * 1000
+    )
+
+
+def latency(
+    chip_count: int, presses: int, bounce: bool, gpiod: bool = False
+) -> tuple[list[float], float]:
+    """Press/release one pin at a time, time release edge -> event fired."""
+    samples = []
+    with rig(chip_count, debounce=10, gpiod=gpiod) as r:
+        transactions = r.i2c.transactions
+        for n in range(presses):
+            chip = r.chips[n % chip_count]
+            pin = n % mcp23017.PINS_PER_CHIP
+            chip.set_input(pin, 0)
+            if bounce:
+                for _ in range(3):
+                    time.sleep(0.0003)
+                    chip.set_input(pin, 1)
+                    time.sleep(0.0003)
+                    chip.set_input(pin, 0)
+            time.sleep(0.02)
+
+            expected = len(r.hass.bus.fired) + 1
+            released = time.perf_counter()
+            chip.set_input(pin, 1)
+            if not r.hass.bus.wait_for(expected):
+                raise RuntimeError("Event was not delivered")
+            fired, event_type, data = r.hass.bus.fired[expected - 1]
+            assert data[CONF_SUBTYPE].endswith(f"-{pin}")
+            samples.append(fired - released)
+            time.sleep(0.015)
+        per_press = (r.i2c.transactions - transactions) / presses
+    return samples, per_press
+
+
+def throughput(
+    chip_count: int, cycles: int, gpiod: bool = False
+) -> tuple[float, float, int, int]:
+    """Press and release all 16 pins of every chip at once, repeatedly."""
+    with rig(chip_count, debounce=1, gpiod=gpiod) as r:
+        expected = cycles * chip_count * mcp23017.PINS_PER_CHIP
+        cpu = time.process_time()
+        start = time.perf_counter()
+        for _ in range(cycles):
+            for chip in r.chips:
+                chip.set_port(0, 0x00)
+                chip.set_port(1, 0x00)
+            time.sleep(0.002)
+            for chip in r.chips:
+                chip.set_port(0, 0xFF)
+                chip.set_port(1, 0xFF)
+            time.sleep(0.002)
+        r.hass.bus.wait_for(expected, timeout=2.0)
+        fired = list(r.hass.bus.fired)
+        elapsed = fired[-1][0] - start
+        cpu = time.process_time() - cpu
+        singles = sum(1 for _, _, data in fired if data["type"] == EVENT_SINGLE_PRESS)
+    return singles / elapsed / chip_count, cpu / singles, singles, expected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chips", type=int, nargs="+", default=[1, 8, 16])
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--gpiod", action="store_true")
+    args = parser.parse_args()
+
+    for chip_count in args.chips:
+        print(f"== {chip_count} chip(s)")
+        clean, per_press = latency(chip_count, args.presses, False, args.gpiod)
+        print(f"  clean press latency    {percentiles(clean)}")
+        print(f"  I2C transactions/press {per_press:.2f}")
+        bouncy, _ = latency(chip_count, args.presses, True, args.gpiod)
+        print(f"  bouncing press latency {percentiles(bouncy)}")
+        rate, cpu, delivered, expected = throughput(chip_count, args.cycles, args.gpiod)
+        print(f"  events/s per chip      {rate:.0f} ({delivered} of {expected} presses seen)")
+        print(f"  CPU per event          {cpu * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
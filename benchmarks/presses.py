@@ -0,0 +1,70 @@
+"""Single-press latency of double_press buttons, waiting vs firing early.
+
+Presses buttons configured as double_press once each on the simulator and
+times release edge -> single_press event, for:
+
+- wait:       no demand known, every single press waits out the multi-press
+              threshold (NEXT_PRESS_THRESHOLD, 300 ms)
+- threshold:  the same with a per-button next_press_threshold override
+- early:      fire_early with only a single_press trigger attached, fired
+              on release
+
+    python -m benchmarks.presses [--presses 50] [--threshold 150]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from homeassistant.const import CONF_TYPE
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.const import EVENT_SINGLE_PRESS
+from custom_components.sweet_home.simulator import rig
+
+from .pipeline import percentiles
+
+
+def measure(presses: int, demand: int | None, threshold: int | None) -> list[float]:
+    samples = []
+    with rig(1, debounce=10, presses=2) as r:
+        for button in r.buttons.values():
+            if threshold is not None:
+                button.next_press = threshold
+                button.engine.attach(button)
+            button.set_demand(demand)
+        chip = r.chips[0]
+        for n in range(presses):
+            pin = n % mcp23017.PINS_PER_CHIP
+            chip.set_input(pin, 0)
+            time.sleep(0.02)
+
+            expected = len(r.hass.bus.fired) + 1
+            released = time.perf_counter()
+            chip.set_input(pin, 1)
+            if not r.hass.bus.wait_for(expected):
+                raise RuntimeError("Event was not delivered")
+            fired, _, data = r.hass.bus.fired[expected - 1]
+            assert data[CONF_TYPE] == EVENT_SINGLE_PRESS
+            samples.append(fired - released)
+            time.sleep(0.015)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presses", type=int, default=50)
+    parser.add_argument("--threshold", type=int, default=150, help="override, ms")
+    args = parser.parse_args()
+
+    print(f"single press on a double_press button, {args.presses} presses")
+    for label, demand, threshold in (
+        ("wait", None, None),
+        (f"threshold {args.threshold}ms", None, args.threshold),
+        ("early", 1, None),
+    ):
+        print(f"  {label:16} {percentiles(measure(args.presses, demand, threshold))}")
+
+
+if __name__ == "__main__":
+    main()
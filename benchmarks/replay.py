@@ -0,0 +1,259 @@
+"""Replay a transition journal through the debounce and gesture code.
+
+Feeds a dump written by the sweet_home.dump_journal service back through
+Debouncer, Mcp23017Bus.dispatch and GestureEngine on a virtual clock, and prints the
+button events and sensor changes that come out. Gesture timers run on the
+recorded timestamps, so the result is the same at any replay speed.
+
+    python -m benchmarks.replay DUMP [--speed 1] [--debounce MS] [--quiet]
+    python -m benchmarks.replay DUMP --record   # write a sample dump first
+
+--speed 1 paces the replay like the original, N replays N times faster and
+0 runs flat out and reports the processing cost per transition.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter
+
+from custom_components.sweet_home import chord as chord_module
+from custom_components.sweet_home import gesture as gesture_module
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.bridge import bridge
+from custom_components.sweet_home.button import Button
+from custom_components.sweet_home.chord import Chord
+from custom_components.sweet_home.const import CONF_SUBTYPE
+from custom_components.sweet_home.gesture import NEXT_PRESS_THRESHOLD
+from custom_components.sweet_home.journal import journal, load
+from custom_components.sweet_home.scheduler import Deadline
+
+_LOGGER = logging.getLogger("replay")
+
+
+class VirtualClock:
+    """Stands in for the time module inside gesture.py and chord.py."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class VirtualScheduler:
+    """DeadlineScheduler on the virtual clock, timers fire from run_until()."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        self.clock = clock
+        self._heap: list[tuple[float, int, Deadline]] = []
+        self._counter = itertools.count()
+
+    def call_later(self, delay: float, callback) -> Deadline:
+        deadline = Deadline(self.clock.now + delay, callback)
+        heapq.heappush(self._heap, (deadline.when, next(self._counter), deadline))
+        return deadline
+
+    def run_until(self, when: float) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= when:
+            _, _, deadline = heapq.heappop(heap)
+            if deadline.callback is not None:
+                self.clock.now = max(self.clock.now, deadline.when)
+                deadline.callback()
+        self.clock.now = max(self.clock.now, when)
+
+
+class Output:
+    """Collects what the replay delivers to Home Assistant."""
+
+    def __init__(self, clock: VirtualClock, start: float, quiet: bool) -> None:
+        self.clock = clock
+        self.start = start
+        self.quiet = quiet
+        self.counts: Counter = Counter()
+
+    def emit(self, text: str, kind: str) -> None:
+        self.counts[kind] += 1
+        if not self.quiet:
+            print(f"  {self.clock.now - self.start:+10.3f}s  {text}")
+
+
+class ReplayLoop:
+    @staticmethod
+    def call_soon_threadsafe(callback, *args) -> None:
+        callback(*args)
+
+
+class ReplayBus:
+    def __init__(self, output: Output) -> None:
+        self.output = output
+
+    def async_fire(self, event_type: str, data: dict) -> None:
+        self.output.emit(
+            f"{data['device_id']} {data[CONF_SUBTYPE]} {data['type']}", data["type"]
+        )
+
+
+class ReplayHass:
+    def __init__(self, output: Output) -> None:
+        self.loop = ReplayLoop()
+        self.bus = ReplayBus(output)
+
+
+class ReplaySensor:
+    """Binary sensor stand-in printing its state changes."""
+
+    def __init__(self, output: Output, bus: int, address: int, pin: int, debounce: int) -> None:
+        self.output = output
+        self.bus = bus
+        self.address = address
+        self.pin = pin
+        self.debounce = debounce
+
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
+        state = "on" if value else "off"
+        self.output.emit(f"sensor {self.bus}-{hex(self.address)}-{self.pin} {state}", "sensor")
+
+
+def replay(path: str, speed: float, debounce: int | None, quiet: bool) -> None:
+    info, records = load(path)
+    print(f"{path}: {len(records)} of {info['total']} recorded transitions")
+    if not records:
+        return
+    start = records[0][0]
+    clock = VirtualClock(start)
+    scheduler = VirtualScheduler(clock)
+    output = Output(clock, start, quiet)
+    hass = ReplayHass(output)
+
+    # Gesture timers and durations run on the recorded time line
+    gesture_module.time = clock
+    gesture_module.loop_scheduler = scheduler
+    chord_module.time = clock
+    chord_module.loop_scheduler = scheduler
+    bridge.setup(hass, 0)
+
+    buses: dict[int, mcp23017.Mcp23017Bus] = {}
+
+    def get_bus(number: int) -> mcp23017.Mcp23017Bus:
+        if number not in buses:
+            buses[number] = mcp23017.Mcp23017Bus(number)
+            buses[number].logger = _LOGGER
+        return buses[number]
+
+    by_subtype = {}
+    for b in info["buttons"]:
+        bus = get_bus(b["bus"])
+        idx = mcp23017.get_pin_index(b["address"], b["pin"])
+        button = Button(
+            hass,
+            b["device_id"],
+            b["subtype"],
+            b["address"],
+            b["pin"],
+            b["presses"],
+            b["bus"],
+            b["debounce"],
+            b.get("next_press", NEXT_PRESS_THRESHOLD),
+        )
+        # Fire early exactly where the recording Home Assistant did
+        button.demand = b.get("demand")
+        bus.pin_buttons[idx] = by_subtype[b["device_id"], b["subtype"]] = button
+        bus.debouncer.stable_times[idx] = (debounce if debounce is not None else b["debounce"]) / 1000
+    for s in info["sensors"]:
+        bus = get_bus(s["bus"])
+        idx = mcp23017.get_pin_index(s["address"], s["pin"])
+        bus.pin_sensors[idx] = ReplaySensor(output, s["bus"], s["address"], s["pin"], s["debounce"])
+        bus.debouncer.stable_times[idx] = (debounce if debounce is not None else s["debounce"]) / 1000
+    for c in info.get("chords", []):
+        chord = Chord(
+            c["device_id"], [by_subtype[c["device_id"], m] for m in c["members"]], c["window"]
+        )
+        get_bus(chord.bus).chords.setdefault(chord.address, []).append(chord)
+    for bus in buses.values():
+        bus.rebuild_pin_handlers()
+
+    wall_start = time.perf_counter()
+    cpu = time.process_time()
+    for timestamp, number, address, port, flags, value, source in records:
+        scheduler.run_until(timestamp)
+        if speed:
+            delay = wall_start + (timestamp - start) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        bus = get_bus(number)
+        port_base = mcp23017.get_pin_index(address, port * 8)
+        accepted = bus.debouncer.update(port_base >> 3, value, timestamp, flags)
+        bus.dispatch(
+            port_base,
+            accepted,
+            value,
+            bus.stats[address - mcp23017.MCP23017_BASE_ADDRESS],
+            timestamp,
+        )
+        if bus.chords:
+            bus.update_chords(address, timestamp)
+    cpu = time.process_time() - cpu
+    # Let pending multi-press and long-press timers run out
+    scheduler.run_until(records[-1][0] + 5)
+
+    print(f"Replayed {records[-1][0] - start:.3f}s of input in {time.perf_counter() - wall_start:.3f}s")
+    print("  " + ", ".join(f"{kind}: {n}" for kind, n in sorted(output.counts.items())))
+    if not speed:
+        print(f"  {cpu / len(records) * 1e6:.1f} us CPU per transition")
+
+
+def record_sample(path: str) -> None:
+    """Press a few gestures on the simulator with the journal on and dump it."""
+    from custom_components.sweet_home.simulator import rig
+
+    journal.resize(4096)
+    with rig(1, debounce=10, presses=2) as r:
+        chip = r.chips[0]
+
+        def press(pin: int, hold: float, bounce: bool = False) -> None:
+            chip.set_input(pin, 0)
+            if bounce:
+                for _ in range(3):
+                    time.sleep(0.001)
+                    chip.set_input(pin, 1)
+                    time.sleep(0.001)
+                    chip.set_input(pin, 0)
+            time.sleep(hold)
+            chip.set_input(pin, 1)
+
+        press(0, 0.08)  # single
+        time.sleep(0.5)
+        press(1, 0.08)  # double
+        time.sleep(0.15)
+        press(1, 0.08)
+        time.sleep(0.5)
+        press(2, 0.08, bounce=True)  # bouncing single
+        time.sleep(0.5)
+        press(3, 1.2)  # long
+        time.sleep(0.5)
+        count = journal.dump(path, {"created": time.time(), **mcp23017.get_pin_map()})
+    journal.resize(0)
+    print(f"Recorded {count} transitions to {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dump")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--debounce", type=int, help="override every pin's debounce, ms")
+    parser.add_argument("--quiet", action="store_true")
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    if args.record:
+        record_sample(args.dump)
+    replay(args.dump, args.speed, args.debounce, args.quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Satellite node to integration latency and frame rate, on one machine.
+
+Starts a satellite node in a child process with N simulated chips (default
+1) and connects a SatelliteClient to it in this process, once over TCP on
+localhost and once over a Unix socket. Pins 0-7 of every chip are buttons,
+pins 8-15 binary sensors. The child drives the simulated pins on command and
+reports when it did, time.perf_counter() is CLOCK_MONOTONIC on Linux and
+comparable across the two processes. Reports release-to-event and
+edge-to-sensor latency, then frames/s and frames per read with every pin of
+every chip toggling.
+
+    python -m benchmarks.satellite [--chips 1] [--presses 200] [--cycles 50]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from custom_components.sweet_home.const import EVENT_SINGLE_PRESS
+from custom_components.sweet_home.simulator import BUTTON_PINS, SENSOR_PINS, SatelliteLink
+
+from .pipeline import percentiles
+
+TOKEN = "benchmark"
+
+
+def latency(link: SatelliteLink, chip_count: int, presses: int) -> tuple[list[float], list[float]]:
+    fired = link.hass.bus.fired
+    buttons, sensors = [], []
+    for n in range(presses):
+        chip = n % chip_count
+        pin = BUTTON_PINS[n % len(BUTTON_PINS)]
+        link.command(f"set {chip} {pin} 0")
+        time.sleep(0.02)
+        expected = len(fired) + 1
+        released = link.command(f"set {chip} {pin} 1")
+        if not link.hass.bus.wait_for(expected):
+            raise RuntimeError("Event was not delivered")
+        buttons.append(fired[expected - 1][0] - released)
+
+        sensor = link.sensors[chip * len(SENSOR_PINS) + n % len(SENSOR_PINS)]
+        for level in (0, 1):
+            seen = len(sensor.changes)
+            changed = link.command(f"set {chip} {sensor.pin} {level}")
+            deadline = time.perf_counter() + 10
+            while len(sensor.changes) == seen:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("Sensor update was not delivered")
+                time.sleep(0.0001)
+            sensors.append(sensor.changes[seen][0] - changed)
+        time.sleep(0.015)
+    return buttons, sensors
+
+
+def throughput(link: SatelliteLink, chip_count: int, cycles: int) -> tuple[float, float, int, int]:
+    """Toggle every pin of every chip, frames/s and frames per read received."""
+    fired = link.hass.bus.fired
+    client = link.client
+    events, frames, reads = len(fired), client.frames, client.reads
+    changes = sum(len(sensor.changes) for sensor in link.sensors)
+    expected = cycles * chip_count * len(BUTTON_PINS)
+    start = link.command(f"burst {cycles}")
+    link.hass.bus.wait_for(events + expected, timeout=5.0)
+    time.sleep(0.05)  # trailing sensor edges
+    last = max(
+        [fired[-1][0]]
+        + [sensor.changes[-1][0] for sensor in link.sensors if len(sensor.changes) > 0]
+    )
+    frames = client.frames - frames
+    reads = client.reads - reads
+    singles = sum(1 for _, _, data in fired[events:] if data["type"] == EVENT_SINGLE_PRESS)
+    edges = sum(len(sensor.changes) for sensor in link.sensors) - changes
+    return frames / (last - start), frames / max(reads, 1), singles, edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chips", type=int, default=1)
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--port", type=int, default=17017)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, endpoint in (
+            ("TCP localhost", f"tcp:{args.port}"),
+            ("Unix socket", f"unix:{os.path.join(tmp, 'node.sock')}"),
+        ):
+            print(f"== {label}, {args.chips} chip(s)")
+            link = SatelliteLink(endpoint, args.chips, TOKEN)
+            try:
+                buttons, sensors = latency(link, args.chips, args.presses)
+                print(f"  release -> event     {percentiles(buttons)}")
+                print(f"  edge -> sensor       {percentiles(sensors)}")
+                rate, per_read, singles, edges = throughput(link, args.chips, args.cycles)
+                expected = args.cycles * args.chips * len(BUTTON_PINS)
+                print(f"  frames/s             {rate:.0f} ({per_read:.1f} frames per read)")
+                print(f"  under load           {singles} of {expected} presses, {edges} of {2 * expected} sensor edges")
+            finally:
+                link.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Gesture deadline accuracy as the number of waiting buttons grows.
+
+Runs the full pipeline on simulated chips with N double-press buttons
+(N = 1 ... 256, 16 per chip). All N are pressed and released together, so
+N next-press deadlines are pending at once. Each then fires single_press
+when its wait runs out. Reports how late the events arrive past release +
+next_press_threshold, as p50/p99 and jitter (standard deviation), once for
+the first event of every chip, i.e. how late its deadline ran, and once for
+all events, which adds the cost of delivering N events at the same moment.
+Flat first-event numbers across N mean the deadline bookkeeping does not
+grow with the button count.
+
+    python -m benchmarks.scheduler [--buttons 1 4 16 64 256] [--rounds 5]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.const import CONF_SUBTYPE, EVENT_SINGLE_PRESS
+from custom_components.sweet_home.gesture import NEXT_PRESS_THRESHOLD
+from custom_components.sweet_home.simulator import rig
+
+from .pipeline import percentiles
+
+
+def run(buttons: int, rounds: int) -> tuple[list[float], list[float]]:
+    pins = mcp23017.PINS_PER_CHIP
+    chip_count = -(-buttons // pins)
+    first, lateness = [], []
+    with rig(chip_count, debounce=1, presses=2) as r:
+        # subtype -> chip index, for the buttons taking part
+        chip_of = {}
+        masks = []
+        for idx, chip in enumerate(r.chips):
+            count = min(pins, buttons - idx * pins)
+            masks.append((1 << count) - 1)
+            bus = 1 + idx // 8
+            address = mcp23017.MCP23017_BASE_ADDRESS + idx % 8
+            for pin in range(count):
+                chip_of[f"{bus}-{hex(address)}-{pin}"] = idx
+
+        for _ in range(rounds):
+            fired = len(r.hass.bus.fired)
+            for chip, mask in zip(r.chips, masks):
+                chip.set_port(0, ~mask & 0xFF)
+                chip.set_port(1, ~(mask >> 8) & 0xFF)
+            time.sleep(0.02)
+            released = []
+            for chip in r.chips:
+                released.append(time.perf_counter())
+                chip.set_port(0, 0xFF)
+                chip.set_port(1, 0xFF)
+            if not r.hass.bus.wait_for(fired + buttons, timeout=5.0):
+                raise RuntimeError("Not every button fired")
+            seen = set()
+            for when, _, data in r.hass.bus.fired[fired:]:
+                assert data["type"] == EVENT_SINGLE_PRESS
+                chip = chip_of[data[CONF_SUBTYPE]]
+                late = when - released[chip] - NEXT_PRESS_THRESHOLD / 1000
+                lateness.append(late)
+                if chip not in seen:
+                    seen.add(chip)
+                    first.append(late)
+            time.sleep(0.05)
+    return first, lateness
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--buttons", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for buttons in args.buttons:
+        first, lateness = run(buttons, args.rounds)
+        print(f"{buttons:4} buttons")
+        for label, values in (("first per chip", first), ("all events", lateness)):
+            jitter = statistics.pstdev(values) * 1000
+            print(f"  {label:15} {percentiles(values)}, jitter {jitter:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Integration startup time on the MCP23017 simulator.
+
+Measures how long the setup path (setButtons + Run) blocks the caller and how
+long until every present chip is online, for 2 and 8 chips, with and without
+absent chips, once probing every configured address and once with the chip
+inventory of a config flow scan. Bus speed and the cost of probing an absent
+address are simulated with per-transaction delays. Also times the discovery
+scan of 0x20 - 0x27 on 1 and 2 buses.
+
+    python -m benchmarks.startup [--transaction-ms 0.3] [--absent-ms 25]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.simulator import (
+    CHIPS_PER_BUS,
+    FIRST_INTERRUPT_PIN,
+    FakeGPIO,
+    FakeI2CBackend,
+)
+
+_LOGGER = logging.getLogger("benchmark")
+
+
+def startup(
+    chip_count: int,
+    absent: int,
+    buses: int,
+    transaction: float,
+    absent_delay: float,
+    inventory: bool = False,
+):
+    gpio = FakeGPIO()
+    i2c = FakeI2CBackend(gpio, transaction, absent_delay)
+    bus_configs: dict[int, dict[int, int]] = {}
+    known: dict[int, set[int]] = {}
+    for idx in range(chip_count):
+        bus = 1 + idx % buses
+        address = mcp23017.MCP23017_BASE_ADDRESS + idx // buses % CHIPS_PER_BUS
+        interrupt_pin = FIRST_INTERRUPT_PIN + idx
+        bus_configs.setdefault(bus, {})[address] = interrupt_pin
+        known.setdefault(bus, set())
+        if idx >= absent:
+            i2c.add_chip(bus, address, interrupt_pin)
+            known[bus].add(address)
+    mcp23017.set_backends(i2c, gpio)
+
+    start = time.perf_counter()
+    mcp23017.setButtons({})
+    mcp23017.Run(
+        _LOGGER,
+        [
+            {"bus": bus, "chips": chips, "known": known[bus] if inventory else None}
+            for bus, chips in bus_configs.items()
+        ],
+    )
+    returned = time.perf_counter() - start
+
+    present = chip_count - absent
+    online_at = {}
+    while len(online_at) < present:
+        for bus in mcp23017.buses.values():
+            for address in bus.online:
+                online_at.setdefault((bus.number, address), time.perf_counter() - start)
+        time.sleep(0.0002)
+    all_online = max(online_at.values())
+    transactions = i2c.transactions
+    first_online = min(online_at.values())
+
+    mcp23017.close()
+    mcp23017.buses.clear()
+    return returned, first_online, all_online, transactions
+
+
+def scan(buses: int, transaction: float, absent_delay: float) -> float:
+    """Seconds to scan every address of the given buses, 2 chips on each."""
+    i2c = FakeI2CBackend(FakeGPIO(), transaction, absent_delay)
+    for bus in range(1, buses + 1):
+        i2c.add_chip(bus, mcp23017.MCP23017_BASE_ADDRESS)
+        i2c.add_chip(bus, mcp23017.MCP23017_BASE_ADDRESS + 1)
+    mcp23017.set_backends(i2c)
+    start = time.perf_counter()
+    mcp23017.scan()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transaction-ms", type=float, default=0.3)
+    parser.add_argument("--absent-ms", type=float, default=25.0)
+    args = parser.parse_args()
+    transaction = args.transaction_ms / 1000
+    absent_delay = args.absent_ms / 1000
+
+    print("chips absent buses inventory | setup returned | first online | all online | I2C")
+    for chip_count, absent, buses in (
+        (2, 0, 1),
+        (2, 1, 1),
+        (8, 0, 1),
+        (8, 3, 1),
+        (8, 0, 2),
+        (8, 3, 2),
+    ):
+        for inventory in (False, True) if absent else (False,):
+            returned, first, last, transactions = startup(
+                chip_count, absent, buses, transaction, absent_delay, inventory
+            )
+            print(
+                f"{chip_count:5} {absent:6} {buses:5} {'yes' if inventory else 'no':>9}"
+                f" | {returned * 1000:11.2f} ms | {first * 1000:9.2f} ms"
+                f" | {last * 1000:7.2f} ms | {transactions:3}"
+            )
+
+    for buses in (1, 2):
+        print(f"scan of 0x20 - 0x27 on {buses} bus(es): {scan(buses, transaction, absent_delay) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""I2C transactions per interrupt and per chip init, before and after block I/O.
+
+The "before" column replays the register-by-register access pattern the
+integration originally used (one read_byte_data per port on every
+interrupt, 21 single-register transactions to configure a chip) against the
+simulator. The "after" column runs the real bus workers on the same
+simulated chips and counts what they put on the bus. Chips are first left
+in BANK = 1 or BANK = 0 with SEQOP = 1 by a previous user, which init must
+recover from.
+
+    python -m benchmarks.transactions [--chips 8] [--presses 200]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from custom_components.sweet_home import mcp23017
+from custom_components.sweet_home.simulator import FakeSMBus, Mcp23017Simulator, rig, wait_online
+
+# Single-register writes of the original init, after the presence probe
+LEGACY_INIT_WRITES = [
+    (mcp23017.IOCONA, mcp23017.IOCON_VALUE),
+    (mcp23017.IOCONB, mcp23017.IOCON_VALUE),
+    (mcp23017.IPOLA, 0x00),
+    (mcp23017.IPOLB, 0x00),
+    (mcp23017.IODIRA, 0xFF),
+    (mcp23017.IODIRB, 0xFF),
+    (mcp23017.GPINTENA, 0xFF),
+    (mcp23017.GPINTENB, 0xFF),
+    (mcp23017.INTCONA, 0x00),
+    (mcp23017.INTCONB, 0x00),
+    (mcp23017.GPPUA, 0xFF),
+    (mcp23017.GPPUB, 0xFF),
+    (mcp23017.DEFVALA, 0xFF),
+    (mcp23017.DEFVALB, 0xFF),
+    (mcp23017.GPIOA, 0xFF),
+    (mcp23017.GPIOB, 0xFF),
+]
+
+
+def legacy_init(bus: FakeSMBus, address: int) -> None:
+    bus.read_byte_data(address, mcp23017.IOCONA)
+    for register, value in LEGACY_INIT_WRITES:
+        bus.write_byte_data(address, register, value)
+    for register in (mcp23017.INTCAPA, mcp23017.INTCAPB, mcp23017.INTFA, mcp23017.INTFB):
+        bus.read_byte_data(address, register)
+
+
+def legacy_interrupt(bus: FakeSMBus, address: int) -> None:
+    for register in (mcp23017.INTCAPA, mcp23017.INTCAPB):
+        bus.read_byte_data(address, register)
+
+
+def before(chip_count: int, interrupts: int) -> tuple[float, float]:
+    addresses = [mcp23017.MCP23017_BASE_ADDRESS + idx for idx in range(min(chip_count, 8))]
+    bus = FakeSMBus(1, {address: Mcp23017Simulator() for address in addresses})
+    for address in addresses:
+        legacy_init(bus, address)
+    init = bus.transactions / len(addresses)
+    bus.transactions = 0
+    for n in range(interrupts):
+        legacy_interrupt(bus, addresses[n % len(addresses)])
+    return init, bus.transactions / interrupts
+
+
+def after(chip_count: int, presses: int) -> tuple[float, float]:
+    with rig(chip_count, debounce=1) as r:
+        # Bring the chips up again from a hostile IOCON left by someone else
+        for bus in mcp23017.buses.values():
+            bus.close()
+        for idx, chip in enumerate(r.chips):
+            chip.write(mcp23017.IOCONA, 0x80 if idx % 2 else 0x20)  # BANK / SEQOP
+        transactions = r.i2c.transactions
+        for bus in mcp23017.buses.values():
+            bus.start_worker(bus.logger)
+        wait_online(chip_count)
+        init = (r.i2c.transactions - transactions) / chip_count
+
+        interrupts = sum(s.interrupts for bus in mcp23017.buses.values() for s in bus.stats)
+        transactions = r.i2c.transactions
+        for n in range(presses):
+            chip = r.chips[n % chip_count]
+            pin = n % mcp23017.PINS_PER_CHIP
+            for level in (0, 1):
+                chip.set_input(pin, level)
+                time.sleep(0.003)
+        time.sleep(0.05)
+        interrupts = (
+            sum(s.interrupts for bus in mcp23017.buses.values() for s in bus.stats) - interrupts
+        )
+        return init, (r.i2c.transactions - transactions) / max(interrupts, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chips", type=int, default=8)
+    parser.add_argument("--presses", type=int, default=200)
+    args = parser.parse_args()
+
+    old_init, old_interrupt = before(args.chips, 2 * args.presses)
+    new_init, new_interrupt = after(args.chips, args.presses)
+    print(f"{'':24}{'before':>10}{'after':>10}")
+    print(f"{'transactions/chip init':24}{old_init:>10.1f}{new_init:>10.1f}")
+    print(f"{'transactions/interrupt':24}{old_interrupt:>10.1f}{new_interrupt:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
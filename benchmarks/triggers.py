@@ -0,0 +1,184 @@
+"""Device trigger dispatch cost with many attached automations.
+
+Attaches N device triggers (default 1,000) spread over switches with 3
+buttons and 4 press types each, once through the generic event trigger
+platform as before and once through the sweet_home dispatcher, then fires
+button events into a real Home Assistant event bus and reports the cost per
+event. Also times async_get_triggers with and without the per-device cache.
+
+    python -m benchmarks.triggers [--triggers 1000] [--events 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from homeassistant.components.homeassistant.triggers import event as event_trigger
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_DEVICE_ID, CONF_TYPE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.sweet_home import device_trigger
+from custom_components.sweet_home.button import Button
+from custom_components.sweet_home.const import (
+    CONF_SUBTYPE,
+    DATA_KEY_BUTTONS,
+    DATA_KEY_TRIGGERS,
+    DOMAIN,
+    EVENT_DOUBLE_PRESS,
+    EVENT_LONG_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TRIPLE_PRESS,
+    EVENT_TYPE,
+)
+from custom_components.sweet_home.dispatcher import dispatcher
+
+TYPES = (EVENT_SINGLE_PRESS, EVENT_DOUBLE_PRESS, EVENT_TRIPLE_PRESS, EVENT_LONG_PRESS)
+BUTTONS_PER_SWITCH = 3
+
+
+def trigger_keys(count: int) -> list[tuple[str, str, str]]:
+    per_switch = BUTTONS_PER_SWITCH * len(TYPES)
+    return [
+        (f"switch_{n // per_switch}", f"button_{n // len(TYPES) % BUTTONS_PER_SWITCH + 1}", TYPES[n % len(TYPES)])
+        for n in range(count)
+    ]
+
+
+def trigger_info(n: int) -> dict:
+    return {
+        "domain": "automation",
+        "name": f"automation {n}",
+        "home_assistant_start": False,
+        "variables": {},
+        "trigger_data": {"id": "0", "idx": "0", "alias": None},
+    }
+
+
+async def attach_event_triggers(hass, keys, action) -> list:
+    """The previous implementation: one event trigger per automation."""
+    removes = []
+    for n, (device_id, subtype, event_type) in enumerate(keys):
+        config = event_trigger.TRIGGER_SCHEMA(
+            {
+                event_trigger.CONF_PLATFORM: "event",
+                event_trigger.CONF_EVENT_TYPE: EVENT_TYPE,
+                event_trigger.CONF_EVENT_DATA: {
+                    CONF_DEVICE_ID: device_id,
+                    CONF_TYPE: event_type,
+                    CONF_SUBTYPE: subtype,
+                },
+            }
+        )
+        removes.append(
+            await event_trigger.async_attach_trigger(
+                hass, config, action, trigger_info(n), platform_type="device"
+            )
+        )
+    return removes
+
+
+async def attach_dispatcher(hass, keys, action) -> list:
+    return [
+        await device_trigger.async_attach_trigger(
+            hass,
+            {CONF_DEVICE_ID: device_id, CONF_SUBTYPE: subtype, CONF_TYPE: event_type},
+            action,
+            trigger_info(n),
+        )
+        for n, (device_id, subtype, event_type) in enumerate(keys)
+    ]
+
+
+async def measure(hass, attach, keys, events: int) -> tuple[float, int]:
+    calls = [0]
+
+    @callback
+    def action(run_variables, context=None):
+        calls[0] += 1
+
+    removes = await attach(hass, keys, action)
+    payloads = [
+        {CONF_DEVICE_ID: device_id, CONF_TYPE: event_type, CONF_SUBTYPE: subtype}
+        for device_id, subtype, event_type in keys
+    ]
+    start = time.perf_counter()
+    for n in range(events):
+        hass.bus.async_fire(EVENT_TYPE, payloads[n * 7919 % len(payloads)])
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+    for remove in removes:
+        remove()
+    return elapsed / events, calls[0]
+
+
+async def get_triggers(hass, switches: int, calls: int) -> tuple[float, float]:
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="benchmark",
+        data={},
+        source="user",
+    )
+    # Registered without setting the integration up
+    hass.config_entries = ConfigEntries(hass, {})
+    hass.config_entries._entries[entry.entry_id] = entry
+    device_registry = dr.async_get(hass)
+    buttons = {}
+    for n in range(switches):
+        device = device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id, identifiers={(DOMAIN, f"switch_{n}")}
+        )
+        buttons[device.id] = [
+            Button(hass, device.id, f"button_{idx + 1}", 0x20, idx, 3)
+            for idx in range(BUTTONS_PER_SWITCH)
+        ]
+    hass.data[DOMAIN] = {DATA_KEY_BUTTONS: buttons}
+    device_ids = list(buttons)
+
+    start = time.perf_counter()
+    for n in range(calls):
+        await device_trigger.async_get_triggers(hass, device_ids[n % switches])
+    cached = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for n in range(calls):
+        hass.data[DOMAIN].pop(DATA_KEY_TRIGGERS, None)
+        await device_trigger.async_get_triggers(hass, device_ids[n % switches])
+    uncached = (time.perf_counter() - start) / calls
+    return uncached, cached
+
+
+async def run(triggers: int, events: int) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await dr.async_load(hass)
+        keys = trigger_keys(triggers)
+
+        print(f"{triggers} attached triggers, {events} events")
+        per_event, calls = await measure(hass, attach_event_triggers, keys, events)
+        print(f"  event trigger per automation  {per_event * 1e6:8.1f} us/event ({calls} actions)")
+        per_event, calls = await measure(hass, attach_dispatcher, keys, events)
+        print(f"  indexed dispatcher            {per_event * 1e6:8.1f} us/event ({calls} actions)")
+        assert dispatcher.attached == 0
+
+        uncached, cached = await get_triggers(hass, 100, 2000)
+        print(f"  async_get_triggers rebuilt    {uncached * 1e6:8.1f} us/call")
+        print(f"  async_get_triggers cached     {cached * 1e6:8.1f} us/call")
+        await hass.async_stop(force=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triggers", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.triggers, args.events))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import logging
+import os
+import threading as th
+import time
+from typing import TYPE_CHECKING
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.reload import async_integration_yaml_config
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.config_entries import ConfigEntry
 import homeassistant.helpers.config_validation as cv
+from homeassistant.config import config_per_platform
 from homeassistant.helpers import device_registry as dr
 
 from homeassistant.const import (
@@ -18,8 +27,42 @@ from homeassistant.const import (
 
 from .const import (
     CONF_ADDRESS,
+    CONF_BINARY_SENSORS,
+    CONF_BUS,
+    CONF_BUSES,
+    CONF_CHIPS,
+    CONF_DEBOUNCE,
+    CONF_DURATION,
+    CONF_EVENT_WINDOW,
+    CONF_FIRE_EARLY,
+    CONF_GPIO_BACKEND,
+    CONF_GPIO_CHIP,
+    CONF_HOST,
+    CONF_INTERRUPT_PIN,
+    CONF_INTERVAL,
+    CONF_INVENTORY,
+    CONF_JOURNAL_SIZE,
+    CONF_NEXT_PRESS_THRESHOLD,
+    CONF_PATH,
+    CONF_PORT,
+    CONF_SATELLITES,
+    CONF_TOKEN,
+    DEFAULT_BUS,
+    DEFAULT_BUSES,
+    DEFAULT_DEBOUNCE,
+    DEFAULT_EVENT_WINDOW,
+    DEFAULT_GPIO_BACKEND,
+    DEFAULT_GPIO_CHIP,
+    DEFAULT_JOURNAL_SIZE,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_SATELLITE_PORT,
+    MAX_PROFILE_DURATION,
+    GPIO_BACKEND_GPIOD,
+    GPIO_BACKEND_RPI_GPIO,
     DOMAIN,
     CONF_BUTTONS,
+    CONF_CHORDS,
+    CONF_WINDOW,
     CONF_PIN,
     CONF_NAME,
     CONF_SWITCHES,
@@ -27,22 +70,87 @@ from .const import (
     CONF_PRESS_COUNT,
     DATA_KEY_CONFIG,
     DATA_KEY_BUTTONS,
+    DATA_KEY_CHORDS,
+    DATA_KEY_PLATFORMS,
+    DATA_KEY_SATELLITES,
+    DATA_KEY_SENSORS,
     EVENT_DOUBLE_PRESS,
     EVENT_TRIPLE_PRESS,
     EVENT_SINGLE_PRESS,
+    SERVICE_DUMP_JOURNAL,
+    SERVICE_PROFILE,
+    SERVICE_RELOAD,
 )
 
 from .button import Button
+from .chord import DEFAULT_CHORD_WINDOW, Chord
+from .dispatcher import dispatcher
+from .gesture import NEXT_PRESS_THRESHOLD
+from .profiler import DEFAULT_INTERVAL
+
+if TYPE_CHECKING:
+    from .satellite import SatelliteClient
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["sensor", "binary_sensor"]
+
+
+def validate_address(value: str) -> str:
+    """Validate an MCP23017 I2C address given as a hex string."""
+    try:
+        address = int(value, 16)
+    except ValueError as err:
+        raise vol.Invalid(f"Invalid address {value}") from err
+    if not 0x20 <= address <= 0x27:
+        raise vol.Invalid(f"MCP23017 address must be 0x20 - 0x27, got {value}")
+    return value
+
+
+# Pin of a chip, 0 - 7 on port A and 8 - 15 on port B
+PIN_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=0, max=15))
+
+
+def output_path(hass: HomeAssistant, path: str | None, default: str) -> str:
+    """Where a service writes its file.
+
+    A bare file name goes to the config directory. Any other path has to be
+    absolute and inside allowlist_external_dirs.
+    """
+    if not path:
+        return hass.config.path(default)
+    if os.path.basename(path) == path and path not in (os.curdir, os.pardir):
+        return hass.config.path(path)
+    if not os.path.isabs(path) or not hass.config.is_allowed_path(path):
+        raise HomeAssistantError(
+            f"Cannot write to {path}, give a file name or a path in allowlist_external_dirs"
+        )
+    return path
+
+
 BUTTON_SCHEMA = vol.Schema(
     {
-        vol.Required(CONF_ADDRESS): cv.string,
-        vol.Required(CONF_PIN): cv.string,
+        vol.Optional(CONF_BUS, default=DEFAULT_BUS): cv.positive_int,
+        vol.Required(CONF_ADDRESS): vol.All(cv.string, validate_address),
+        vol.Required(CONF_PIN): PIN_SCHEMA,
         vol.Optional(CONF_PRESS_COUNT, default=EVENT_SINGLE_PRESS): vol.In(
             [EVENT_DOUBLE_PRESS, EVENT_TRIPLE_PRESS, EVENT_SINGLE_PRESS]
         ),
+        vol.Optional(CONF_DEBOUNCE, default=DEFAULT_DEBOUNCE): cv.positive_int,
+        vol.Optional(
+            CONF_NEXT_PRESS_THRESHOLD, default=NEXT_PRESS_THRESHOLD
+        ): cv.positive_int,
+        vol.Optional(CONF_FIRE_EARLY, default=False): cv.boolean,
+    }
+)
+
+CHORD_SCHEMA = vol.Schema(
+    {
+        # 1-based positions in the switch's button list
+        vol.Required(CONF_BUTTONS): vol.All(
+            cv.ensure_list, [cv.positive_int], vol.Length(min=2)
+        ),
+        vol.Optional(CONF_WINDOW, default=DEFAULT_CHORD_WINDOW): cv.positive_int,
     }
 )
 
@@ -51,14 +159,78 @@ SWITCH_SCHEMA = vol.Schema(
         vol.Required(CONF_NAME): cv.string,
         vol.Required(CONF_ID): cv.string,
         vol.Required(CONF_BUTTONS): vol.All(cv.ensure_list, [BUTTON_SCHEMA]),
+        vol.Optional(CONF_CHORDS, default=[]): vol.All(cv.ensure_list, [CHORD_SCHEMA]),
+    }
+)
+
+CHIP_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_ADDRESS): vol.All(cv.string, validate_address),
+        vol.Required(CONF_INTERRUPT_PIN): cv.positive_int,
+    }
+)
+
+BUS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_BUS, default=DEFAULT_BUS): cv.positive_int,
+        vol.Required(CONF_CHIPS): vol.All(cv.ensure_list, [CHIP_SCHEMA]),
+    }
+)
+
+SENSOR_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_BUS, default=DEFAULT_BUS): cv.positive_int,
+        vol.Required(CONF_ADDRESS): vol.All(cv.string, validate_address),
+        vol.Required(CONF_PIN): PIN_SCHEMA,
+        vol.Optional(CONF_DEBOUNCE, default=DEFAULT_DEBOUNCE): cv.positive_int,
+        vol.Optional(CONF_NAME): cv.string,
     }
 )
 
+SATELLITE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(CONF_NAME): cv.string,
+            vol.Exclusive(CONF_HOST, "endpoint"): cv.string,
+            vol.Exclusive(CONF_PATH, "endpoint"): cv.string,
+            vol.Optional(CONF_PORT, default=DEFAULT_SATELLITE_PORT): cv.port,
+            vol.Required(CONF_TOKEN): vol.All(cv.string, vol.Length(min=1)),
+            vol.Optional(
+                CONF_EVENT_WINDOW, default=DEFAULT_EVENT_WINDOW
+            ): cv.positive_int,
+            vol.Required(CONF_BUSES): vol.All(cv.ensure_list, [BUS_SCHEMA]),
+            vol.Optional(CONF_SWITCHES, default=[]): vol.All(cv.ensure_list, [SWITCH_SCHEMA]),
+            vol.Optional(CONF_BINARY_SENSORS, default=[]): vol.All(
+                cv.ensure_list, [SENSOR_SCHEMA]
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(CONF_HOST, CONF_PATH),
+)
+
 # Schema to validate the configured MQTT topic
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
-            {vol.Required(CONF_SWITCHES): vol.All(cv.ensure_list, [SWITCH_SCHEMA])}
+            {
+                # No default here, DEFAULT_BUSES only applies when neither YAML
+                # nor the config flow lists any chip
+                vol.Optional(CONF_BUSES): vol.All(cv.ensure_list, [BUS_SCHEMA]),
+                vol.Optional(
+                    CONF_EVENT_WINDOW, default=DEFAULT_EVENT_WINDOW
+                ): cv.positive_int,
+                vol.Optional(CONF_GPIO_BACKEND, default=DEFAULT_GPIO_BACKEND): vol.In(
+                    [GPIO_BACKEND_RPI_GPIO, GPIO_BACKEND_GPIOD]
+                ),
+                vol.Optional(CONF_GPIO_CHIP, default=DEFAULT_GPIO_CHIP): cv.string,
+                vol.Optional(
+                    CONF_JOURNAL_SIZE, default=DEFAULT_JOURNAL_SIZE
+                ): cv.positive_int,
+                vol.Optional(CONF_SWITCHES, default=[]): vol.All(cv.ensure_list, [SWITCH_SCHEMA]),
+                vol.Optional(CONF_SATELLITES, default=[]): vol.All(
+                    cv.ensure_list, [SATELLITE_SCHEMA]
+                ),
+            }
         )
     },
     extra=vol.ALLOW_EXTRA,
@@ -70,6 +242,13 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.data[DOMAIN] = {}
     if DOMAIN in config:
         hass.data[DOMAIN][DATA_KEY_CONFIG] = config[DOMAIN]
+    # Legacy YAML platforms on local pins, e.g. relays as switch entities
+    hass.data[DOMAIN][DATA_KEY_PLATFORMS] = {
+        domain
+        for domain in ("binary_sensor", "light", "switch")
+        for platform, _ in config_per_platform(config, domain)
+        if platform == DOMAIN
+    }
 
     return True
 
@@ -77,7 +256,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Sweet Home from a config entry."""
     try:
-        from .mcp23017 import Run, setButtons
+        from .mcp23017 import Run, set_backends, setButtons, setChords
 
         _LOGGER.info("Start setting up entry")
         
@@ -87,59 +266,169 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             
         config = hass.data[DOMAIN].get(DATA_KEY_CONFIG, {})
 
-        if CONF_SWITCHES not in config:
-            _LOGGER.info("There are no switches in config")
-            return True
+        from .bridge import bridge
+        bridge.setup(hass, config.get(CONF_EVENT_WINDOW, DEFAULT_EVENT_WINDOW) / 1000)
+        from .journal import journal
+        journal.resize(config.get(CONF_JOURNAL_SIZE, DEFAULT_JOURNAL_SIZE))
 
-        switches = config[CONF_SWITCHES]
+        entry.async_on_unload(entry.add_update_listener(async_entry_updated))
 
-        device_registry = dr.async_get(hass)
-        buttons: dict[str, list[Button]] = {}
-        
-        for swt in switches:
-            params = {
-                ATTR_IDENTIFIERS: {(DOMAIN, swt["id"])},
-                ATTR_MANUFACTURER: "Raspberry Pi mcp23017",
-                ATTR_NAME: swt["name"],
-            }
-            device_entry = device_registry.async_get_or_create(
-                config_entry_id=entry.entry_id, **params
+        async def async_reload(call: ServiceCall) -> None:
+            """Re-read the YAML configuration and apply only what changed."""
+            conf = await async_integration_yaml_config(hass, DOMAIN)
+            if conf is None or DOMAIN not in conf:
+                _LOGGER.warning("No valid %s configuration found, nothing reloaded", DOMAIN)
+                return
+            old_config = hass.data[DOMAIN].get(DATA_KEY_CONFIG, {})
+            if (
+                DATA_KEY_BUTTONS not in hass.data[DOMAIN]
+                or conf[DOMAIN].get(CONF_SATELLITES, []) != old_config.get(CONF_SATELLITES, [])
+            ):
+                # Nothing was set up yet, or satellite sensors which are
+                # entities of the entry changed
+                hass.data[DOMAIN][DATA_KEY_CONFIG] = conf[DOMAIN]
+                await hass.config_entries.async_reload(entry.entry_id)
+                return
+            reconcile_config(hass, entry, conf[DOMAIN])
+
+        hass.services.async_register(DOMAIN, SERVICE_RELOAD, async_reload)
+
+        async def async_dump_journal(call: ServiceCall) -> None:
+            """Write the transition journal for benchmarks/replay.py."""
+            from .journal import journal
+            from .mcp23017 import get_pin_map
+
+            if not journal.enabled:
+                _LOGGER.warning(f"Transition journal is off, set {CONF_JOURNAL_SIZE} to enable it")
+                return
+            path = output_path(
+                hass,
+                call.data.get(CONF_PATH),
+                time.strftime("sweet_home_journal_%Y%m%d_%H%M%S.bin"),
             )
-            buttons[device_entry.id] = []
-            
-            for idx, btn in enumerate(swt[CONF_BUTTONS]):
-                presses = 1
-                if btn.get(CONF_PRESS_COUNT) is not None:
-                    if btn[CONF_PRESS_COUNT] == EVENT_DOUBLE_PRESS:
-                        presses = 2
-                    elif btn[CONF_PRESS_COUNT] == EVENT_TRIPLE_PRESS:
-                        presses = 3
-                        
-                buttons[device_entry.id].append(
-                    Button(
-                        hass=hass,
-                        device_id=device_entry.id,
-                        subtype="button_" + str(idx + 1),
-                        address=int(btn[CONF_ADDRESS], 16),
-                        pin=int(btn[CONF_PIN]),
-                        presses=presses,
+            count = await hass.async_add_executor_job(
+                journal.dump, path, {"created": time.time(), **get_pin_map()}
+            )
+            _LOGGER.info(f"Dumped {count} transitions to {path}")
+
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_DUMP_JOURNAL,
+            async_dump_journal,
+            schema=vol.Schema({vol.Optional(CONF_PATH): cv.string}),
+        )
+
+        async def async_profile(call: ServiceCall) -> None:
+            """Sample the bus workers and the loop side pin handling to a file."""
+            from .mcp23017 import buses
+            from .profiler import profiler, write_folded, write_pstats
+
+            if profiler.running:
+                _LOGGER.warning("A profile is already running")
+                return
+            # Workers are sampled whole, the loop only while inside this integration
+            threads = {th.get_ident(): ("loop", True)}
+            for bus in buses.values():
+                if bus.worker is not None and bus.worker.ident is not None:
+                    threads[bus.worker.ident] = (f"bus_{bus.number}", False)
+            path = output_path(
+                hass,
+                call.data.get(CONF_PATH),
+                time.strftime("sweet_home_profile_%Y%m%d_%H%M%S"),
+            )
+            duration = call.data[CONF_DURATION]
+            future: concurrent.futures.Future = concurrent.futures.Future()
+
+            def run() -> None:
+                try:
+                    samples, interval = profiler.profile(
+                        threads, duration, call.data[CONF_INTERVAL] / 1000
                     )
-                )
+                    write_folded(samples, f"{path}.folded")
+                    write_pstats(samples, interval, f"{path}.pstats")
+                    future.set_result(sum(samples.values()))
+                except Exception as e:
+                    future.set_exception(e)
+
+            _LOGGER.info(f"Profiling {len(threads)} threads for {duration} s")
+            # Own thread rather than the executor, it sleeps for the whole run
+            th.Thread(target=run, name="sweet_home_profiler", daemon=True).start()
+            count = await asyncio.wrap_future(future)
+            _LOGGER.info(f"Wrote {count} samples to {path}.folded and {path}.pstats")
+
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_PROFILE,
+            async_profile,
+            schema=vol.Schema(
+                {
+                    vol.Optional(CONF_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+                        vol.Coerce(float), vol.Range(min=0.1, max=MAX_PROFILE_DURATION)
+                    ),
+                    vol.Optional(CONF_INTERVAL, default=DEFAULT_INTERVAL): vol.All(
+                        vol.Coerce(float), vol.Range(min=0.1, max=1000)
+                    ),
+                    vol.Optional(CONF_PATH): cv.string,
+                }
+            ),
+        )
+
+        config = entry_config(entry, config)
+        sensors = entry.options.get(CONF_BINARY_SENSORS, [])
+        satellites = config.get(CONF_SATELLITES, [])
+        platforms = hass.data[DOMAIN].get(DATA_KEY_PLATFORMS, set())
+        if not config[CONF_SWITCHES] and not sensors and not satellites and not platforms:
+            _LOGGER.info("There are no switches in config")
+            return True
+
+        buttons = build_buttons(hass, entry, config[CONF_SWITCHES])
+        chords = build_chords(hass, config[CONF_SWITCHES], buttons)
+        hass.data[DOMAIN][DATA_KEY_SENSORS] = sensors
+
+        if config[CONF_SWITCHES] or sensors or platforms:
+            _LOGGER.info("Run handling buttons on mcp23017")
+
+            from .hardware import GpiodBackend, RPiGPIOBackend
+            if config.get(CONF_GPIO_BACKEND, DEFAULT_GPIO_BACKEND) == GPIO_BACKEND_GPIOD:
+                set_backends(gpio=GpiodBackend(config.get(CONF_GPIO_CHIP, DEFAULT_GPIO_CHIP)))
+            else:
+                set_backends(gpio=RPiGPIOBackend())
 
+            # Neither call touches the hardware, the bus workers bring chips online
+            setButtons(buttons)
+            setChords(chords)
+            Run(_LOGGER, get_bus_configs(config, known_addresses(entry)))
+
+        clients = build_satellites(hass, entry, satellites)
+        hass.data[DOMAIN][DATA_KEY_SATELLITES] = clients
         hass.data[DOMAIN][DATA_KEY_BUTTONS] = buttons
-        _LOGGER.info("Run handling buttons on mcp23017")
+        hass.data[DOMAIN][DATA_KEY_CHORDS] = chords
+        add_satellite_devices(clients, buttons, chords)
+
+        def demand_changed(device_id: str, subtype: str) -> None:
+            """Fire early or wait for more presses as automations come and go."""
+            for button in hass.data[DOMAIN].get(DATA_KEY_BUTTONS, {}).get(device_id, []):
+                if button.subtype == subtype and button.fire_early:
+                    button.set_demand(dispatcher.press_demand(device_id, subtype))
+                    if button.satellite is not None:
+                        hass.data[DOMAIN][DATA_KEY_SATELLITES][button.satellite].send_demand(button)
 
-        await hass.async_add_executor_job(setButtons, buttons)
-        await hass.async_add_executor_job(Run, _LOGGER)
+        entry.async_on_unload(dispatcher.async_listen_demand(demand_changed))
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        for client in clients.values():
+            client.start()
 
-        def cleanup_gpio(event):
+        async def cleanup_gpio(event):
             """Clean up GPIO on HA shutdown."""
             try:
-                import RPi.GPIO as GPIO
-                GPIO.cleanup()
+                from .mcp23017 import close
+                # Joins the bus workers, kept off the loop like the rest
+                await hass.async_add_executor_job(close)
                 _LOGGER.info("GPIO cleaned up on HA shutdown")
-                from .mcp23017 import i2cbus
-                i2cbus.close()
+                from .scheduler import scheduler
+                await hass.async_add_executor_job(scheduler.stop)
+                from .bridge import bridge
+                await hass.async_add_executor_job(bridge.stop)
             except Exception as e:
                 _LOGGER.error("Error cleaning up GPIO: %s", e)
 
@@ -152,23 +441,300 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+def build_buttons(
+    hass: HomeAssistant, entry: ConfigEntry, switches: list[dict]
+) -> dict[str, list[Button]]:
+    """Create the switch devices and their Button objects, keyed by device id."""
+    device_registry = dr.async_get(hass)
+    buttons: dict[str, list[Button]] = {}
+
+    for swt in switches:
+        params = {
+            ATTR_IDENTIFIERS: {(DOMAIN, swt["id"])},
+            ATTR_MANUFACTURER: "Raspberry Pi mcp23017",
+            ATTR_NAME: swt["name"],
+        }
+        device_entry = device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id, **params
+        )
+        buttons[device_entry.id] = []
+
+        for idx, btn in enumerate(swt[CONF_BUTTONS]):
+            presses = 1
+            if btn.get(CONF_PRESS_COUNT) is not None:
+                if btn[CONF_PRESS_COUNT] == EVENT_DOUBLE_PRESS:
+                    presses = 2
+                elif btn[CONF_PRESS_COUNT] == EVENT_TRIPLE_PRESS:
+                    presses = 3
+
+            button = Button(
+                hass=hass,
+                device_id=device_entry.id,
+                subtype="button_" + str(idx + 1),
+                address=int(btn[CONF_ADDRESS], 16),
+                pin=int(btn[CONF_PIN]),
+                presses=presses,
+                bus=btn.get(CONF_BUS, DEFAULT_BUS),
+                debounce=btn.get(CONF_DEBOUNCE, DEFAULT_DEBOUNCE),
+                next_press=btn.get(CONF_NEXT_PRESS_THRESHOLD, NEXT_PRESS_THRESHOLD),
+                fire_early=btn.get(CONF_FIRE_EARLY, False),
+            )
+            if button.fire_early:
+                button.demand = dispatcher.press_demand(button.device_id, button.subtype)
+            buttons[device_entry.id].append(button)
+
+    return buttons
+
+
+def build_chords(
+    hass: HomeAssistant, switches: list[dict], buttons: dict[str, list[Button]]
+) -> dict[str, list[Chord]]:
+    """Create the chords of every switch from its already built buttons."""
+    device_registry = dr.async_get(hass)
+    chords: dict[str, list[Chord]] = {}
+
+    for swt in switches:
+        device_entry = device_registry.async_get_device(
+            identifiers={(DOMAIN, swt["id"])}
+        )
+        if device_entry is None:
+            continue
+        device_buttons = buttons.get(device_entry.id, [])
+        chords[device_entry.id] = []
+
+        for chord in swt.get(CONF_CHORDS, []):
+            positions = chord[CONF_BUTTONS]
+            if any(not 1 <= n <= len(device_buttons) for n in positions):
+                _LOGGER.error(f"Chord {positions} of switch {swt['id']} refers to a missing button")
+                continue
+            members = [device_buttons[n - 1] for n in positions]
+            if len({(b.bus, b.address) for b in members}) > 1:
+                _LOGGER.error(
+                    f"Chord {positions} of switch {swt['id']} spans several chips, its buttons must share one"
+                )
+                continue
+            chords[device_entry.id].append(
+                Chord(device_entry.id, members, chord[CONF_WINDOW])
+            )
+
+    return chords
+
+
+def build_satellites(
+    hass: HomeAssistant, entry: ConfigEntry, satellites: list[dict]
+) -> dict[str, SatelliteClient]:
+    """Create a client, with its buttons, chords and sensors, per satellite node."""
+    from .binary_sensor import SweetHomeBinarySensor
+    from .satellite import SatelliteClient
+
+    clients: dict[str, SatelliteClient] = {}
+    for satellite in satellites:
+        name = satellite[CONF_NAME]
+        buttons = build_buttons(hass, entry, satellite[CONF_SWITCHES])
+        chords = build_chords(hass, satellite[CONF_SWITCHES], buttons)
+        for btns in buttons.values():
+            for button in btns:
+                button.satellite = name
+        sensors = [
+            SweetHomeBinarySensor(
+                int(sensor[CONF_ADDRESS], 16),
+                int(sensor[CONF_PIN]),
+                sensor[CONF_BUS],
+                sensor[CONF_DEBOUNCE],
+                sensor.get(CONF_NAME),
+                satellite=name,
+            )
+            for sensor in satellite[CONF_BINARY_SENSORS]
+        ]
+        clients[name] = SatelliteClient(
+            hass,
+            name,
+            get_bus_configs(satellite),
+            [button for btns in buttons.values() for button in btns],
+            [chord for device_chords in chords.values() for chord in device_chords],
+            sensors,
+            satellite[CONF_TOKEN],
+            host=satellite.get(CONF_HOST),
+            port=satellite[CONF_PORT],
+            path=satellite.get(CONF_PATH),
+            event_window=satellite[CONF_EVENT_WINDOW],
+        )
+    return clients
+
+
+def add_satellite_devices(
+    clients: dict[str, SatelliteClient],
+    buttons: dict[str, list[Button]],
+    chords: dict[str, list[Chord]],
+) -> None:
+    """List the satellites' buttons and chords with the local ones for the device triggers."""
+    for client in clients.values():
+        for button in client.buttons:
+            buttons.setdefault(button.device_id, []).append(button)
+        for chord in client.chords:
+            chords.setdefault(chord.device_id, []).append(chord)
+
+
+def entry_config(entry: ConfigEntry, config: dict) -> dict:
+    """Add the chips and switches set up in the UI to the YAML configuration.
+
+    A chip listed in both keeps its YAML interrupt pin.
+    """
+    chips: dict[int, dict[int, dict]] = {}
+    for bus in entry.data.get(CONF_BUSES, []) + config.get(CONF_BUSES, []):
+        for chip in bus[CONF_CHIPS]:
+            chips.setdefault(bus[CONF_BUS], {})[int(chip[CONF_ADDRESS], 16)] = chip
+    config = dict(config)
+    if chips:
+        config[CONF_BUSES] = [
+            {CONF_BUS: number, CONF_CHIPS: list(bus_chips.values())}
+            for number, bus_chips in chips.items()
+        ]
+    config[CONF_SWITCHES] = config.get(CONF_SWITCHES, []) + [
+        SWITCH_SCHEMA(switch) for switch in entry.options.get(CONF_SWITCHES, [])
+    ]
+    return config
+
+
+def known_addresses(entry: ConfigEntry) -> dict[int, set[int]]:
+    """Chip addresses found by the last scan, per scanned bus."""
+    return {
+        bus[CONF_BUS]: {int(chip[CONF_ADDRESS], 16) for chip in bus[CONF_CHIPS]}
+        for bus in entry.data.get(CONF_INVENTORY, [])
+    }
+
+
+def get_bus_configs(config: dict, known: dict[int, set[int]] | None = None) -> list[dict]:
+    """Translate the buses section into the form mcp23017.Run() takes."""
+    known = known or {}
+    return [
+        {
+            "bus": bus[CONF_BUS],
+            "chips": {
+                int(chip[CONF_ADDRESS], 16): chip[CONF_INTERRUPT_PIN]
+                for chip in bus[CONF_CHIPS]
+            },
+            "known": set(known[bus[CONF_BUS]]) if bus[CONF_BUS] in known else None,
+        }
+        for bus in config.get(CONF_BUSES, DEFAULT_BUSES)
+    ]
+
+
+def button_settings(button: Button) -> tuple:
+    return (
+        button.bus,
+        button.address,
+        button.pin,
+        button.presses,
+        button.debounce,
+        button.next_press,
+        button.fire_early,
+    )
+
+
+def reconcile_config(hass: HomeAssistant, entry: ConfigEntry, config: dict) -> None:
+    """Apply a new configuration to the running integration.
+
+    Buttons whose settings did not change keep their object, and with it any
+    gesture in progress. Only the pins of added, changed or removed buttons
+    and the chips that were added or removed are touched; interrupts keep
+    being served on everything else.
+    """
+    from .bridge import bridge
+    from .journal import journal
+    from .mcp23017 import Run, setChords, updateButtons
+
+    yaml_config = config
+    config = entry_config(entry, config)
+    old_buttons = {
+        (b.device_id, b.subtype): b
+        for btns in hass.data[DOMAIN].get(DATA_KEY_BUTTONS, {}).values()
+        for b in btns
+        if b.satellite is None
+    }
+    buttons = build_buttons(hass, entry, config.get(CONF_SWITCHES, []))
+
+    added: list[Button] = []
+    removed: list[Button] = []
+    for btns in buttons.values():
+        for idx, b in enumerate(btns):
+            current = old_buttons.pop((b.device_id, b.subtype), None)
+            if current is not None and button_settings(current) == button_settings(b):
+                btns[idx] = current
+                continue
+            if current is not None:
+                removed.append(current)
+            added.append(b)
+    removed.extend(old_buttons.values())
+
+    updateButtons(removed, added)
+    chords = build_chords(hass, config.get(CONF_SWITCHES, []), buttons)
+    setChords(chords)
+    add_satellite_devices(hass.data[DOMAIN].get(DATA_KEY_SATELLITES, {}), buttons, chords)
+    hass.data[DOMAIN][DATA_KEY_BUTTONS] = buttons
+    hass.data[DOMAIN][DATA_KEY_CHORDS] = chords
+    hass.data[DOMAIN][DATA_KEY_CONFIG] = yaml_config
+    bridge.window = config.get(CONF_EVENT_WINDOW, DEFAULT_EVENT_WINDOW) / 1000
+    journal_size = config.get(CONF_JOURNAL_SIZE, DEFAULT_JOURNAL_SIZE)
+    if journal_size != journal.capacity:
+        journal.resize(journal_size)
+    Run(_LOGGER, get_bus_configs(config, known_addresses(entry)))
+
+    _LOGGER.info(
+        f"Configuration reloaded: {len(added)} buttons added or changed, {len(removed)} removed"
+    )
+
+
+async def async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply chips and pins changed in the options flow.
+
+    Switches and chips are reconciled like a YAML reload. Binary sensors are
+    entities of the entry, adding or removing one reloads it.
+    """
+    data = hass.data.get(DOMAIN, {})
+    if (
+        DATA_KEY_BUTTONS not in data
+        or data.get(DATA_KEY_SENSORS) != entry.options.get(CONF_BINARY_SENSORS, [])
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    reconcile_config(hass, entry, data.get(DATA_KEY_CONFIG, {}))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     try:
+        # Not registered when setting up the entry failed early
+        for service in (SERVICE_RELOAD, SERVICE_DUMP_JOURNAL, SERVICE_PROFILE):
+            if hass.services.has_service(DOMAIN, service):
+                hass.services.async_remove(DOMAIN, service)
+
         # Clean up buttons and timers
         if DOMAIN in hass.data and DATA_KEY_BUTTONS in hass.data[DOMAIN]:
-            buttons = hass.data[DOMAIN][DATA_KEY_BUTTONS]
+            for client in hass.data[DOMAIN].pop(DATA_KEY_SATELLITES, {}).values():
+                client.stop()
+            await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+            buttons = hass.data[DOMAIN].pop(DATA_KEY_BUTTONS)
+            hass.data[DOMAIN].pop(DATA_KEY_SENSORS, None)
             for button_list in buttons.values():
                 for button in button_list:
                     button.cleanup()
-        
+            from .mcp23017 import setChords
+            setChords({})
+
         # Clean up GPIO
         try:
-            import RPi.GPIO as GPIO
-            GPIO.cleanup()
+            from .mcp23017 import close
+            # Joins the bus workers, which may be in the middle of an I2C retry
+            await hass.async_add_executor_job(close)
             _LOGGER.info("GPIO cleaned up on unload")
         except Exception as e:
             _LOGGER.warning("Error cleaning up GPIO on unload: %s", e)
+
+        from .scheduler import scheduler
+        await hass.async_add_executor_job(scheduler.stop)
+        from .bridge import bridge
+        await hass.async_add_executor_job(bridge.stop)
             
         return True
         
@@ -1,34 +1,68 @@
 from homeassistant.components.binary_sensor import (
     DEVICE_CLASSES_SCHEMA,
+    PLATFORM_SCHEMA,
     BinarySensorEntity,
     BinarySensorDeviceClass,
 )
-from homeassistant.const import CONF_DEVICE_CLASS
+from homeassistant.const import CONF_DEVICE_CLASS, STATE_OFF, STATE_ON
 import logging
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 
 _LOGGER = logging.getLogger(__name__)
 
+from . import PIN_SCHEMA, validate_address
+from .bridge import bridge
 from .const import (
     CONF_ADDRESS,
+    CONF_BINARY_SENSORS,
+    CONF_BUS,
+    CONF_DEBOUNCE,
+    CONF_NAME,
     CONF_PIN,
+    DATA_KEY_SATELLITES,
+    DEFAULT_BUS,
+    DEFAULT_DEBOUNCE,
     DOMAIN,
 )
 
+PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
+    {
+        vol.Required(CONF_ADDRESS): vol.All(cv.string, validate_address),
+        vol.Required(CONF_PIN): PIN_SCHEMA,
+        vol.Optional(CONF_BUS, default=DEFAULT_BUS): cv.positive_int,
+        vol.Optional(CONF_DEBOUNCE, default=DEFAULT_DEBOUNCE): cv.positive_int,
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_DEVICE_CLASS): DEVICE_CLASSES_SCHEMA,
+    }
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the binary sensor platform."""
-    # This is for config entry setup - sensors are created dynamically 
-    # through YAML configuration or other means
-    pass
+    """Set up the binary sensors assigned to pins in the integration options."""
+    async_add_entities(
+        SweetHomeBinarySensor(
+            int(sensor[CONF_ADDRESS], 16),
+            int(sensor[CONF_PIN]),
+            sensor[CONF_BUS],
+            sensor[CONF_DEBOUNCE],
+            sensor.get(CONF_NAME),
+        )
+        for sensor in entry.options.get(CONF_BINARY_SENSORS, [])
+    )
+    async_add_entities(
+        sensor
+        for client in hass.data[DOMAIN].get(DATA_KEY_SATELLITES, {}).values()
+        for sensor in client.sensors
+    )
 
 
 def setup_platform(
@@ -41,12 +75,16 @@ def setup_platform(
     try:
         address = config[CONF_ADDRESS]
         pin = config[CONF_PIN]
+        bus = int(config.get(CONF_BUS, DEFAULT_BUS))
+        debounce = int(config.get(CONF_DEBOUNCE, DEFAULT_DEBOUNCE))
 
         add_entities(
             [
                 SweetHomeBinarySensor(
                     int(address, 16),
-                    int(pin)
+                    int(pin),
+                    bus,
+                    debounce,
                 )
             ],
             True,
@@ -55,29 +93,84 @@ def setup_platform(
         _LOGGER.error("Error setting up binary sensor: %s", err)
 
 
-class SweetHomeBinarySensor(BinarySensorEntity):
-    """Representation of a Sweet Home binary sensor."""
+class SweetHomeBinarySensor(BinarySensorEntity, RestoreEntity):
+    """Representation of a Sweet Home binary sensor.
+
+    Shows the state persisted before the restart until its chip comes online
+    and the startup snapshot provides the real level.
+    """
     
-    def __init__(self, address: int, pin: int) -> None:
-        """Initialize the binary sensor."""
+    def __init__(
+        self,
+        address: int,
+        pin: int,
+        bus: int = DEFAULT_BUS,
+        debounce: int = DEFAULT_DEBOUNCE,
+        name: str | None = None,
+        satellite: str | None = None,
+    ) -> None:
+        """Initialize the binary sensor.
+
+        A sensor on a satellite node is fed by its SatelliteClient instead
+        of a local bus.
+        """
         super().__init__()
+        self.bus = bus
+        self.debounce = debounce
         self.address = address
         self.pin = pin
+        self.satellite = satellite
         self._attr_should_poll = False
         self._attr_device_class = BinarySensorDeviceClass.DOOR
-        self._attr_unique_id = f"{DOMAIN}-{hex(address)}-{pin}"
-        self._attr_name = f"Binary sensor {hex(address)}-{pin}"
+        if satellite is not None:
+            self._attr_unique_id = f"{DOMAIN}-{satellite}-{bus}-{hex(address)}-{pin}"
+            self._attr_name = f"Binary sensor {satellite} {bus}-{hex(address)}-{pin}"
+        elif bus == DEFAULT_BUS:
+            # Keep the original ids for sensors on the default bus
+            self._attr_unique_id = f"{DOMAIN}-{hex(address)}-{pin}"
+            self._attr_name = f"Binary sensor {hex(address)}-{pin}"
+        else:
+            self._attr_unique_id = f"{DOMAIN}-{bus}-{hex(address)}-{pin}"
+            self._attr_name = f"Binary sensor {bus}-{hex(address)}-{pin}"
+        if name:
+            self._attr_name = name
 
-        # Register with MCP23017 handler
-        from .mcp23017 import addBynarySensor
-        addBynarySensor(self)
+        if satellite is None:
+            # Register with MCP23017 handler
+            from .mcp23017 import addBynarySensor
+            addBynarySensor(self)
 
-    def onChange(self, value: int) -> None:
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
         """Handle value change from MCP23017."""
         self._attr_is_on = value > 0
-        self.schedule_update_ha_state()
+        if self.hass is not None:
+            bridge.write_state(self)
         
+    def set_available(self, available: bool) -> None:
+        """Called while the chip is offline after repeated I2C failures."""
+        if self._attr_available == available:
+            return
+        self._attr_available = available
+        if self.hass is not None:
+            bridge.write_state(self)
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known state if the chip has not reported yet."""
+        await super().async_added_to_hass()
+        if self._attr_is_on is not None:
+            return
+        last_state = await self.async_get_last_state()
+        # The snapshot may have arrived while waiting, it wins
+        if (
+            self._attr_is_on is None
+            and last_state is not None
+            and last_state.state in (STATE_ON, STATE_OFF)
+        ):
+            self._attr_is_on = last_state.state == STATE_ON
+
     async def async_will_remove_from_hass(self) -> None:
-        """Clean up when entity is removed."""
-        # Remove from MCP23017 handler if needed
-        pass
\ No newline at end of file
+        """Stop handling the pin, e.g. when removed in the options."""
+        if self.satellite is not None:
+            return
+        from .mcp23017 import removeBinarySensor
+        removeBinarySensor(self)
\ No newline at end of file
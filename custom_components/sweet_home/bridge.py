@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import threading as th
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from .scheduler import Deadline, loop_scheduler, scheduler
+from .stats import pipeline_stats
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EventBridge:
+    """Hands decoded pin changes to the HA event loop in batches.
+
+    The bus workers only do I2C and debouncing. Gesture and sensor updates are
+    queued with call() and run in the loop, together with the events and
+    state writes they produce. Everything queued during one interrupt service
+    pass (begin/end), or within the configured micro-window, is delivered by a
+    single loop callback instead of one cross-thread wake-up per change.
+    """
+
+    def __init__(self) -> None:
+        self.hass: HomeAssistant | None = None
+        self.window = 0.0  # seconds, 0 delivers at the end of every pass
+        self._lock = th.Lock()
+        self._local = th.local()
+        # Items carry the GPIO edge time they originate from, or None
+        self._calls: list[tuple[Callable[..., None], tuple, float | None]] = []
+        self._events: list[tuple[str, dict[str, Any], float | None]] = []
+        self._entities: dict[int, tuple[Entity, float | None]] = {}
+        self._flush_timer: Deadline | None = None
+
+        self.deliveries = 0  # loop wake-ups actually used
+        self.items = 0  # events and state writes delivered
+
+    @property
+    def saved_wakeups(self) -> int:
+        """Loop wake-ups avoided compared to one per item."""
+        return self.items - self.deliveries
+
+    def setup(self, hass: HomeAssistant, window: float = 0.0) -> None:
+        self.hass = hass
+        self.window = window
+        loop_scheduler.loop = hass.loop
+
+    def begin(self) -> None:
+        """Start a pass, items are held until the matching end()."""
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+
+    def end(self) -> None:
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._local.edge_time = None
+            if not self.window:
+                self.flush()
+
+    def set_edge_time(self, timestamp: float) -> None:
+        """Tag items queued from now on in this thread with their edge time."""
+        self._local.edge_time = timestamp
+
+    def call(self, callback: Callable[..., None], *args: Any) -> None:
+        """Run callback(*args) in the loop with the rest of this pass."""
+        edge_time = getattr(self._local, "edge_time", None)
+        with self._lock:
+            self._calls.append((callback, args, edge_time))
+        self._queued()
+
+    def fire_event(self, event_type: str, data: dict[str, Any]) -> None:
+        edge_time = getattr(self._local, "edge_time", None)
+        delivery = getattr(self._local, "delivery", None)
+        if delivery is not None:
+            # Raised by a call being delivered, goes out with it
+            delivery[0].append((event_type, data, edge_time))
+            return
+        with self._lock:
+            self._events.append((event_type, data, edge_time))
+        self._queued()
+
+    def write_state(self, entity: Entity) -> None:
+        edge_time = getattr(self._local, "edge_time", None)
+        delivery = getattr(self._local, "delivery", None)
+        if delivery is not None:
+            delivery[1].setdefault(id(entity), (entity, edge_time))
+            return
+        with self._lock:
+            self._entities.setdefault(id(entity), (entity, edge_time))
+        self._queued()
+
+    def _queued(self) -> None:
+        if self.window:
+            with self._lock:
+                if self._flush_timer is None:
+                    self._flush_timer = scheduler.call_later(self.window, self.flush)
+        elif not getattr(self._local, "depth", 0):
+            self.flush()
+
+    def flush(self) -> None:
+        """Deliver everything queued so far with one loop callback."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._calls and not self._events and not self._entities:
+                return
+            calls, self._calls = self._calls, []
+            events, self._events = self._events, []
+            entities, self._entities = self._entities, {}
+            self.deliveries += 1
+
+        if self.hass is None:
+            return
+        self.hass.loop.call_soon_threadsafe(self._deliver, calls, events, entities)
+
+    def _deliver(self, calls, events, entities) -> None:
+        local = self._local
+        local.delivery = (events, entities)
+        try:
+            for call, args, edge_time in calls:
+                local.edge_time = edge_time
+                try:
+                    call(*args)
+                except Exception as e:
+                    _LOGGER.error(f"Error handling pin change: {e}")
+        finally:
+            local.delivery = None
+            local.edge_time = None
+        self.items += len(events) + len(entities)
+
+        edge_to_event = pipeline_stats.edge_to_event
+        for event_type, data, edge_time in events:
+            self.hass.bus.async_fire(event_type, data)
+            if edge_time is not None:
+                edge_to_event.record(time.monotonic() - edge_time)
+        for entity, edge_time in entities.values():
+            if entity.hass is not None:
+                entity.async_write_ha_state()
+                if edge_time is not None:
+                    edge_to_event.record(time.monotonic() - edge_time)
+
+    def stop(self) -> None:
+        self.flush()
+        _LOGGER.info(
+            f"Event bridge delivered {self.items} updates in {self.deliveries} loop wake-ups, saved {self.saved_wakeups}"
+        )
+
+
+bridge = EventBridge()
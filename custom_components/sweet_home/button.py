@@ -1,35 +1,40 @@
+from __future__ import annotations
+
 import time
-import threading as th
-from homeassistant.core import HomeAssistant
-from homeassistant.util.async_ import run_callback_threadsafe
+from typing import TYPE_CHECKING
 
-from homeassistant.const import CONF_DEVICE_ID, CONF_TYPE
-from .const import (
-    EVENT_TYPE,
-    CONF_SUBTYPE,
-    EVENT_DOUBLE_PRESS,
-    EVENT_SINGLE_PRESS,
-    EVENT_LONG_PRESS,
-    EVENT_TRIPLE_PRESS,
-)
+from .const import DEFAULT_BUS, DEFAULT_DEBOUNCE
+from .gesture import NEXT_PRESS_THRESHOLD, GestureEngine
 
-NEXT_PRESS_THRESHOLD = 300  # milliseconds
-LONG_PRESS_THRESHOLD = 1000  # milliseconds
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
 
 
 class Button:
+    """A configured button, a view onto its pin in the chip's GestureEngine.
+
+    The bus dispatches whole ports to the engine; onChange feeds a single
+    pin and serves callers that work pin by pin.
+    """
+
     hass: HomeAssistant = None
     device_id: str
     subtype: str
 
+    bus: int = None
     address: int = None
     pin: int = None
     presses: int = 1
-    pressed_time: float = 0
-    pressed_count: int = 0
+    debounce: int = DEFAULT_DEBOUNCE
+    next_press: int = NEXT_PRESS_THRESHOLD
+    # Stop at the press count the attached triggers use, see active_presses
+    fire_early: bool = False
+    # Highest press count an automation waits for, None when unknown
+    demand: int | None = None
+    # Name of the satellite node serving the pin, None for a local chip
+    satellite: str | None = None
 
-    longPressTimer: th.Timer = None
-    nextPressTimer: th.Timer = None
+    engine: GestureEngine = None
 
     def __init__(
         self,
@@ -39,85 +44,63 @@ class Button:
         address: int,
         pin: int,
         presses: int,
+        bus: int = DEFAULT_BUS,
+        debounce: int = DEFAULT_DEBOUNCE,
+        next_press: int = NEXT_PRESS_THRESHOLD,
+        fire_early: bool = False,
     ) -> None:
         self.hass = hass
         self.device_id = device_id
         self.subtype = subtype
 
+        self.bus = bus
         self.address = address
         self.pin = pin
         self.presses = presses
+        self.debounce = debounce
+        self.next_press = next_press
+        self.fire_early = fire_early
+
+    @property
+    def active_presses(self) -> int:
+        """Presses after which the gesture fires without waiting for more.
+
+        When the demand is known and no automation waits for a double or
+        triple press, a single press fires on release. The demand is only
+        set for buttons with fire_early.
+        """
+        if self.demand is None:
+            return self.presses
+        return max(1, min(self.presses, self.demand))
+
+    def set_demand(self, demand: int | None) -> None:
+        self.demand = demand
+        if self.engine is not None:
+            self.engine.set_presses(self.pin, self.active_presses)
+
+    @property
+    def pressed_time(self) -> float:
+        if self.engine is None or not self.engine.held & (1 << self.pin):
+            return 0
+        return self.engine.pressed_time[self.pin]
+
+    @property
+    def pressed_count(self) -> int:
+        return 0 if self.engine is None else self.engine.counts[self.pin]
+
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
+        """Feed a level change observed at timestamp (time.monotonic() clock)."""
+        if self.engine is None:
+            GestureEngine(self.bus, self.address).attach(self)
+        bit = 1 << self.pin
+        self.engine.update(bit, bit if value else 0, timestamp if timestamp is not None else time.monotonic())
+
+    def cancel(self) -> None:
+        """Drop the gesture in progress, e.g. when it became part of a chord."""
+        if self.engine is not None:
+            self.engine.cancel(1 << self.pin)
 
-    def __reset(self) -> None:
-        self.pressed_time = 0
-        self.pressed_count = 0
-        self.__resetLongPressTimer()
-        self.__resetNextPressTimer()
-
-    def __resetLongPressTimer(self) -> None:
-        if self.longPressTimer is not None:
-            self.longPressTimer.cancel()
-            self.longPressTimer = None
-
-    def __resetNextPressTimer(self) -> None:
-        if self.nextPressTimer is not None:
-            self.nextPressTimer.cancel()
-            self.nextPressTimer = None
-
-    def __executeLongPress(self) -> None:
-        self.__fireHassEvent(EVENT_LONG_PRESS)
-        # print("fire long press {}".format(self.pressed_count))
-        self.__reset()
-
-    def __execPresses(self) -> None:
-        event_type = EVENT_SINGLE_PRESS
-        if (self.pressed_count == 2):
-            event_type = EVENT_DOUBLE_PRESS
-        elif (self.pressed_count == 3):
-            event_type = EVENT_TRIPLE_PRESS
-
-        self.__fireHassEvent(event_type)
-        self.__reset()
-
-    def __fireHassEvent(self, type: str):
-        # Fire event
-        data = {
-            CONF_DEVICE_ID: self.device_id,
-            CONF_TYPE: type,
-            CONF_SUBTYPE: self.subtype,
-        }
-        # Use async_add_job to ensure the event is fired within the event loop
-        run_callback_threadsafe(
-            self.hass.loop,
-            self.hass.bus.async_fire,
-            EVENT_TYPE,
-            data
-        )
-        # self.hass.async_add_job(self.hass.bus.async_fire, EVENT_TYPE, data)
-
-    def onChange(self, value: int) -> None:
-        if value == 0:
-            self.pressed_time = time.time()
-            self.pressed_count += 1
-            self.__resetNextPressTimer()
-            self.longPressTimer = th.Timer(
-                LONG_PRESS_THRESHOLD / 1000, self.__executeLongPress
-            )
-            self.longPressTimer.start()
-        elif self.pressed_time > 0:
-            duration = (time.time() - self.pressed_time) * 1000  # Convert to milliseconds
-            self.pressed_time = 0
-            self.__resetLongPressTimer()
-            if duration < LONG_PRESS_THRESHOLD:
-                if self.presses == self.pressed_count:
-                    self.__execPresses()
-                else:
-                    self.nextPressTimer = th.Timer(
-                        NEXT_PRESS_THRESHOLD / 1000, self.__execPresses
-                    )
-                    self.nextPressTimer.start()
-                    
     def cleanup(self) -> None:
-        """Clean up timers on integration unload."""
-        self.__resetLongPressTimer()
-        self.__resetNextPressTimer()
+        """Stop serving the pin on integration unload or reload."""
+        if self.engine is not None:
+            self.engine.detach(self)
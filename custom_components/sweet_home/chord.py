@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from .bridge import bridge
+from .button import Button
+from .const import (
+    CONF_DEVICE_ID,
+    CONF_SUBTYPE,
+    CONF_TYPE,
+    EVENT_LONG_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TYPE,
+)
+from .gesture import LONG_PRESS_THRESHOLD
+from .scheduler import loop_scheduler
+
+DEFAULT_CHORD_WINDOW = 50  # milliseconds
+
+
+class Chord:
+    """Several buttons of one chip pressed together.
+
+    Fed in the event loop with the accepted pin levels of the whole chip
+    after every interrupt read. When all members go down within the window
+    the chord engages: the members' own gestures are cancelled, releasing
+    fires single_press and holding past the long-press threshold fires
+    long_press, both with the "button_1+button_2" style subtype.
+    """
+
+    def __init__(self, device_id: str, members: list[Button], window: int = DEFAULT_CHORD_WINDOW) -> None:
+        self.device_id = device_id
+        self.members = members
+        self.window = window
+        self.subtype = "+".join(b.subtype for b in members)
+
+        self.bus = members[0].bus
+        self.address = members[0].address
+        self.mask = 0
+        for b in members:
+            self.mask |= 1 << b.pin
+
+        self.first_press: float | None = None
+        self.engaged = False
+        self.fired = False
+        self.longPressTimer: asyncio.TimerHandle | None = None
+
+    def update(self, pressed: int, timestamp: float) -> None:
+        """pressed has a bit set for every pin of the chip that is held down."""
+        pressed &= self.mask
+        if not pressed:
+            if self.engaged and not self.fired:
+                self.__fire(EVENT_SINGLE_PRESS)
+            self.__reset()
+            return
+
+        if self.engaged:
+            if pressed != self.mask and not self.fired:
+                # First member released, the chord is complete
+                self.__cancelLongPress()
+                self.__fire(EVENT_SINGLE_PRESS)
+                self.fired = True
+            for b in self.members:
+                b.cancel()
+            return
+
+        if self.first_press is None:
+            self.first_press = timestamp
+        if pressed == self.mask and (timestamp - self.first_press) * 1000 <= self.window:
+            self.engaged = True
+            for b in self.members:
+                b.cancel()
+            delay = LONG_PRESS_THRESHOLD / 1000 - (time.monotonic() - timestamp)
+            self.longPressTimer = loop_scheduler.call_later(max(0.0, delay), self.__executeLongPress)
+
+    def __executeLongPress(self) -> None:
+        self.longPressTimer = None
+        if self.engaged and not self.fired:
+            self.fired = True
+            self.__fire(EVENT_LONG_PRESS)
+
+    def __cancelLongPress(self) -> None:
+        if self.longPressTimer is not None:
+            self.longPressTimer.cancel()
+            self.longPressTimer = None
+
+    def __reset(self) -> None:
+        self.__cancelLongPress()
+        self.first_press = None
+        self.engaged = False
+        self.fired = False
+
+    def __fire(self, type: str) -> None:
+        bridge.fire_event(
+            EVENT_TYPE,
+            {
+                CONF_DEVICE_ID: self.device_id,
+                CONF_TYPE: type,
+                CONF_SUBTYPE: self.subtype,
+            },
+        )
+
+    def cleanup(self) -> None:
+        self.__reset()
@@ -7,12 +7,116 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN  # pylint:disable=unused-import
+from .const import (  # pylint:disable=unused-import
+    CONF_ADDRESS,
+    CONF_BINARY_SENSORS,
+    CONF_BUS,
+    CONF_BUSES,
+    CONF_BUTTONS,
+    CONF_CHIPS,
+    CONF_DEBOUNCE,
+    CONF_FIRE_EARLY,
+    CONF_ID,
+    CONF_INTERRUPT_PIN,
+    CONF_INVENTORY,
+    CONF_NAME,
+    CONF_PIN,
+    CONF_PRESS_COUNT,
+    CONF_REGISTERS,
+    CONF_SWITCHES,
+    DATA_KEY_CONFIG,
+    DEFAULT_BUSES,
+    DEFAULT_DEBOUNCE,
+    DOMAIN,
+    EVENT_DOUBLE_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TRIPLE_PRESS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+CONF_ITEMS = "items"
+
+# Interrupt pins suggested for the chips of the default wiring
+DEFAULT_INTERRUPT_PINS = {
+    (bus[CONF_BUS], int(chip[CONF_ADDRESS], 16)): chip[CONF_INTERRUPT_PIN]
+    for bus in DEFAULT_BUSES
+    for chip in bus[CONF_CHIPS]
+}
+
+
+def chip_key(bus: int, address: int) -> str:
+    return f"{hex(address)} on bus {bus}"
+
+
+def pin_key(bus: int, address: int, pin: int) -> str:
+    return f"{bus}-{hex(address)}-{pin}"
+
+
+def pin_label(bus: int, address: int, pin: int) -> str:
+    port = "GPA" if pin < 8 else "GPB"
+    return f"Bus {bus}, {hex(address)}, pin {pin} ({port}{pin % 8})"
+
+
+def inventory_data(found: dict[int, dict[int, list[int]]]) -> list[dict]:
+    """Scan result as stored in the entry: the chips and register file per bus."""
+    return [
+        {
+            CONF_BUS: number,
+            CONF_CHIPS: [
+                {CONF_ADDRESS: hex(address), CONF_REGISTERS: registers}
+                for address, registers in sorted(chips.items())
+            ],
+        }
+        for number, chips in sorted(found.items())
+    ]
+
+
+def chips_schema(chips: list[tuple[int, int]]) -> vol.Schema:
+    """One interrupt pin field per chip, left empty the chip is not used."""
+    fields = {}
+    for bus, address in chips:
+        pin = DEFAULT_INTERRUPT_PINS.get((bus, address))
+        key = (
+            vol.Optional(chip_key(bus, address))
+            if pin is None
+            else vol.Optional(chip_key(bus, address), description={"suggested_value": pin})
+        )
+        fields[key] = vol.All(vol.Coerce(int), vol.Range(min=0))
+    return vol.Schema(fields)
+
+
+def add_chips(buses: list[dict], chips: list[tuple[int, int]], user_input: dict) -> list[dict]:
+    """Return buses with the chips an interrupt pin was entered for added."""
+    by_bus = {bus[CONF_BUS]: list(bus[CONF_CHIPS]) for bus in buses}
+    for bus, address in chips:
+        interrupt_pin = user_input.get(chip_key(bus, address))
+        if interrupt_pin is not None:
+            by_bus.setdefault(bus, []).append(
+                {CONF_ADDRESS: hex(address), CONF_INTERRUPT_PIN: interrupt_pin}
+            )
+    return [
+        {CONF_BUS: number, CONF_CHIPS: chips}
+        for number, chips in sorted(by_bus.items())
+        if chips
+    ]
+
+
+async def async_scan(hass: HomeAssistant) -> dict[int, dict[int, list[int]]]:
+    from .mcp23017 import scan
+
+    found = await hass.async_add_executor_job(scan)
+    _LOGGER.info(
+        "Found MCP23017 chips: %s",
+        ", ".join(chip_key(bus, address) for bus, chips in found.items() for address in chips)
+        or "none",
+    )
+    return found
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Sweet Home."""
 
@@ -20,6 +124,213 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     # Sweet Home integration uses local push for real-time button and sensor updates
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
 
+    def __init__(self) -> None:
+        self.found: dict[int, dict[int, list[int]]] | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
-        return self.async_create_entry(title="Sweet Home", data={})
+        """Scan the I2C buses and ask for the interrupt pin of every chip found."""
+        if self._async_current_entries():
+            return self.async_abort(reason="single_instance_allowed")
+        if self.found is None:
+            self.found = await async_scan(self.hass)
+        chips = [(bus, address) for bus, found in self.found.items() for address in found]
+        if user_input is None and chips:
+            return self.async_show_form(step_id="user", data_schema=chips_schema(chips))
+
+        # Also reached when nothing was found, e.g. on a machine without I2C,
+        # the chips then come from YAML
+        return self.async_create_entry(
+            title="Sweet Home",
+            data={
+                CONF_BUSES: add_chips([], chips, user_input or {}),
+                CONF_INVENTORY: inventory_data(self.found),
+            },
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Assign free pins to switches and binary sensors, or rescan the buses."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self.entry = config_entry
+        self.options = dict(config_entry.options)
+        self.found: dict[int, dict[int, list[int]]] | None = None
+
+    def free_pins(self) -> dict[str, str]:
+        """Input pins of every configured chip not used by anything yet."""
+        from . import entry_config, get_bus_configs
+        from .mcp23017 import PINS_PER_CHIP, buses, get_pin_index
+
+        yaml_config = self.hass.data.get(DOMAIN, {}).get(DATA_KEY_CONFIG, {})
+        config = entry_config(self.entry, yaml_config)
+        used = {
+            (button[CONF_BUS], int(button[CONF_ADDRESS], 16), int(button[CONF_PIN]))
+            for switch in config[CONF_SWITCHES]
+            for button in switch[CONF_BUTTONS]
+        }
+        used.update(
+            (sensor[CONF_BUS], int(sensor[CONF_ADDRESS], 16), int(sensor[CONF_PIN]))
+            for sensor in self.options.get(CONF_BINARY_SENSORS, [])
+        )
+        pins = {}
+        for bus_config in get_bus_configs(config):
+            bus = buses.get(bus_config["bus"])
+            for address in sorted(bus_config["chips"]):
+                for pin in range(PINS_PER_CHIP):
+                    if (bus_config["bus"], address, pin) in used:
+                        continue
+                    if bus is not None:
+                        # YAML binary sensors, switches and lights
+                        idx = get_pin_index(address, pin)
+                        if bus.pin_sensors[idx] is not None or bus.pin_outputs[idx] is not None:
+                            continue
+                    key = pin_key(bus_config["bus"], address, pin)
+                    pins[key] = pin_label(bus_config["bus"], address, pin)
+        return pins
+
+    async def async_step_init(self, user_input=None):
+        return self.async_show_menu(
+            step_id="init", menu_options=["switch", "binary_sensor", "remove", "rescan"]
+        )
+
+    async def async_step_switch(self, user_input=None):
+        """A switch device with one button per selected pin, in pin order."""
+        errors = {}
+        pins = self.free_pins()
+        if user_input is not None:
+            from . import entry_config
+
+            yaml_config = self.hass.data.get(DOMAIN, {}).get(DATA_KEY_CONFIG, {})
+            ids = {switch[CONF_ID] for switch in entry_config(self.entry, yaml_config)[CONF_SWITCHES]}
+            if user_input[CONF_ID] in ids:
+                errors[CONF_ID] = "id_exists"
+            elif not user_input[CONF_BUTTONS]:
+                errors[CONF_BUTTONS] = "no_pins"
+            else:
+                buttons = []
+                selected = set(user_input[CONF_BUTTONS])
+                for key in (key for key in pins if key in selected):
+                    bus, address, pin = key.split("-")
+                    buttons.append(
+                        {
+                            CONF_BUS: int(bus),
+                            CONF_ADDRESS: address,
+                            CONF_PIN: pin,
+                            CONF_PRESS_COUNT: user_input[CONF_PRESS_COUNT],
+                            CONF_FIRE_EARLY: user_input[CONF_FIRE_EARLY],
+                        }
+                    )
+                switch = {
+                    CONF_NAME: user_input[CONF_NAME],
+                    CONF_ID: user_input[CONF_ID],
+                    CONF_BUTTONS: buttons,
+                }
+                self.options[CONF_SWITCHES] = self.options.get(CONF_SWITCHES, []) + [switch]
+                return self.async_create_entry(title="", data=self.options)
+
+        return self.async_show_form(
+            step_id="switch",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NAME): cv.string,
+                    vol.Required(CONF_ID): cv.string,
+                    vol.Required(CONF_BUTTONS): cv.multi_select(pins),
+                    vol.Optional(CONF_PRESS_COUNT, default=EVENT_SINGLE_PRESS): vol.In(
+                        [EVENT_SINGLE_PRESS, EVENT_DOUBLE_PRESS, EVENT_TRIPLE_PRESS]
+                    ),
+                    vol.Optional(CONF_FIRE_EARLY, default=False): cv.boolean,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_binary_sensor(self, user_input=None):
+        pins = self.free_pins()
+        if user_input is not None:
+            bus, address, pin = user_input[CONF_PIN].split("-")
+            sensor = {
+                CONF_BUS: int(bus),
+                CONF_ADDRESS: address,
+                CONF_PIN: pin,
+                CONF_DEBOUNCE: user_input[CONF_DEBOUNCE],
+            }
+            if user_input.get(CONF_NAME):
+                sensor[CONF_NAME] = user_input[CONF_NAME]
+            self.options[CONF_BINARY_SENSORS] = self.options.get(CONF_BINARY_SENSORS, []) + [
+                sensor
+            ]
+            return self.async_create_entry(title="", data=self.options)
+
+        return self.async_show_form(
+            step_id="binary_sensor",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_NAME): cv.string,
+                    vol.Required(CONF_PIN): vol.In(pins),
+                    vol.Optional(CONF_DEBOUNCE, default=DEFAULT_DEBOUNCE): vol.All(
+                        vol.Coerce(int), vol.Range(min=0)
+                    ),
+                }
+            ),
+        )
+
+    async def async_step_remove(self, user_input=None):
+        """Drop switches and binary sensors added in the options."""
+        switches = self.options.get(CONF_SWITCHES, [])
+        sensors = self.options.get(CONF_BINARY_SENSORS, [])
+        items = {f"switch-{switch[CONF_ID]}": switch[CONF_NAME] for switch in switches}
+        for sensor in sensors:
+            key = pin_key(sensor[CONF_BUS], int(sensor[CONF_ADDRESS], 16), int(sensor[CONF_PIN]))
+            items[f"sensor-{key}"] = sensor.get(CONF_NAME) or f"Binary sensor {key}"
+        if user_input is not None:
+            selected = set(user_input[CONF_ITEMS])
+            self.options[CONF_SWITCHES] = [
+                switch for switch in switches if f"switch-{switch[CONF_ID]}" not in selected
+            ]
+            self.options[CONF_BINARY_SENSORS] = [
+                sensor
+                for sensor in sensors
+                if "sensor-"
+                + pin_key(sensor[CONF_BUS], int(sensor[CONF_ADDRESS], 16), int(sensor[CONF_PIN]))
+                not in selected
+            ]
+            return self.async_create_entry(title="", data=self.options)
+
+        return self.async_show_form(
+            step_id="remove",
+            data_schema=vol.Schema({vol.Optional(CONF_ITEMS, default=[]): cv.multi_select(items)}),
+        )
+
+    async def async_step_rescan(self, user_input=None):
+        """Refresh the chip inventory, asking for the interrupt pin of new chips."""
+        if self.found is None:
+            self.found = await async_scan(self.hass)
+        buses = self.entry.data.get(CONF_BUSES, [])
+        configured = {
+            (bus[CONF_BUS], int(chip[CONF_ADDRESS], 16))
+            for bus in buses
+            for chip in bus[CONF_CHIPS]
+        }
+        chips = [
+            (bus, address)
+            for bus, found in self.found.items()
+            for address in found
+            if (bus, address) not in configured
+        ]
+        if user_input is None and chips:
+            return self.async_show_form(step_id="rescan", data_schema=chips_schema(chips))
+
+        self.hass.config_entries.async_update_entry(
+            self.entry,
+            data={
+                **self.entry.data,
+                CONF_BUSES: add_chips(buses, chips, user_input or {}),
+                CONF_INVENTORY: inventory_data(self.found),
+            },
+        )
+        return self.async_create_entry(title="", data=self.options)
@@ -5,18 +5,77 @@ CONFIG = "config"
 CONF_SWITCHES = "switches"
 CONF_ID = "id"
 CONF_BUTTONS = "buttons"
+CONF_CHORDS = "chords"
+CONF_WINDOW = "window"
 CONF_ADDRESS = "address"
 CONF_PIN = "pin"
 CONF_NAME = "name"
 CONF_PRESS_COUNT = "press_count"
+CONF_BUS = "bus"
+CONF_BUSES = "buses"
+CONF_CHIPS = "chips"
+CONF_INVENTORY = "inventory"
+CONF_REGISTERS = "registers"
+CONF_BINARY_SENSORS = "binary_sensors"
+CONF_INTERRUPT_PIN = "interrupt_pin"
+CONF_INVERT = "invert"
+CONF_DEBOUNCE = "debounce"
+CONF_NEXT_PRESS_THRESHOLD = "next_press_threshold"
+CONF_FIRE_EARLY = "fire_early"
+CONF_EVENT_WINDOW = "event_window"
+CONF_GPIO_BACKEND = "gpio_backend"
+CONF_GPIO_CHIP = "gpio_chip"
+CONF_JOURNAL_SIZE = "journal_size"
+CONF_PATH = "path"
+CONF_DURATION = "duration"
+CONF_INTERVAL = "interval"
+CONF_SATELLITES = "satellites"
+CONF_HOST = "host"
+CONF_PORT = "port"
+CONF_TOKEN = "token"
 
+GPIO_BACKEND_RPI_GPIO = "rpi_gpio"
+GPIO_BACKEND_GPIOD = "gpiod"
+
+DEFAULT_BUS = 1
+DEFAULT_DEBOUNCE = 10  # milliseconds
+DEFAULT_EVENT_WINDOW = 0  # milliseconds, 0 = one delivery per interrupt pass
+DEFAULT_GPIO_BACKEND = GPIO_BACKEND_RPI_GPIO
+DEFAULT_GPIO_CHIP = "/dev/gpiochip0"  # /dev/gpiochip4 on a Raspberry Pi 5
+DEFAULT_JOURNAL_SIZE = 0  # transitions kept for dump_journal, 0 = off
+DEFAULT_PROFILE_DURATION = 10  # seconds
+MAX_PROFILE_DURATION = 300
+DEFAULT_SATELLITE_PORT = 7017
+DEFAULT_BUSES = [
+    {
+        CONF_BUS: DEFAULT_BUS,
+        CONF_CHIPS: [
+            {CONF_ADDRESS: "0x20", CONF_INTERRUPT_PIN: 27},  # pin 13 / 7
+            {CONF_ADDRESS: "0x21", CONF_INTERRUPT_PIN: 22},  # pin 15 / 8
+        ],
+    }
+]
+
+# Same keys as in homeassistant.const, for the modules a satellite node
+# imports without Home Assistant installed
+CONF_DEVICE_ID = "device_id"
+CONF_TYPE = "type"
 CONF_SUBTYPE = "subtype"
 
 DATA_KEY_BUTTONS = "buttons"
 DATA_KEY_CONFIG = "config"
+DATA_KEY_TRIGGERS = "triggers"
+DATA_KEY_CHORDS = "chords"
+DATA_KEY_SENSORS = "sensors"
+DATA_KEY_SATELLITES = "satellites"
+DATA_KEY_PLATFORMS = "platforms"
 
 EVENT_TYPE = DOMAIN + "_event"
 
+SERVICE_RELOAD = "reload"
+SERVICE_DUMP_JOURNAL = "dump_journal"
+SERVICE_PROFILE = "profile"
+
 EVENT_SINGLE_PRESS = "single_press"
 EVENT_DOUBLE_PRESS = "double_press"
 EVENT_TRIPLE_PRESS = "triple_press"
@@ -0,0 +1,65 @@
+import math
+
+
+class Debouncer:
+    """Per-pin leading-edge debounce over whole port bytes.
+
+    A change on a quiet pin is accepted immediately. Any further activity on
+    that pin within its stable time is held back and extends the quiet window;
+    once the pin has been quiet for the stable time the port is re-read
+    (settled) and the final level is accepted if it differs from the last
+    accepted one. Nothing here sleeps, time comes from the edge timestamps.
+    """
+
+    def __init__(self, pins: int, stable_time: float) -> None:
+        self.stable_times = [stable_time] * pins
+        # End of the quiet window of every pin
+        self.quiet_until = [-math.inf] * pins
+        # Last accepted value of every port
+        self.state = [0xFF] * (pins // 8)
+        # port index -> time when the port has to be settled
+        self.pending: dict[int, float] = {}
+
+    def update(self, port_index: int, data: int, timestamp: float, flags: int = 0) -> int:
+        """Feed a port value, return the mask of bits accepted as changed.
+
+        flags are the INTF bits of the port, they mark pins that toggled even
+        if they are back at the accepted level by the time of the read.
+        """
+        changed = self.state[port_index] ^ data
+        active = changed | flags
+        accepted = 0
+        base = port_index << 3
+        quiet_until = self.quiet_until
+
+        while active:
+            bit = active & -active
+            active ^= bit
+            idx = base + bit.bit_length() - 1
+
+            if changed & bit and timestamp >= quiet_until[idx]:
+                accepted |= bit
+            elif changed & bit:
+                # Chatter inside the quiet window, re-check once it is over
+                deadline = quiet_until[idx] = timestamp + self.stable_times[idx]
+                if deadline > self.pending.get(port_index, -math.inf):
+                    self.pending[port_index] = deadline
+                continue
+
+            quiet_until[idx] = timestamp + self.stable_times[idx]
+
+        self.state[port_index] ^= accepted
+        return accepted
+
+    def next_timeout(self, now: float) -> float | None:
+        """Seconds until the earliest pending settle, None if nothing is pending."""
+        if not self.pending:
+            return None
+        return max(0.0, min(self.pending.values()) - now)
+
+    def pop_due(self, now: float) -> list[int]:
+        """Remove and return the port indexes that have to be settled now."""
+        due = [port for port, deadline in self.pending.items() if deadline <= now]
+        for port in due:
+            del self.pending[port]
+        return due
@@ -12,10 +12,12 @@ from .const import (
     EVENT_TRIPLE_PRESS,
     EVENT_LONG_PRESS,
     DATA_KEY_BUTTONS,
+    DATA_KEY_CHORDS,
+    DATA_KEY_TRIGGERS,
     CONF_SUBTYPE,
-    EVENT_TYPE,
 )
 from .button import Button
+from .dispatcher import dispatcher
 
 from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
 import voluptuous as vol
@@ -25,7 +27,6 @@ from homeassistant.helpers.device_registry import DeviceEntry
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 
-from homeassistant.components.homeassistant.triggers import event as event_trigger
 from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
 
 _LOGGER = logging.getLogger(__name__)
@@ -46,6 +47,13 @@ async def async_get_triggers(hass, device_id):
     if DOMAIN not in hass.data:
         return []
 
+    # Cached per device until the button list of the device is replaced
+    buttons: dict[str, list[Button]] = hass.data[DOMAIN].get(DATA_KEY_BUTTONS, {})
+    cache = hass.data[DOMAIN].setdefault(DATA_KEY_TRIGGERS, {})
+    cached = cache.get(device_id)
+    if cached is not None and device_id in buttons and cached[0] is buttons[device_id]:
+        return [dict(trigger) for trigger in cached[1]]
+
     dev_reg: dr.DeviceRegistry = dr.async_get(hass)
     if (device_entry := dev_reg.async_get(device_id)) is None:
         raise ValueError(f"Device ID {device_id} is not valid")
@@ -55,7 +63,6 @@ async def async_get_triggers(hass, device_id):
         return []
 
     triggers = []
-    buttons: dict[str, list[Button]] = hass.data[DOMAIN][DATA_KEY_BUTTONS]
 
     if device_id not in buttons:
         return triggers
@@ -88,8 +95,20 @@ async def async_get_triggers(hass, device_id):
                     **trigger_base,
                     CONF_TYPE: EVENT_TRIPLE_PRESS,
                 })
+
+    for chord in hass.data[DOMAIN].get(DATA_KEY_CHORDS, {}).get(device_id, []):
+        for trigger_type in (EVENT_SINGLE_PRESS, EVENT_LONG_PRESS):
+            triggers.append({
+                CONF_PLATFORM: "device",
+                CONF_DOMAIN: DOMAIN,
+                CONF_DEVICE_ID: device_entry.id,
+                CONF_SUBTYPE: chord.subtype,
+                CONF_TYPE: trigger_type,
+            })
+
     _LOGGER.debug(f"switch {switch_id} count tiggers {len(triggers)}")
-    return triggers
+    cache[device_id] = (buttons[device_id], triggers)
+    return [dict(trigger) for trigger in triggers]
 
 async def async_attach_trigger(
         hass: HomeAssistant,
@@ -97,20 +116,14 @@ async def async_attach_trigger(
         action: TriggerActionType,
         trigger_info: TriggerInfo,
 ) -> CALLBACK_TYPE:
-    """Listen for state changes based on configuration."""
-    event_config = event_trigger.TRIGGER_SCHEMA(
-        {
-            event_trigger.CONF_PLATFORM: "event",
-            event_trigger.CONF_EVENT_TYPE: EVENT_TYPE,
-            event_trigger.CONF_EVENT_DATA: {
-                CONF_DEVICE_ID: config[CONF_DEVICE_ID],
-                CONF_TYPE: config[CONF_TYPE],
-                CONF_SUBTYPE: config[CONF_SUBTYPE],
-            },
-        }
-    )
-    return await event_trigger.async_attach_trigger(
-        hass, event_config, action, trigger_info, platform_type="device"
+    """Listen for button events matching the trigger configuration."""
+    return dispatcher.async_attach(
+        hass,
+        config[CONF_DEVICE_ID],
+        config[CONF_SUBTYPE],
+        config[CONF_TYPE],
+        action,
+        trigger_info,
     )
 
 
@@ -0,0 +1,32 @@
+"""Diagnostics support for Sweet Home."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .bridge import bridge
+from .const import DATA_KEY_SATELLITES, DOMAIN
+from .stats import pipeline_stats
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return hot path latency and counter diagnostics."""
+    from .mcp23017 import get_stats
+
+    return {
+        "pipeline": pipeline_stats.as_dict(),
+        "event_bridge": {
+            "deliveries": bridge.deliveries,
+            "items": bridge.items,
+            "saved_wakeups": bridge.saved_wakeups,
+        },
+        "chips": get_stats(),
+        "satellites": {
+            name: client.as_dict()
+            for name, client in hass.data.get(DOMAIN, {}).get(DATA_KEY_SATELLITES, {}).items()
+        },
+    }
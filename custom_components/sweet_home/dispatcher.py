@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from homeassistant.const import CONF_DEVICE_ID, CONF_TYPE
+from homeassistant.core import CALLBACK_TYPE, Event, HassJob, HomeAssistant, callback
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+
+from .const import (
+    CONF_SUBTYPE,
+    EVENT_DOUBLE_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TRIPLE_PRESS,
+    EVENT_TYPE,
+)
+
+# Presses each multi-press trigger type waits for
+PRESS_COUNTS = {EVENT_SINGLE_PRESS: 1, EVENT_DOUBLE_PRESS: 2, EVENT_TRIPLE_PRESS: 3}
+
+
+class TriggerDispatcher:
+    """Routes sweet_home events to the device triggers attached for them.
+
+    One event bus listener serves every attached trigger. Actions are kept
+    in a dict keyed by (device_id, subtype, type), so a press costs one
+    lookup instead of an event_data comparison per attached automation.
+    The same index tells buttons how many presses anything waits for.
+    """
+
+    def __init__(self) -> None:
+        self.hass: HomeAssistant | None = None
+        self.actions: dict[tuple[str, str, str], list[tuple[HassJob, dict]]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        # Called with (device_id, subtype) when press_demand() may have changed
+        self._demand_listeners: list[Callable[[str, str], None]] = []
+
+    @property
+    def attached(self) -> int:
+        return sum(len(entries) for entries in self.actions.values())
+
+    def press_demand(self, device_id: str, subtype: str) -> int | None:
+        """Highest press count a trigger of the button waits for.
+
+        None while no press trigger of the button is attached, which is also
+        the case during startup before the automations are set up.
+        """
+        demand = None
+        for event_type, presses in PRESS_COUNTS.items():
+            if (device_id, subtype, event_type) in self.actions:
+                demand = max(demand or 0, presses)
+        return demand
+
+    @callback
+    def async_listen_demand(self, listener: Callable[[str, str], None]) -> CALLBACK_TYPE:
+        self._demand_listeners.append(listener)
+
+        @callback
+        def async_remove() -> None:
+            if listener in self._demand_listeners:
+                self._demand_listeners.remove(listener)
+
+        return async_remove
+
+    def _demand_changed(self, key: tuple[str, str, str]) -> None:
+        if key[2] in PRESS_COUNTS:
+            for listener in list(self._demand_listeners):
+                listener(key[0], key[1])
+
+    @callback
+    def async_attach(
+        self,
+        hass: HomeAssistant,
+        device_id: str,
+        subtype: str,
+        event_type: str,
+        action: TriggerActionType,
+        trigger_info: TriggerInfo,
+    ) -> CALLBACK_TYPE:
+        key = (device_id, subtype, event_type)
+        entry = (HassJob(action, f"sweet_home trigger {trigger_info}"), trigger_info["trigger_data"])
+        entries = self.actions.setdefault(key, [])
+        entries.append(entry)
+        if len(entries) == 1:
+            self._demand_changed(key)
+        if self._unsub is None:
+            self.hass = hass
+            self._unsub = hass.bus.async_listen(EVENT_TYPE, self._async_handle_event)
+
+        @callback
+        def async_remove() -> None:
+            entries = self.actions.get(key)
+            if entries is None or entry not in entries:
+                return
+            entries.remove(entry)
+            if not entries:
+                del self.actions[key]
+                self._demand_changed(key)
+            if not self.actions and self._unsub is not None:
+                self._unsub()
+                self._unsub = None
+
+        return async_remove
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        data = event.data
+        entries = self.actions.get(
+            (data.get(CONF_DEVICE_ID), data.get(CONF_SUBTYPE), data.get(CONF_TYPE))
+        )
+        if not entries:
+            return
+        # Same trigger variables as the event trigger platform provides
+        description = f"event '{event.event_type}'"
+        for job, trigger_data in list(entries):
+            self.hass.async_run_hass_job(
+                job,
+                {
+                    "trigger": {
+                        **trigger_data,
+                        "platform": "device",
+                        "event": event,
+                        "description": description,
+                    }
+                },
+                event.context,
+            )
+
+
+dispatcher = TriggerDispatcher()
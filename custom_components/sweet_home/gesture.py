@@ -0,0 +1,236 @@
+"""Press gesture recognition for all buttons of a chip at once.
+
+Press state of the 16 pins is kept in bitmasks (held, waiting for a next
+press) and flat arrays (press time, deadline, press count), so one port read
+updates every pin that changed with a handful of bitwise operations. All
+pending long-press and multi-press deadlines of a chip share one loop timer,
+armed for the earliest of them.
+
+Engines are only used from the Home Assistant event loop: the bus workers
+queue port changes through the event bridge, timers are loop timers.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from array import array
+from typing import TYPE_CHECKING
+
+from .bridge import bridge
+from .const import (
+    CONF_DEVICE_ID,
+    CONF_SUBTYPE,
+    CONF_TYPE,
+    DEFAULT_BUS,
+    EVENT_DOUBLE_PRESS,
+    EVENT_LONG_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TRIPLE_PRESS,
+    EVENT_TYPE,
+)
+from .scheduler import loop_scheduler
+
+if TYPE_CHECKING:
+    from .button import Button
+
+NEXT_PRESS_THRESHOLD = 300  # milliseconds
+LONG_PRESS_THRESHOLD = 1000  # milliseconds
+
+PINS = 16
+# Deadlines this close to the clock count as due, absorbs float rounding
+DUE_SLACK = 1e-6
+
+PRESS_EVENTS = {2: EVENT_DOUBLE_PRESS, 3: EVENT_TRIPLE_PRESS}
+
+
+class GestureEngine:
+    """Single, multi and long press detection for the 16 pins of one chip.
+
+    Pins are bits 0-15 (port A then port B), a cleared level is a pressed
+    button. Button objects only supply the event identity and press count.
+    """
+
+    __slots__ = (
+        "bus",
+        "address",
+        "buttons",
+        "mask",
+        "held",
+        "waiting",
+        "pressed_time",
+        "due",
+        "counts",
+        "presses",
+        "next_press",
+        "deadline",
+        "deadline_due",
+    )
+
+    def __init__(self, bus: int = DEFAULT_BUS, address: int | None = None) -> None:
+        self.bus = bus
+        self.address = address
+        self.buttons: list[Button | None] = [None] * PINS
+        self.mask = 0  # pins with a button
+        self.held = 0  # pressed, long-press candidates
+        self.waiting = 0  # released, waiting for a next press
+        self.pressed_time = array("d", bytes(8 * PINS))
+        # Long-press time of held pins, next-press timeout of waiting pins
+        self.due = array("d", bytes(8 * PINS))
+        self.counts = array("B", bytes(PINS))
+        self.presses = array("B", bytes(PINS))
+        # Multi-press timeout per pin, seconds
+        self.next_press = array("d", [NEXT_PRESS_THRESHOLD / 1000] * PINS)
+        self.deadline: asyncio.TimerHandle | None = None
+        self.deadline_due = 0.0
+
+    def attach(self, button: Button) -> None:
+        """Serve button from now on, replacing whatever used its pin."""
+        self._clear(1 << button.pin)
+        self.buttons[button.pin] = button
+        self.presses[button.pin] = button.active_presses
+        self.next_press[button.pin] = button.next_press / 1000
+        self.mask |= 1 << button.pin
+        button.engine = self
+
+    def detach(self, button: Button) -> None:
+        if self.buttons[button.pin] is not button:
+            return
+        self._clear(1 << button.pin)
+        self.buttons[button.pin] = None
+        self.mask &= ~(1 << button.pin)
+        self._arm()
+
+    def set_presses(self, pin: int, presses: int) -> None:
+        """Change the press count at which a pin fires without waiting.
+
+        A gesture already waiting for more presses runs to its timeout.
+        """
+        self.presses[pin] = presses
+
+    def cancel(self, pins: int) -> None:
+        """Drop the gestures in progress on the pins set in pins."""
+        self._clear(pins)
+        self._arm()
+
+    def _clear(self, pins: int) -> None:
+        self.held &= ~pins
+        self.waiting &= ~pins
+        while pins:
+            bit = pins & -pins
+            pins ^= bit
+            self.counts[bit.bit_length() - 1] = 0
+
+    def update(self, changed: int, levels: int, timestamp: float) -> None:
+        """Feed the pins set in changed, now at levels, observed at timestamp.
+
+        timestamp is on the time.monotonic() clock. Durations are measured
+        between edge timestamps and deadlines are absolute, so delivery delays
+        do not shift the long-press and multi-press decisions.
+        """
+        fired = []
+        changed &= self.mask
+        falls = changed & ~levels
+        rises = changed & levels & self.held
+        if not (falls or rises):
+            return
+        pressed_time = self.pressed_time
+        due = self.due
+        counts = self.counts
+
+        if falls:
+            self.held |= falls
+            self.waiting &= ~falls
+            long_due = timestamp + LONG_PRESS_THRESHOLD / 1000
+            bits = falls
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                pin = bit.bit_length() - 1
+                pressed_time[pin] = timestamp
+                due[pin] = long_due
+                counts[pin] += 1
+
+        if rises:
+            self.held &= ~rises
+            presses = self.presses
+            next_press = self.next_press
+            bits = rises
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                pin = bit.bit_length() - 1
+                if timestamp >= due[pin]:
+                    # Released after the deadline the timer had not served yet
+                    fired.append((pin, EVENT_LONG_PRESS))
+                    counts[pin] = 0
+                elif counts[pin] >= presses[pin]:
+                    fired.append((pin, PRESS_EVENTS.get(counts[pin], EVENT_SINGLE_PRESS)))
+                    counts[pin] = 0
+                else:
+                    self.waiting |= bit
+                    due[pin] = timestamp + next_press[pin]
+
+        self._arm()
+        self._fire(fired)
+
+    def _arm(self) -> None:
+        """Point the chip's deadline at the earliest pending pin deadline."""
+        pending = self.held | self.waiting
+        if not pending:
+            if self.deadline is not None:
+                self.deadline.cancel()
+                self.deadline = None
+            return
+        due = self.due
+        when = None
+        while pending:
+            bit = pending & -pending
+            pending ^= bit
+            pin_due = due[bit.bit_length() - 1]
+            if when is None or pin_due < when:
+                when = pin_due
+        if self.deadline is not None:
+            if self.deadline_due == when:
+                return
+            self.deadline.cancel()
+        self.deadline = loop_scheduler.call_later(max(0.0, when - time.monotonic()), self._expire)
+        self.deadline_due = when
+
+    def _expire(self) -> None:
+        fired = []
+        self.deadline = None
+        now = time.monotonic() + DUE_SLACK
+        due = self.due
+        counts = self.counts
+        pending = self.held | self.waiting
+        while pending:
+            bit = pending & -pending
+            pending ^= bit
+            pin = bit.bit_length() - 1
+            if due[pin] > now:
+                continue
+            if self.held & bit:
+                self.held ^= bit
+                fired.append((pin, EVENT_LONG_PRESS))
+            else:
+                self.waiting ^= bit
+                fired.append((pin, PRESS_EVENTS.get(counts[pin], EVENT_SINGLE_PRESS)))
+            counts[pin] = 0
+        self._arm()
+        self._fire(fired)
+
+    def _fire(self, fired: list[tuple[int, str]]) -> None:
+        buttons = self.buttons
+        for pin, event_type in fired:
+            button = buttons[pin]
+            if button is None:
+                continue
+            # Goes out with the delivery that fed the engine, if any
+            bridge.fire_event(
+                EVENT_TYPE,
+                {
+                    CONF_DEVICE_ID: button.device_id,
+                    CONF_TYPE: event_type,
+                    CONF_SUBTYPE: button.subtype,
+                },
+            )
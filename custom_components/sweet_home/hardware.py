@@ -0,0 +1,238 @@
+"""Hardware backends for the I2C bus and the interrupt GPIO lines."""
+from __future__ import annotations
+
+import os
+import select
+import threading as th
+from typing import Callable, Protocol
+
+# Edge events fetched per read() from a GPIO character device line request
+EDGE_EVENT_BATCH = 16
+
+
+class I2CBus(Protocol):
+    """The subset of the SMBus API used to talk to MCP23017 chips."""
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        ...
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        ...
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> list[int]:
+        ...
+
+    def write_i2c_block_data(self, address: int, register: int, data: list[int]) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class I2CBackend(Protocol):
+    def open_bus(self, number: int) -> I2CBus:
+        ...
+
+    def list_buses(self) -> list[int]:
+        """Numbers of the I2C buses present on this machine."""
+        ...
+
+
+class GPIOBackend(Protocol):
+    """Rising-edge notifications for the MCP23017 INT lines.
+
+    The callback gets the pin and, when the backend knows it, the edge time
+    on the time.monotonic() clock. Without one the receiver stamps the edge
+    itself.
+    """
+
+    def add_edge_callback(
+        self, pin: int, callback: Callable[[int, float | None], None]
+    ) -> None:
+        ...
+
+    def remove_edge_callback(self, pin: int) -> None:
+        ...
+
+    def cleanup(self) -> None:
+        ...
+
+
+class SMBusBackend:
+    """I2C through /dev/i2c-N using smbus3."""
+
+    def open_bus(self, number: int) -> I2CBus:
+        from smbus3 import SMBus
+
+        return SMBus(number)
+
+    def list_buses(self) -> list[int]:
+        return sorted(
+            int(name[4:])
+            for name in os.listdir("/dev")
+            if name.startswith("i2c-") and name[4:].isdigit()
+        )
+
+
+class RPiGPIOBackend:
+    """Interrupt lines through RPi.GPIO, BCM numbering."""
+
+    def __init__(self) -> None:
+        self._gpio = None
+
+    @property
+    def gpio(self):
+        if self._gpio is None:
+            import RPi.GPIO as GPIO
+
+            GPIO.setmode(GPIO.BCM)
+            self._gpio = GPIO
+        return self._gpio
+
+    def add_edge_callback(self, pin: int, callback: Callable[[int], None]) -> None:
+        GPIO = self.gpio
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+        GPIO.add_event_detect(pin, GPIO.RISING, callback=callback)
+
+    def remove_edge_callback(self, pin: int) -> None:
+        self.gpio.remove_event_detect(pin)
+
+    def cleanup(self) -> None:
+        if self._gpio is not None:
+            self._gpio.cleanup()
+            self._gpio = None
+
+
+class EdgeEvent(Protocol):
+    line_offset: int
+    timestamp_ns: int
+
+
+class LineRequest(Protocol):
+    """The subset of a gpiod v2 LineRequest used for edge events."""
+
+    @property
+    def fd(self) -> int:
+        ...
+
+    def read_edge_events(self, max_events: int | None = None) -> list[EdgeEvent]:
+        ...
+
+    def release(self) -> None:
+        ...
+
+
+class GpiodBackend:
+    """Interrupt lines through the GPIO character device, libgpiod v2.
+
+    Edge events carry the kernel's CLOCK_MONOTONIC timestamp, which is the
+    clock behind time.monotonic(), so the edge time does not depend on when
+    the callback thread gets scheduled. One reader thread waits on all line
+    requests and drains up to EDGE_EVENT_BATCH events per read.
+    """
+
+    def __init__(
+        self,
+        chip_path: str = "/dev/gpiochip0",
+        open_line: Callable[[int], LineRequest] | None = None,
+    ) -> None:
+        self.chip_path = chip_path
+        self.open_line = open_line or self.request_line
+        self.lines: dict[int, tuple[LineRequest, Callable]] = {}
+        self._lock = th.Lock()
+        # Pipe that interrupts the reader's select(), open while it runs
+        self._wake_r: int | None = None
+        self._wake_w: int | None = None
+        self._reader: th.Thread | None = None
+        self._running = False
+
+    def request_line(self, pin: int) -> LineRequest:
+        import gpiod
+        from gpiod.line import Bias, Clock, Direction, Edge
+
+        return gpiod.request_lines(
+            self.chip_path,
+            consumer="sweet_home",
+            config={
+                pin: gpiod.LineSettings(
+                    direction=Direction.INPUT,
+                    edge_detection=Edge.RISING,
+                    bias=Bias.PULL_DOWN,
+                    event_clock=Clock.MONOTONIC,
+                )
+            },
+        )
+
+    def add_edge_callback(
+        self, pin: int, callback: Callable[[int, float | None], None]
+    ) -> None:
+        request = self.open_line(pin)
+        with self._lock:
+            previous = self.lines.get(pin)
+            self.lines[pin] = (request, callback)
+            if self._reader is None:
+                self._running = True
+                if self._wake_r is None:
+                    self._wake_r, self._wake_w = os.pipe()
+                self._reader = th.Thread(
+                    target=self.run_reader, name="sweet_home_gpiod", daemon=True
+                )
+                self._reader.start()
+        if previous is not None:
+            previous[0].release()
+        self._wake()
+
+    def remove_edge_callback(self, pin: int) -> None:
+        with self._lock:
+            line = self.lines.pop(pin, None)
+        self._wake()
+        if line is not None:
+            line[0].release()
+
+    def cleanup(self) -> None:
+        with self._lock:
+            reader, self._reader = self._reader, None
+            self._running = False
+        self._wake()
+        if reader is not None:
+            reader.join()
+        with self._lock:
+            lines, self.lines = self.lines, {}
+            pipe = (None, None)
+            if self._reader is None:
+                # Not restarted by add_edge_callback() meanwhile
+                pipe = self._wake_r, self._wake_w
+                self._wake_r = self._wake_w = None
+        for request, _ in lines.values():
+            request.release()
+        for fd in pipe:
+            if fd is not None:
+                os.close(fd)
+
+    def _wake(self) -> None:
+        with self._lock:
+            if self._wake_w is not None:
+                os.write(self._wake_w, b"\0")
+
+    def run_reader(self) -> None:
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                wake_r = self._wake_r
+                by_fd = {request.fd: (request, cb) for request, cb in self.lines.values()}
+            try:
+                ready, _, _ = select.select([wake_r, *by_fd], [], [])
+            except (OSError, ValueError):
+                continue  # A line was released meanwhile, the wake byte follows
+            for fd in ready:
+                if fd == wake_r:
+                    os.read(wake_r, 512)
+                    continue
+                request, callback = by_fd[fd]
+                try:
+                    events = request.read_edge_events(EDGE_EVENT_BATCH)
+                except Exception:
+                    continue  # Released while waiting
+                for event in events:
+                    callback(event.line_offset, event.timestamp_ns / 1e9)
@@ -0,0 +1,112 @@
+"""Fixed-size ring buffer of raw pin transitions for offline analysis.
+
+Every port value fed into the debouncer is recorded with its timestamp, so a
+dump can be replayed through the same debounce and gesture code later
+(benchmarks/replay.py). Records are packed into a preallocated buffer, the
+interrupt path allocates nothing.
+"""
+from __future__ import annotations
+
+import json
+import struct
+import threading as th
+from typing import Any, Iterator
+
+MAGIC = b"SHJ2"
+HEADER = struct.Struct("<4sI")  # magic, JSON header length
+# timestamp (time.monotonic()), bus, address, port, INTF flags, value, source
+RECORD = struct.Struct("<dHBBBBBx")
+# Earlier dumps, same size with the bus in a single byte
+RECORDS = {b"SHJ1": struct.Struct("<dBBBBBBxx"), MAGIC: RECORD}
+
+SOURCE_INTCAP = 0  # captured at the interrupt, flags are the INTF bits
+SOURCE_GPIO = 1  # GPIO level at the interrupt or reconciliation read
+SOURCE_SETTLE = 2  # GPIO level re-read once a chattering pin went quiet
+
+
+class TransitionJournal:
+    """Ring buffer of RECORD entries, disabled while capacity is 0."""
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._lock = th.Lock()
+        self.resize(capacity)
+
+    def resize(self, capacity: int) -> None:
+        """Reallocate for capacity records, dropping what was recorded."""
+        with self._lock:
+            self.capacity = capacity
+            self.enabled = capacity > 0
+            self._buffer = memoryview(bytearray(RECORD.size * capacity))
+            self._next = 0
+            self.total = 0
+
+    def record(
+        self,
+        timestamp: float,
+        bus: int,
+        address: int,
+        port: int,
+        flags: int,
+        value: int,
+        source: int,
+    ) -> None:
+        with self._lock:
+            RECORD.pack_into(
+                self._buffer,
+                self._next * RECORD.size,
+                timestamp,
+                bus,
+                address,
+                port,
+                flags,
+                value,
+                source,
+            )
+            self._next += 1
+            if self._next == self.capacity:
+                self._next = 0
+            self.total += 1
+
+    def snapshot(self) -> bytes:
+        """The recorded entries, oldest first."""
+        with self._lock:
+            split = self._next * RECORD.size
+            if self.total < self.capacity:
+                return bytes(self._buffer[:split])
+            return bytes(self._buffer[split:]) + bytes(self._buffer[:split])
+
+    def dump(self, path: str, info: dict[str, Any]) -> int:
+        """Write info plus the entries to path, return the record count."""
+        records = self.snapshot()
+        header = json.dumps(
+            {
+                **info,
+                "record_size": RECORD.size,
+                "records": len(records) // RECORD.size,
+                "total": self.total,
+            }
+        ).encode()
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, len(header)))
+            file.write(header)
+            file.write(records)
+        return len(records) // RECORD.size
+
+
+def load(path: str) -> tuple[dict[str, Any], list[tuple]]:
+    """Read a dump, return its header and (timestamp, bus, address, port,
+    flags, value, source) records."""
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, length = HEADER.unpack_from(data)
+    if magic not in RECORDS:
+        raise ValueError(f"{path} is not a sweet_home journal")
+    info = json.loads(data[HEADER.size : HEADER.size + length])
+    return info, list(iter_records(data[HEADER.size + length :], RECORDS[magic]))
+
+
+def iter_records(data: bytes, record: struct.Struct = RECORD) -> Iterator[tuple]:
+    return record.iter_unpack(data)
+
+
+journal = TransitionJournal()
@@ -1,8 +1,24 @@
-from smbus3 import SMBus
+from __future__ import annotations
+
+import logging
+import threading as th
 import time
-import RPi.GPIO as GPIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
 from .button import Button
-from .binary_sensor import SweetHomeBinarySensor
+from .chord import Chord
+from .bridge import bridge
+from .const import DEFAULT_DEBOUNCE
+from .debounce import Debouncer
+from .gesture import GestureEngine
+from .journal import SOURCE_GPIO, SOURCE_INTCAP, SOURCE_SETTLE, journal
+from .stats import ChipStats
+from .hardware import GPIOBackend, I2CBackend, I2CBus, RPiGPIOBackend, SMBusBackend
+
+if TYPE_CHECKING:
+    from .binary_sensor import SweetHomeBinarySensor
 
 
 # Define registers values from datasheet
@@ -38,188 +54,1141 @@ CONF = {
     "BANK": 1 << 7,  # Controls how the registers are addressed
 }
 
-MCP23017_0X20 = 0x20
-MCP23017_0X21 = 0x21
+# SEQOP and BANK are left cleared: sequential addressing over the
+# interleaved register map, which the block reads/writes depend on.
+IOCON_VALUE = 0 | CONF["HAEN"] | CONF["INTPOL"] | CONF["MIRROR"]
+IOCON_BANK1 = 0x05  # IOCON address when BANK = 1
+
+MCP23017_BASE_ADDRESS = 0x20  # A2..A0 select 0x20 - 0x27
+MCP23017_MAX_CHIPS = 8
+PINS_PER_CHIP = 16
+
+EDGE_QUEUE_SIZE = 256
+
+# Background reconciliation poll, seconds. Backs off towards the maximum while
+# polls find nothing, drops to the minimum after errors or missed edges.
+RECONCILE_MIN_INTERVAL = 1
+RECONCILE_MAX_INTERVAL = 300
+
+# Retry of chips that could not be configured yet, seconds
+INIT_RETRY_MIN_INTERVAL = 1
+INIT_RETRY_MAX_INTERVAL = 60
+
+# Consecutive failed transactions after which a chip is taken offline, its
+# INT line ignored and its init retried in the background with backoff
+BREAKER_THRESHOLD = 3
+
+
+def get_pin_index(address, pin):
+    """Return the handler table slot for a chip address and pin 0-15."""
+    return (address - MCP23017_BASE_ADDRESS) * PINS_PER_CHIP + pin
+
+
+class Mcp23017Bus:
+    """All MCP23017 chips on one I2C bus and their pin handlers.
+
+    Every bus has its own SMBus handle, lock, handler tables and cached port
+    values, so traffic on one bus never waits on another. GPIO callbacks only
+    queue an edge record, a worker thread per bus does all I2C reads and
+    dispatches the decoded changes.
+    """
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.i2cbus: I2CBus | None = None
+        self.lock = th.Lock()
+        # address -> interrupt GPIO (BCM numbering)
+        self.chips: dict[int, int] = {}
+        # Chips that were configured successfully
+        self.online: set[int] = set()
+        # Addresses the last discovery scan found on this bus, None if the
+        # bus was never scanned. Other configured chips are not probed at once.
+        self.known: set[int] | None = None
+        # address -> (next attempt, current retry interval) of chips not online yet
+        self.pending_init: dict[int, tuple[float, float]] = {}
+        # address -> consecutive failed transactions, only failing chips
+        self.failures: dict[int, int] = {}
+        # address -> GPINTEN currently written to the chip, bit per pin 0-15
+        self.interrupt_masks: dict[int, int] = {}
+        # address -> output pins (IODIR bits cleared) currently written to the chip
+        self.output_masks: dict[int, int] = {}
+
+        # Dense handler tables indexed by get_pin_index(): 8 chips x 16 pins
+        size = MCP23017_MAX_CHIPS * PINS_PER_CHIP
+        self.pin_buttons: list[Button | None] = [None] * size
+        self.pin_sensors: list[SweetHomeBinarySensor | None] = [None] * size
+        self.pin_handlers: list[Button | SweetHomeBinarySensor | None] = [None] * size
+        self.pin_outputs: list[object | None] = [None] * size
+        # Press state of the buttons of every chip, indexed like stats
+        self.gestures = [
+            GestureEngine(number, MCP23017_BASE_ADDRESS + chip)
+            for chip in range(MCP23017_MAX_CHIPS)
+        ]
+        # address -> chords of buttons on that chip
+        self.chords: dict[int, list[Chord]] = {}
+        # Shadow of OLATA/OLATB per port, indexed like prev_datas. Outputs are
+        # set here and written out by the worker, never read-modify-write.
+        self.olat = [0x00] * (size // 8)
+        self.output_lock = th.Lock()
+        self.dirty_outputs: set[int] = set()
+        # Chips whose IODIR/OLAT were read back at their first configuration
+        self.olat_known: set[int] = set()
+        # address -> pins the chip was already driving when first configured.
+        # They stay outputs at their adopted level, registered or not, so a
+        # relay does not drop out before its entity is set up.
+        self.held_outputs: dict[int, int] = {}
+        self.stats = [ChipStats() for _ in range(MCP23017_MAX_CHIPS)]
+        self.debouncer = Debouncer(size, DEFAULT_DEBOUNCE / 1000)
+        # Last accepted value of every port, indexed like pin_handlers / 8
+        self.prev_datas = self.debouncer.state
+
+        # (timestamp, address) edge records, appended from GPIO callbacks
+        self.edges: deque[tuple[float, int]] = deque(maxlen=EDGE_QUEUE_SIZE)
+        self.wakeup = th.Event()
+        # Configuration changes, run by the worker between interrupt passes
+        self.commands: deque[Callable[[], None]] = deque()
+        self.worker: th.Thread | None = None
+        self.running = False
+        self.logger = None
+        # Debug tracing of the interrupt path, refreshed once per service pass
+        # so a disabled trace costs one bool test instead of string formatting
+        self.trace = False
+        self.reconcile_interval = RECONCILE_MIN_INTERVAL
+        self.next_reconcile = time.monotonic() + RECONCILE_MIN_INTERVAL
+
+    def open(self) -> None:
+        if self.i2cbus is None:
+            self.i2cbus = i2c_backend.open_bus(self.number)
+
+    def start_worker(self, logger) -> None:
+        """Start the I/O worker thread servicing this bus.
+
+        Chips are brought online by the worker itself, so this returns at once.
+        """
+        self.logger = logger
+        if self.worker is not None:
+            return
+        self.pending_init = {
+            address: self.first_attempt(address)
+            for address in self.chips
+            if address not in self.online
+        }
+        self.running = True
+        self.worker = th.Thread(
+            target=self.run_worker, name=f"sweet_home_i2c_{self.number}", daemon=True
+        )
+        self.worker.start()
+
+    def first_attempt(self, address) -> tuple[float, float]:
+        """Retry state a newly configured chip starts from.
+
+        A chip the last scan did not find waits a full retry interval before
+        it is probed, so absent addresses cost nothing at startup.
+        """
+        if self.known is None or address in self.known:
+            return (0.0, INIT_RETRY_MIN_INTERVAL)
+        self.logger.info(
+            f"MCP23017 at address {hex(address)} on bus {self.number} was not found by the last scan, first attempt in {INIT_RETRY_MAX_INTERVAL}s"
+        )
+        return (time.monotonic() + INIT_RETRY_MAX_INTERVAL, INIT_RETRY_MAX_INTERVAL)
+
+    def stop_worker(self) -> None:
+        if self.worker is None:
+            return
+        self.running = False
+        self.wakeup.set()
+        self.worker.join()
+        self.worker = None
+
+    def close(self) -> None:
+        self.stop_worker()
+        for address in self.online:
+            try:
+                gpio_backend.remove_edge_callback(self.chips[address])
+            except Exception:
+                pass
+        self.online.clear()
+        self.pending_init.clear()
+        self.failures.clear()
+        self.interrupt_masks.clear()
+        self.output_masks.clear()
+        self.commands.clear()
+        if self.i2cbus is not None:
+            self.i2cbus.close()
+            self.i2cbus = None
+
+    def submit(self, command: Callable[[], None]) -> None:
+        """Run command on the worker thread before its next interrupt pass."""
+        self.commands.append(command)
+        self.wakeup.set()
+
+    def rebuild_pin_handlers(self) -> None:
+        """Merge button and sensor tables, buttons take precedence."""
+        for idx, button in enumerate(self.pin_buttons):
+            self.pin_handlers[idx] = (
+                button if button is not None else self.pin_sensors[idx]
+            )
+            self.sync_gesture(idx)
+
+    def sync_gesture(self, idx) -> None:
+        """Make the chip's gesture engine serve the button table entry at idx."""
+        engine = self.gestures[idx // PINS_PER_CHIP]
+        button = self.pin_buttons[idx]
+        current = engine.buttons[idx % PINS_PER_CHIP]
+        if current is button:
+            return
+        if current is not None:
+            engine.detach(current)
+        if button is not None:
+            engine.attach(button)
+
+    def interrupt_mask(self, address) -> int:
+        """GPINTEN bits of a chip: only input pins that have a handler interrupt."""
+        base = get_pin_index(address, 0)
+        mask = 0
+        for pin, handler in enumerate(self.pin_handlers[base : base + PINS_PER_CHIP]):
+            if handler is not None:
+                mask |= 1 << pin
+        return mask & ~self.output_mask(address)
+
+    def output_mask(self, address) -> int:
+        """IODIR output bits of a chip: registered outputs and held pins.
+
+        A held pin is given up once a button or binary sensor claims it.
+        """
+        base = get_pin_index(address, 0)
+        mask = 0
+        inputs = 0
+        for pin in range(PINS_PER_CHIP):
+            if self.pin_outputs[base + pin] is not None:
+                mask |= 1 << pin
+            elif self.pin_handlers[base + pin] is not None:
+                inputs |= 1 << pin
+        return mask | (self.held_outputs.get(address, 0) & ~inputs)
+
+    def latch_values(self, address, outputs) -> list[int]:
+        """OLATA, OLATB: the shadow for output pins, high for inputs."""
+        port_index = get_pin_index(address, 0) >> 3
+        with self.output_lock:
+            return [
+                (self.olat[port_index] & outputs) | (0xFF & ~outputs),
+                (self.olat[port_index + 1] & (outputs >> 8)) | (0xFF & ~(outputs >> 8)),
+            ]
+
+    def refresh_interrupt_masks(self, addresses=None) -> None:
+        """Queue a GPINTEN update for the given chips, all chips by default.
+
+        IODIR follows too, a held output pin claimed by a handler turns input.
+        """
+        for address in list(self.chips) if addresses is None else addresses:
+            self.submit(lambda address=address: self.update_output_mask(address))
+
+    def set_chips(self, chips: dict[int, int]) -> None:
+        """Replace the chip list, the worker applies the difference."""
+        if self.worker is None:
+            self.chips = dict(chips)
+        else:
+            self.submit(lambda: self.apply_chips(dict(chips)))
+
+    def read_registers(self, address, register, length):
+        """Read consecutive registers in a single I2C transaction.
+
+        Relies on IOCON.BANK = 0 and IOCON.SEQOP = 0, so the address pointer
+        walks the A/B interleaved register map.
+        """
+        with self.lock:
+            return self.i2cbus.read_i2c_block_data(address, register, length)
+
+    def write_registers(self, address, register, values):
+        """Write consecutive registers in a single I2C transaction."""
+        with self.lock:
+            self.i2cbus.write_i2c_block_data(address, register, list(values))
+
+    def read_interrupt_state(self, address):
+        """Fetch INTFA, INTFB, INTCAPA, INTCAPB, GPIOA and GPIOB in one transaction.
+
+        Reading INTCAP clears the pending interrupt on both ports, GPIO shows
+        changes that happened while the interrupt was pending.
+        """
+        return self.read_registers(address, INTFA, GPIOB - INTFA + 1)
+
+    def configure_mcp23017(self, address):
+        """Push the whole configuration register file to one chip and verify it.
+
+        INT may still be asserted afterwards, read_interrupt_state() releases
+        it and returns the initial pin levels.
+        """
+        with self.lock:
+            if self.known is None or address not in self.known:
+                # Test if the device is present, chips found by the scan skip it
+                self.i2cbus.read_byte_data(address, IOCONA)
+            # In BANK = 1 mode 0x05 is IOCON, in BANK = 0 it is GPINTENB which
+            # is rewritten below anyway. Either way the chip ends up in
+            # BANK = 0, and the IOCONA write then clears a SEQOP left set,
+            # so the sequential block writes hit the expected registers.
+            self.i2cbus.write_byte_data(address, IOCON_BANK1, 0x00)
+            self.i2cbus.write_byte_data(address, IOCONA, IOCON_VALUE)
+
+        if address not in self.olat_known:
+            # Keep relays as they are when the chip already drove them, e.g.
+            # after a Home Assistant restart, whether or not their entities
+            # are set up yet
+            iodir_a, iodir_b = self.read_registers(address, IODIRA, 2)
+            olat_a, olat_b = self.read_registers(address, OLATA, 2)
+            driven = ~(iodir_a | iodir_b << 8) & 0xFFFF
+            port_index = get_pin_index(address, 0) >> 3
+            with self.output_lock:
+                for port, latch in ((0, olat_a), (1, olat_b)):
+                    bits = (driven >> (port * 8)) & 0xFF
+                    olat = self.olat[port_index + port]
+                    self.olat[port_index + port] = (olat & ~bits) | (latch & bits)
+            self.held_outputs[address] = driven
+            self.olat_known.add(address)
+
+        outputs = self.output_mask(address)
+        self.held_outputs[address] = self.held_outputs.get(address, 0) & outputs
+        mask = self.interrupt_mask(address)
+        registers = get_config_registers(mask, outputs)
+        # Latches first, so output pins come up at the right level
+        self.write_registers(address, OLATA, self.latch_values(address, outputs))
+        self.write_registers(address, IODIRA, registers)
+
+        readback = self.read_registers(address, IODIRA, len(registers))
+        if list(readback) != registers:
+            raise IOError(
+                "Register readback mismatch: wrote {}, read {}".format(
+                    registers, list(readback)
+                )
+            )
+
+        self.interrupt_masks[address] = mask
+        self.output_masks[address] = outputs
+
+    def update_interrupt_mask(self, address) -> None:
+        """Bring GPINTEN of an online chip in line with its pin handlers.
+
+        Only the two GPINTEN registers are written. Newly enabled pins start
+        from their current level rather than being dispatched as a change.
+        """
+        if address not in self.online:
+            return  # Configured with the current mask once it comes online
+        mask = self.interrupt_mask(address)
+        old = self.interrupt_masks.get(address, 0)
+        if mask == old:
+            return
+
+        self.write_registers(address, GPINTENA, [mask & 0xFF, mask >> 8])
+        self.interrupt_masks[address] = mask
+        enabled = mask & ~old
+        if not enabled:
+            return
+
+        state = self.read_interrupt_state(address)
+        self.seed(address, state[4], state[5], enabled)
+        now = time.monotonic()
+        self.process_state(address, state, now, now)
+
+    def update_output_mask(self, address) -> None:
+        """Switch pins of an online chip between input and output.
+
+        Writes the latches, then IODIRA/B, then updates GPINTEN.
+        """
+        if address not in self.online:
+            return
+        outputs = self.output_mask(address)
+        # Held pins taken over by a handler are given up for good
+        self.held_outputs[address] = self.held_outputs.get(address, 0) & outputs
+        if outputs != self.output_masks.get(address, 0):
+            self.write_registers(address, OLATA, self.latch_values(address, outputs))
+            self.write_registers(
+                address, IODIRA, [~outputs & 0xFF, ~(outputs >> 8) & 0xFF]
+            )
+            self.output_masks[address] = outputs
+            self.sync_output_state(address)
+        self.update_interrupt_mask(address)
+
+    def sync_output_state(self, address) -> None:
+        """Mirror the latches of output pins into the cached port values.
+
+        GPIO of an output pin reads back its latch, so interrupt and
+        reconciliation reads see no change there.
+        """
+        outputs = self.output_masks.get(address, 0)
+        port_index = get_pin_index(address, 0) >> 3
+        state = self.debouncer.state
+        with self.output_lock:
+            for port in (0, 1):
+                bits = (outputs >> (port * 8)) & 0xFF
+                idx = port_index + port
+                state[idx] = (state[idx] & ~bits) | (self.olat[idx] & bits)
+
+    def write_outputs(self) -> None:
+        """Write the latches of every chip with changed outputs, one
+        OLATA/OLATB transaction per chip however many pins changed."""
+        with self.output_lock:
+            dirty, self.dirty_outputs = self.dirty_outputs, set()
+        for address in dirty:
+            if address not in self.online:
+                continue  # Written with the configuration once it is online
+            stats = self.stats[address - MCP23017_BASE_ADDRESS]
+            outputs = self.output_masks.get(address, 0)
+            try:
+                self.write_registers(address, OLATA, self.latch_values(address, outputs))
+            except Exception as e:
+                with self.output_lock:
+                    self.dirty_outputs.add(address)
+                self.chip_failed(address, f"Error writing outputs: {e}")
+                continue
+            self.failures.pop(address, None)
+            stats.output_writes += 1
+            self.sync_output_state(address)
+
+    def apply_chips(self, chips: dict[int, int]) -> None:
+        """Detach removed or rewired chips and queue new ones for init."""
+        for address, interrupt_pin in self.chips.items():
+            if chips.get(address) == interrupt_pin:
+                continue
+            self.pending_init.pop(address, None)
+            if address not in self.online:
+                continue
+            self.online.discard(address)
+            self.interrupt_masks.pop(address, None)
+            self.output_masks.pop(address, None)
+            try:
+                gpio_backend.remove_edge_callback(interrupt_pin)
+            except Exception:
+                pass
+            try:
+                self.write_registers(address, GPINTENA, [0x00, 0x00])
+            except Exception as e:
+                self.logger.debug(f"Could not disable interrupts of {hex(address)}: {e}")
+            self.logger.info(f"MCP23017 at address {hex(address)} on bus {self.number} detached")
+
+        for address in chips:
+            if address not in self.online and address not in self.pending_init:
+                self.pending_init[address] = self.first_attempt(address)
+        self.chips = chips
+
+    def initialize_pending(self) -> None:
+        """Try to bring online every chip whose next attempt is due."""
+        now = time.monotonic()
+        snapshot: dict[int, list[int]] = {}
+        for address, (attempt_at, interval) in list(self.pending_init.items()):
+            if attempt_at > now:
+                continue
+            interrupt_pin = self.chips[address]
+            attached = False
+            try:
+                self.open()
+                self.configure_mcp23017(address)
+                try:
+                    gpio_backend.add_edge_callback(
+                        interrupt_pin, self.get_edge_callback(address)
+                    )
+                    attached = True
+                except Exception as e:
+                    self.logger.error(f"Error configuring GPIO {interrupt_pin}: {e}")
+                # Only now release INT: whatever was raised so far is in this
+                # read, any later interrupt makes an edge the callback sees
+                state = self.read_interrupt_state(address)
+            except Exception as e:
+                if attached:
+                    try:
+                        gpio_backend.remove_edge_callback(interrupt_pin)
+                    except Exception:
+                        pass
+                log = self.logger.warning if attempt_at == 0.0 else self.logger.debug
+                log(
+                    f"Failed to initialize MCP23017 at address {hex(address)} on bus {self.number}, retry in {interval}s: {e}"
+                )
+                self.pending_init[address] = (
+                    time.monotonic() + interval,
+                    min(interval * 2, INIT_RETRY_MAX_INTERVAL),
+                )
+                continue
+
+            del self.pending_init[address]
+            if self.known is not None and address not in self.known:
+                self.known.add(address)
+                self.logger.info(
+                    f"MCP23017 at address {hex(address)} on bus {self.number} is missing from the scanned inventory, rescan from the integration options"
+                )
+            self.failures.pop(address, None)
+            self.online.add(address)
+            self.set_available(address, True)
+            snapshot[address] = state
+            if not attached:
+                continue
+            self.logger.info(
+                f"MCP23017 at address {hex(address)} on bus {self.number} online, interrupt on GPIO {interrupt_pin}"
+            )
+
+        if snapshot:
+            self.apply_snapshot(snapshot)
+
+    def apply_snapshot(self, snapshot: dict[int, list[int]]) -> None:
+        """Seed cached ports and binary sensors from the levels read at init.
+
+        Without this the cache starts at 0xFF, so a pin that is already low
+        never reports until it changes. Buttons are not dispatched, a button
+        held during startup is simply not a press. The sensor updates of all
+        chips brought online in this pass reach HA in one batch.
+        """
+        for address, (_, _, _, _, gpio_a, gpio_b) in snapshot.items():
+            self.seed(address, gpio_a, gpio_b)
+
+    def seed(self, address, gpio_a, gpio_b, mask=0xFFFF) -> None:
+        """Take the masked pin levels as accepted and push them to the sensors."""
+        state = self.debouncer.state
+        pin_sensors = self.pin_sensors
+        base = get_pin_index(address, 0)
+        for offset, data in ((0, gpio_a), (8, gpio_b)):
+            bits = (mask >> offset) & 0xFF
+            if not bits:
+                continue
+            port_index = (base + offset) >> 3
+            state[port_index] = (state[port_index] & ~bits) | (data & bits)
+            for bit in range(8):
+                sensor = pin_sensors[base + offset + bit]
+                if sensor is not None and bits & (1 << bit):
+                    bridge.call(sensor.onChange, data & (1 << bit))
+
+    def next_init_timeout(self, now: float) -> float | None:
+        if not self.pending_init:
+            return None
+        return max(0.0, min(at for at, _ in self.pending_init.values()) - now)
+
+    def get_edge_callback(self, address):
+        """Return the GPIO callback for a chip, it only queues the edge."""
+        edges = self.edges
+        wakeup = self.wakeup
+
+        def edge_callback(channel, timestamp=None):
+            # Backends with kernel timestamps pass the edge time, others do not
+            edges.append((time.monotonic() if timestamp is None else timestamp, address))
+            wakeup.set()
+
+        return edge_callback
+
+    def run_worker(self) -> None:
+        debouncer = self.debouncer
+        while self.running:
+            now = time.monotonic()
+            timeout = self.next_reconcile - now
+            for other in (debouncer.next_timeout(now), self.next_init_timeout(now)):
+                if other is not None and other < timeout:
+                    timeout = other
+            self.wakeup.wait(max(0.0, timeout))
+            self.wakeup.clear()
+            self.trace = self.logger.isEnabledFor(logging.DEBUG)
+
+            # Everything decoded in this pass reaches HA in one loop callback
+            bridge.begin()
+            try:
+                self.service_pass()
+            finally:
+                bridge.end()
+
+    def service_pass(self) -> None:
+        """Serve queued edges, due debounce settles and the reconciliation poll."""
+        edges = self.edges
+        debouncer = self.debouncer
+        commands = self.commands
+
+        while commands:
+            try:
+                commands.popleft()()
+            except Exception as e:
+                self.logger.error(f"Error applying configuration change on bus {self.number}: {e}")
+
+        if self.pending_init:
+            self.initialize_pending()
+
+        # Back-to-back interrupts from one chip are served by one read
+        pending: dict[int, float] = {}
+        while edges:
+            timestamp, address = edges.popleft()
+            pending.setdefault(address, timestamp)
+
+        for address, timestamp in pending.items():
+            if address not in self.online:
+                continue  # Queued before its breaker opened
+            try:
+                self.service_interrupt(address, timestamp)
+            except Exception as e:
+                self.logger.error("Error in interruption callback: {}".format(e))
+
+        due = debouncer.pop_due(time.monotonic())
+        for chip in {port_index >> 1 for port_index in due}:
+            if MCP23017_BASE_ADDRESS + chip not in self.online:
+                continue
+            try:
+                self.settle(MCP23017_BASE_ADDRESS + chip)
+            except Exception as e:
+                self.logger.error("Error settling debounced pins: {}".format(e))
+
+        if time.monotonic() >= self.next_reconcile:
+            healthy = self.reconcile()
+            if healthy:
+                interval = min(self.reconcile_interval * 2, RECONCILE_MAX_INTERVAL)
+            else:
+                interval = RECONCILE_MIN_INTERVAL
+            self.reconcile_interval = interval
+            self.next_reconcile = time.monotonic() + interval
+
+    def degrade(self) -> None:
+        """Poll soon, something went wrong on the interrupt path."""
+        self.reconcile_interval = RECONCILE_MIN_INTERVAL
+        self.next_reconcile = min(
+            self.next_reconcile, time.monotonic() + RECONCILE_MIN_INTERVAL
+        )
+
+    def chip_failed(self, address, message: str) -> None:
+        """Count a failed transaction, take the chip offline once they pile up.
+
+        Only the first failure of a run is logged as an error, so a chip that
+        browned out does not flood the log until its breaker opens.
+        """
+        self.stats[address - MCP23017_BASE_ADDRESS].i2c_errors += 1
+        failures = self.failures.get(address, 0) + 1
+        self.failures[address] = failures
+        self.degrade()
+        log = self.logger.error if failures == 1 else self.logger.debug
+        log(f"MCP23017 at address {hex(address)} on bus {self.number}: {message}")
+        if failures >= BREAKER_THRESHOLD and address in self.online:
+            self.take_offline(address)
+
+    def take_offline(self, address) -> None:
+        """Stop serving a failing chip until it can be configured again.
+
+        Its INT line is no longer watched, so a floating or stuck line does
+        not keep the bus busy with reads that time out. The chip goes back to
+        pending init with backoff, and its entities are unavailable meanwhile.
+        """
+        self.online.discard(address)
+        self.interrupt_masks.pop(address, None)
+        self.output_masks.pop(address, None)
+        try:
+            gpio_backend.remove_edge_callback(self.chips[address])
+        except Exception:
+            pass
+        self.pending_init[address] = (
+            time.monotonic() + INIT_RETRY_MIN_INTERVAL,
+            min(INIT_RETRY_MIN_INTERVAL * 2, INIT_RETRY_MAX_INTERVAL),
+        )
+        self.stats[address - MCP23017_BASE_ADDRESS].breaker_trips += 1
+        # A press in progress will never see its release
+        bridge.call(self.gestures[address - MCP23017_BASE_ADDRESS].cancel, 0xFFFF)
+        for chord in self.chords.get(address, []):
+            bridge.call(chord.cleanup)
+        self.set_available(address, False)
+        self.logger.warning(
+            f"MCP23017 at address {hex(address)} on bus {self.number} failed "
+            f"{self.failures[address]} times in a row, offline until it can be initialized again"
+        )
+
+    def set_available(self, address, available: bool) -> None:
+        """Mark the binary sensors and outputs of a chip (un)available."""
+        base = get_pin_index(address, 0)
+        for table in (self.pin_sensors, self.pin_outputs):
+            for entity in table[base : base + PINS_PER_CHIP]:
+                if entity is not None:
+                    bridge.call(entity.set_available, available)
+
+    def service_interrupt(self, address, timestamp) -> None:
+        """Read the interrupt state of one chip and dispatch changed pins."""
+        if self.trace:
+            self.logger.debug("Interrupt occurred on device %#x bus %d", address, self.number)
+
+        stats = self.stats[address - MCP23017_BASE_ADDRESS]
+        stages = stats.stages
+        stats.interrupts += 1
+        started = time.monotonic()
+        try:
+            state = self.read_interrupt_state(address)
+        except Exception as e:
+            self.chip_failed(address, f"Error reading interrupt state: {e}")
+            return
+        if self.failures:
+            self.failures.pop(address, None)
+        read = time.monotonic()
+        stages["i2c_read"].record(read - started)
+        stages["edge_to_read"].record(read - timestamp)
+
+        self.process_state(address, state, timestamp, read)
+
+    def process_state(self, address, state, timestamp, now) -> int:
+        """Decode an INTFA..GPIOB snapshot and dispatch the accepted changes.
+
+        INTCAP is applied at the edge time, then GPIO at the read time so
+        transitions made while the interrupt was pending are not lost.
+        Returns the number of pins whose GPIO level differed from the cache
+        after INTCAP was applied.
+        """
+        intf_a, intf_b, intcap_a, intcap_b, gpio_a, gpio_b = state
+        stats = self.stats[address - MCP23017_BASE_ADDRESS]
+        decode = stats.stages["decode"]
+        debouncer = self.debouncer
+        base = get_pin_index(address, 0)
+        late = 0
+
+        for offset, flags, captured, current in (
+            (0, intf_a, intcap_a, gpio_a),
+            (8, intf_b, intcap_b, gpio_b),
+        ):
+            port_index = (base + offset) >> 3
+            if flags:
+                if self.trace:
+                    self.logger.debug("port %d data %#010b", offset >> 3, captured)
+                if journal.enabled:
+                    journal.record(
+                        timestamp, self.number, address, offset >> 3, flags, captured, SOURCE_INTCAP
+                    )
+                bridge.set_edge_time(timestamp)
+                started = time.monotonic()
+                accepted = debouncer.update(port_index, captured, timestamp, flags)
+                decode.record(time.monotonic() - started)
+                self.dispatch(base + offset, accepted, captured, stats, timestamp)
+
+            if current != debouncer.state[port_index]:
+                late += bin(current ^ debouncer.state[port_index]).count("1")
+                if journal.enabled:
+                    journal.record(now, self.number, address, offset >> 3, 0, current, SOURCE_GPIO)
+                bridge.set_edge_time(now)
+                accepted = debouncer.update(port_index, current, now)
+                self.dispatch(base + offset, accepted, current, stats, now)
+
+        if self.chords:
+            self.update_chords(address, now)
+        return late
+
+    def settle(self, address) -> None:
+        """Re-read a chip whose pins were chattering and accept the final levels."""
+        stats = self.stats[address - MCP23017_BASE_ADDRESS]
+        base = get_pin_index(address, 0)
+        try:
+            gpio_a, gpio_b = self.read_registers(address, GPIOA, 2)
+        except Exception as e:
+            self.chip_failed(address, f"Error settling debounced pins: {e}")
+            return
+        now = time.monotonic()
+        bridge.set_edge_time(now)
+        for offset, data in ((0, gpio_a), (8, gpio_b)):
+            if journal.enabled:
+                journal.record(now, self.number, address, offset >> 3, 0, data, SOURCE_SETTLE)
+            accepted = self.debouncer.update((base + offset) >> 3, data, now)
+            self.dispatch(base + offset, accepted, data, stats, now)
+        if self.chords:
+            self.update_chords(address, now)
+
+    def update_chords(self, address, timestamp) -> None:
+        """Feed the accepted levels of a whole chip to its chords."""
+        chords = self.chords.get(address)
+        if not chords:
+            return
+        port_index = get_pin_index(address, 0) >> 3
+        state = self.debouncer.state
+        # Contacts pull to ground, a cleared bit is a pressed button
+        pressed = ~(state[port_index] | state[port_index + 1] << 8) & 0xFFFF
+        for chord in chords:
+            bridge.call(chord.update, pressed, timestamp)
+
+    def reconcile(self) -> bool:
+        """Bulk read every online chip and catch up on missed interrupts.
+
+        A pending INTF means the rising edge was never seen and the INT line
+        is stuck asserted; the read releases it. GPIO levels that differ from
+        the cache are fed through the debouncer as late transitions.
+        Returns True when nothing was missed and no read failed.
+        """
+        healthy = True
+        for address in list(self.online):
+            stats = self.stats[address - MCP23017_BASE_ADDRESS]
+            try:
+                state = self.read_interrupt_state(address)
+            except Exception as e:
+                healthy = False
+                self.chip_failed(address, f"Reconciliation read failed: {e}")
+                continue
+            self.failures.pop(address, None)
+
+            now = time.monotonic()
+            if state[0] or state[1]:
+                stats.missed_interrupts += 1
+                healthy = False
+
+            late = self.process_state(address, state, now, now)
+            if late:
+                stats.reconciled_changes += late
+                healthy = False
+                if self.trace:
+                    self.logger.debug(
+                        "Reconciled %d missed changes on %#x bus %d", late, address, self.number
+                    )
+
+        return healthy
+
+    def dispatch(self, port_base, changed, data, stats, timestamp) -> None:
+        """Queue the changed bits for the chip's gesture engine and sensors.
+
+        Buttons of the port are updated together by one engine call, every
+        other set bit of changed goes to its pin handler. Both run in the
+        event loop with the rest of this pass. timestamp is when the level
+        was observed, the edge time for INTCAP.
+        """
+        pin_handlers = self.pin_handlers
+        pin_changes = stats.pin_changes
+        gesture = stats.stages["gesture"]
+        trace = self.trace
+
+        engine = self.gestures[port_base // PINS_PER_CHIP]
+        shift = port_base % PINS_PER_CHIP
+        buttons = changed & (engine.mask >> shift) & 0xFF
+        if buttons:
+            if trace:
+                self.logger.debug(
+                    "Send port change %#010b levels %#010b to gesture engine %#x bus %d",
+                    buttons, data, engine.address, self.number,
+                )
+            bridge.call(
+                self.run_timed, gesture, engine.update, buttons << shift, data << shift, timestamp
+            )
+
+        # Walk only the bits that flipped
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            idx = port_base + bit.bit_length() - 1
+            value = data & bit
+            pin_changes[idx & 0x0F] += 1
+
+            handler = pin_handlers[idx]
+            if handler is None or bit & buttons:
+                continue
+
+            if trace:
+                self.logger.debug("Send change event to pin %d value %d", idx, value)
+            bridge.call(self.run_timed, gesture, handler.onChange, value, timestamp)
+
+    def run_timed(self, histogram, handler, *args) -> None:
+        """Run a gesture or sensor update in the loop, timed into histogram."""
+        started = time.monotonic()
+        try:
+            handler(*args)
+        except Exception as e:
+            self.logger.error(f"Error handling pin event: {e}")
+        histogram.record(time.monotonic() - started)
+
+
+buses: dict[int, Mcp23017Bus] = {}
 
+i2c_backend: I2CBackend = SMBusBackend()
+gpio_backend: GPIOBackend = RPiGPIOBackend()
 
-i2caddresses = {MCP23017_0X20, MCP23017_0X21}
-code2buttons: dict[str, Button] = {}
-code2sensors: dict[str, SweetHomeBinarySensor] = {}
 
-i2cbus = SMBus(1)
+def set_backends(i2c: I2CBackend | None = None, gpio: GPIOBackend | None = None):
+    """Swap the I2C and/or GPIO backend, e.g. for the simulator."""
+    global i2c_backend, gpio_backend
+    if i2c is not None:
+        i2c_backend = i2c
+    if gpio is not None:
+        gpio_backend = gpio
+
+
+def get_bus(number: int) -> Mcp23017Bus:
+    """Return the bus object, creating it on first use."""
+    bus = buses.get(number)
+    if bus is None:
+        bus = buses[number] = Mcp23017Bus(number)
+    return bus
+
+
+def get_config_registers(interrupt_mask=0xFFFF, output_mask=0):
+    """Return the IODIRA..GPPUB register file written at chip init.
+
+    Pull-ups stay on for every pin so unused inputs do not float, only
+    GPINTEN follows interrupt_mask. Pins in output_mask are outputs.
+    """
+    return [
+        ~output_mask & 0xFF, ~(output_mask >> 8) & 0xFF,  # IODIRA, IODIRB
+        0x00, 0x00,  # IPOLA, IPOLB
+        interrupt_mask & 0xFF, interrupt_mask >> 8,  # GPINTENA, GPINTENB
+        0xFF, 0xFF,  # DEFVALA, DEFVALB
+        0x00, 0x00,  # INTCONA, INTCONB - compare against previous value
+        IOCON_VALUE, IOCON_VALUE,  # IOCON is mirrored at both addresses
+        0xFF, 0xFF,  # GPPUA, GPPUB
+    ]
 
-def get_button_code(address, port, pin):
-    """Generate a unique code for button/sensor identification."""
-    return "{}-{}-{}".format(hex(address), hex(port), pin)
 
 def setButtons(buttons: dict[str, list[Button]]):
     """Register buttons with the MCP23017 handler."""
-    global code2buttons
-    code2buttons.clear()  # Clear existing buttons
-    
+    for bus in buses.values():
+        bus.pin_buttons[:] = [None] * len(bus.pin_buttons)  # Clear existing buttons
+
     for btns in buttons.values():
         for b in btns:
-            port = GPIOB if b.pin > 7 else GPIOA
-            pin = b.pin if b.pin < 8 else b.pin - 8
-            code2buttons[get_button_code(b.address, port, pin)] = b
+            bus = get_bus(b.bus)
+            idx = get_pin_index(b.address, b.pin)
+            bus.pin_buttons[idx] = b
+            bus.debouncer.stable_times[idx] = b.debounce / 1000
+
+    for bus in buses.values():
+        bus.rebuild_pin_handlers()
+        bus.refresh_interrupt_masks()
+
+
+def updateButtons(removed: list[Button], added: list[Button]):
+    """Swap individual buttons without touching the other pins.
+
+    Only the chips owning a changed pin get their GPINTEN rewritten, interrupt
+    service on every other pin carries on.
+    """
+    touched: dict[Mcp23017Bus, set[int]] = {}
+    for b in removed:
+        bus = get_bus(b.bus)
+        idx = get_pin_index(b.address, b.pin)
+        if bus.pin_buttons[idx] is b:
+            bus.pin_buttons[idx] = None
+        b.cleanup()
+        touched.setdefault(bus, set()).add(idx)
+
+    for b in added:
+        bus = get_bus(b.bus)
+        idx = get_pin_index(b.address, b.pin)
+        bus.pin_buttons[idx] = b
+        bus.sync_gesture(idx)
+        bus.debouncer.stable_times[idx] = b.debounce / 1000
+        touched.setdefault(bus, set()).add(idx)
+
+    for bus, indexes in touched.items():
+        for idx in indexes:
+            button = bus.pin_buttons[idx]
+            bus.pin_handlers[idx] = button if button is not None else bus.pin_sensors[idx]
+        bus.refresh_interrupt_masks(
+            {MCP23017_BASE_ADDRESS + idx // PINS_PER_CHIP for idx in indexes}
+        )
+
+
+def setChords(chords: dict[str, list[Chord]]):
+    """Register chords with their chips, replacing the previous ones."""
+    by_bus: dict[int, dict[int, list[Chord]]] = {}
+    for device_chords in chords.values():
+        for chord in device_chords:
+            by_bus.setdefault(chord.bus, {}).setdefault(chord.address, []).append(chord)
+
+    for bus in list(buses.values()):
+        old_chords = bus.chords
+        bus.chords = by_bus.pop(bus.number, {})
+        for chip_chords in old_chords.values():
+            for chord in chip_chords:
+                chord.cleanup()
+    for number, bus_chords in by_bus.items():
+        get_bus(number).chords = bus_chords
+
 
 def addBynarySensor(sensor: SweetHomeBinarySensor):
     """Register a binary sensor with the MCP23017 handler."""
-    port = GPIOB if sensor.pin > 7 else GPIOA
-    pin = sensor.pin if sensor.pin < 8 else sensor.pin - 8
-    code2sensors[get_button_code(sensor.address, port, pin)] = sensor
+    bus = get_bus(sensor.bus)
+    idx = get_pin_index(sensor.address, sensor.pin)
+    bus.pin_sensors[idx] = sensor
+    bus.debouncer.stable_times[idx] = sensor.debounce / 1000
+    if bus.pin_buttons[idx] is None:
+        bus.pin_handlers[idx] = sensor
+    if sensor.address not in bus.online:
+        return
+    if bus.interrupt_masks.get(sensor.address, 0) & (1 << sensor.pin):
+        # Added after its chip came online, start from the cached level
+        sensor.onChange(bus.prev_datas[idx >> 3] & (1 << (idx & 7)))
+    else:
+        bus.refresh_interrupt_masks([sensor.address])
 
-def initialize_mcp23017(logger):
-    """Initialize MCP23017 chips with proper error handling."""
-    try:
-        logger.info("Configure mcp23017")
-        
-        for i2caddress in i2caddresses:
-            try:
-                # Test if the device is present
-                i2cbus.read_byte_data(i2caddress, IOCONA)
-                
-                # Configure the MCP23017
-                i2cbus.write_byte_data(
-                    i2caddress, IOCONA, 0 | CONF["HAEN"] | CONF["INTPOL"] | CONF["MIRROR"]
-                )  # Update configuration register
-                i2cbus.write_byte_data(
-                    i2caddress, IOCONB, 0 | CONF["HAEN"] | CONF["INTPOL"] | CONF["MIRROR"]
-                )  # Update configuration register
-                i2cbus.write_byte_data(i2caddress, IPOLA, 0x00)
-                i2cbus.write_byte_data(i2caddress, IPOLB, 0x00)
-                i2cbus.write_byte_data(i2caddress, IODIRA, 0xFF)
-                i2cbus.write_byte_data(i2caddress, IODIRB, 0xFF)
-                i2cbus.write_byte_data(i2caddress, GPINTENA, 0xFF)
-                i2cbus.write_byte_data(i2caddress, GPINTENB, 0xFF)
-                i2cbus.write_byte_data(i2caddress, INTCONA, 0x00)
-                i2cbus.write_byte_data(i2caddress, INTCONB, 0x00)
-                i2cbus.write_byte_data(i2caddress, GPPUA, 0xFF)
-                i2cbus.write_byte_data(i2caddress, GPPUB, 0xFF)
-                i2cbus.write_byte_data(i2caddress, DEFVALA, 0xFF)
-                i2cbus.write_byte_data(i2caddress, DEFVALB, 0xFF)
-                i2cbus.write_byte_data(i2caddress, GPIOA, 0xFF)
-                i2cbus.write_byte_data(i2caddress, GPIOB, 0xFF)
-
-                # Clear interrupt flags
-                i2cbus.read_byte_data(i2caddress, INTCAPA)
-                i2cbus.read_byte_data(i2caddress, INTCAPB)
-                i2cbus.read_byte_data(i2caddress, INTFA)
-                i2cbus.read_byte_data(i2caddress, INTFB)
-                
-                logger.info(f"MCP23017 at address {hex(i2caddress)} initialized successfully")
-                
-            except Exception as e:
-                logger.warning(f"Failed to initialize MCP23017 at address {hex(i2caddress)}: {e}")
 
-        logger.info("MCP23017 initialization completed")
-        
-    except Exception as e:
-        logger.error(f"Failed to initialize I2C bus: {e}")
-        raise
+def removeBinarySensor(sensor: SweetHomeBinarySensor):
+    """Unregister a binary sensor, its pin stops interrupting unless a button uses it."""
+    bus = get_bus(sensor.bus)
+    idx = get_pin_index(sensor.address, sensor.pin)
+    if bus.pin_sensors[idx] is not sensor:
+        return
+    bus.pin_sensors[idx] = None
+    if bus.pin_handlers[idx] is sensor:
+        bus.pin_handlers[idx] = None
+        bus.refresh_interrupt_masks([sensor.address])
 
-def Run(logger):
-    """Main loop for handling MCP23017 interrupts."""
-    # pi = pigpio.pi()
-    # if not pi.connected:
-        # logger.error("Could not connect to pigpiod")
-        # return
 
-    try:
-        initialize_mcp23017(logger)
+def addOutput(output):
+    """Register a switch or light driving a pin configured as output."""
+    bus = get_bus(output.bus)
+    bus.pin_outputs[get_pin_index(output.address, output.pin)] = output
+    bit = 1 << output.pin
+    if not (bus.output_masks.get(output.address, 0) | bus.held_outputs.get(output.address, 0)) & bit:
+        # New outputs start off, which is a high latch for inverted ones.
+        # A pin the chip was already driving keeps its adopted level.
+        set_output(output.bus, output.address, output.pin, output.invert)
+    if output.address in bus.online:
+        bus.submit(lambda: bus.update_output_mask(output.address))
 
-        def get_data_code(address, port):
-            return "{}-{}".format(address, port)
 
-        prev_datas = {}
+def set_output(bus_number: int, address: int, pin: int, value: bool) -> Mcp23017Bus:
+    """Set an output in the latch shadow and mark its chip for writing.
 
-        def get_interruption_callback(address):
-            def interruption_callback(channel):
-                logger.debug("Interrupt occurred on device {}".format(hex(address)))
+    Nothing is written here, call bus.submit(bus.write_outputs) once after a
+    batch of changes to put them on the wire.
+    """
+    bus = get_bus(bus_number)
+    idx = get_pin_index(address, pin)
+    bit = 1 << (idx & 7)
+    with bus.output_lock:
+        if value:
+            bus.olat[idx >> 3] |= bit
+        else:
+            bus.olat[idx >> 3] &= ~bit
+        bus.dirty_outputs.add(address)
+    return bus
 
-                try:
-                    time.sleep(10 / 1000)  # Debounce delay
-                    # for port in [INTCAPA, INTCAPB]:
-                    for port in [GPIOA, GPIOB]:
-                        try:
-                            data = i2cbus.read_byte_data(address, INTCAPA if port == GPIOA else INTCAPB)
-                            data_code = get_data_code(address, port)
-                            prev_data = prev_datas.get(data_code, 0xFF)
-                            prev_datas[data_code] = data
-                            
-                            logger.debug("port {} data {}".format(hex(port), bin(data)))
-                            
-                            for x in range(8):
-                                value = data & (1 << x)
-                                button_code = get_button_code(address, port, x)
-                                
-                                if prev_data & (1 << x) != value:
-                                    logger.debug(
-                                        "Changed pin {} to {}".format(button_code, value)
-                                    )
-                                    
-                                    button = code2buttons.get(button_code)
-                                    sensor = code2sensors.get(button_code)
-                                    
-                                    if button is not None:
-                                        logger.debug(
-                                            "Send change event to button {}".format(button_code)
-                                        )
-                                        try:
-                                            button.onChange(value)
-                                        except Exception as e:
-                                            logger.error(f"Error handling button event: {e}")
-                                            
-                                    elif sensor is not None:
-                                        logger.debug(
-                                            "Send change event to binary sensor {}".format(button_code)
-                                        )
-                                        try:
-                                            sensor.onChange(value)
-                                        except Exception as e:
-                                            logger.error(f"Error handling sensor event: {e}")
-                                            
-                        except Exception as e:
-                            logger.error(f"Error reading port {hex(port)}: {e}")
-                            
-                except Exception as e:
-                    logger.error("Error in interruption callback: {}".format(e))
 
-            return interruption_callback
+def get_output(bus_number: int, address: int, pin: int) -> bool:
+    """Level of an output pin, served from the latch shadow."""
+    bus = get_bus(bus_number)
+    idx = get_pin_index(address, pin)
+    return bool(bus.olat[idx >> 3] & (1 << (idx & 7)))
 
-        INTERRUPT_PIN_X20 = 27  # pin 13 / 7
-        INTERRUPT_PIN_X21 = 22  # pin 15 / 8
 
+def close():
+    """Detach interrupts, stop the workers and close every open I2C bus."""
+    for bus in buses.values():
+        bus.close()
+    gpio_backend.cleanup()
+
+
+def Run(logger, bus_configs):
+    """Start servicing MCP23017 interrupts, returns without touching the bus.
+
+    bus_configs is a list of {"bus": int, "chips": {address: interrupt_pin}},
+    optionally with "known": the addresses a scan found on the bus, empty or
+    None when unknown. Every bus gets its own worker which configures its
+    chips, retries the ones that are absent or failing, and attaches their
+    interrupts once they are online. Called again with a new list, running
+    buses only add and remove the chips that differ, buses missing from the
+    list drop theirs.
+    """
+    configured = set()
+    for bus_config in bus_configs:
+        bus = get_bus(bus_config["bus"])
+        configured.add(bus.number)
+        # A scan that found nothing on the bus, e.g. because it failed, says
+        # nothing about which chips are there
+        bus.known = bus_config.get("known") or None
+        if bus.worker is not None:
+            bus.set_chips(bus_config["chips"])
+            continue
+        bus.chips = dict(bus_config["chips"])
         logger.info(
-            "Configure GPIO and attach interruptions on ports {}, {}".format(
-                INTERRUPT_PIN_X20, INTERRUPT_PIN_X21
+            "Starting bus {} with chips {}".format(
+                bus.number, ", ".join(hex(address) for address in bus.chips)
             )
         )
-        
-        try:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setup(INTERRUPT_PIN_X20, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-            GPIO.setup(INTERRUPT_PIN_X21, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-
-            GPIO.add_event_detect(
-                INTERRUPT_PIN_X20,
-                GPIO.RISING,
-                callback=get_interruption_callback(MCP23017_0X20),
-                bouncetime=5  # Add bounce time to prevent false triggers
-            )
-            GPIO.add_event_detect(
-                INTERRUPT_PIN_X21,
-                GPIO.RISING,
-                callback=get_interruption_callback(MCP23017_0X21),
-                bouncetime=5  # Add bounce time to prevent false triggers
-            )
-            
-            logger.info("GPIO interrupts configured successfully")
-            
-        except Exception as e:
-            logger.error(f"Error configuring GPIO: {e}")
-            raise
-            
-    except Exception as e:
-        logger.error(f"Error in Run function: {e}")
-        raise
+        bus.start_worker(logger)
+
+    for bus in buses.values():
+        if bus.number not in configured and bus.chips:
+            bus.set_chips({})
+
+
+def scan_bus(number: int) -> dict[int, list[int]] | None:
+    """Probe 0x20 - 0x27 on one bus, None if the bus cannot be opened.
+
+    Only IODIRA..GPPUB is read, INTCAP and GPIO are left alone so pending
+    interrupts of chips already in use are not cleared.
+    """
+    try:
+        i2cbus = i2c_backend.open_bus(number)
+    except Exception:
+        return None
+    found = {}
+    try:
+        for address in range(MCP23017_BASE_ADDRESS, MCP23017_BASE_ADDRESS + MCP23017_MAX_CHIPS):
+            try:
+                found[address] = list(
+                    i2cbus.read_i2c_block_data(address, IODIRA, GPPUB - IODIRA + 1)
+                )
+            except Exception:
+                continue
+    finally:
+        i2cbus.close()
+    return found
+
+
+def scan(bus_numbers: list[int] | None = None) -> dict[int, dict[int, list[int]]]:
+    """Find the chips on every I2C bus and read their register file.
+
+    Buses are scanned in parallel, one thread each. Returns bus -> address ->
+    IODIRA..GPPUB for the buses that could be opened, found chips or not.
+    """
+    if bus_numbers is None:
+        bus_numbers = i2c_backend.list_buses()
+    if not bus_numbers:
+        return {}
+    with ThreadPoolExecutor(len(bus_numbers), thread_name_prefix="sweet_home_scan") as pool:
+        results = list(pool.map(scan_bus, bus_numbers))
+    return {
+        number: found
+        for number, found in zip(bus_numbers, results)
+        if found is not None
+    }
+
+
+def get_pin_map() -> dict:
+    """Buttons, binary sensors and chords, as stored in journal dumps."""
+    pin_map = {"buttons": [], "sensors": [], "chords": []}
+    for bus in buses.values():
+        for chip_chords in bus.chords.values():
+            for chord in chip_chords:
+                pin_map["chords"].append(
+                    {
+                        "device_id": chord.device_id,
+                        "members": [b.subtype for b in chord.members],
+                        "window": chord.window,
+                    }
+                )
+        for b in bus.pin_buttons:
+            if b is not None:
+                pin_map["buttons"].append(
+                    {
+                        "bus": bus.number,
+                        "address": b.address,
+                        "pin": b.pin,
+                        "presses": b.presses,
+                        "debounce": b.debounce,
+                        "next_press": b.next_press,
+                        "demand": b.demand,
+                        "device_id": b.device_id,
+                        "subtype": b.subtype,
+                    }
+                )
+        for sensor in bus.pin_sensors:
+            if sensor is not None:
+                pin_map["sensors"].append(
+                    {
+                        "bus": bus.number,
+                        "address": sensor.address,
+                        "pin": sensor.pin,
+                        "debounce": sensor.debounce,
+                    }
+                )
+    return pin_map
+
+
+def get_stats() -> dict:
+    """Snapshot of the hot path counters of every configured chip."""
+    return {
+        f"{bus.number}-{hex(address)}": bus.stats[address - MCP23017_BASE_ADDRESS].as_dict()
+        for bus in buses.values()
+        for address in bus.chips
+    }
+
+
+def iter_chip_stats():
+    """Yield the ChipStats of every configured chip."""
+    for bus in buses.values():
+        for address in bus.chips:
+            yield bus.stats[address - MCP23017_BASE_ADDRESS]
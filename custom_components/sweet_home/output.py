@@ -0,0 +1,100 @@
+"""MCP23017 pins driven as outputs: relays, LEDs."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .bridge import bridge
+from .const import DEFAULT_BUS, DOMAIN
+
+
+class OutputWriter:
+    """Coalesces output changes made in one event loop iteration.
+
+    A scene switching many relays calls turn_on/turn_off per entity within the
+    same loop iteration; the latch shadow takes every change at once and each
+    affected bus worker is asked to write only after the iteration, so a chip
+    gets one OLATA/OLATB transaction for all of them.
+    """
+
+    def __init__(self) -> None:
+        self._buses: set = set()
+        self._scheduled = False
+
+    @callback
+    def set(self, hass: HomeAssistant, output: "SweetHomeOutput", on: bool) -> None:
+        from .mcp23017 import set_output
+
+        self._buses.add(
+            set_output(output.bus, output.address, output.pin, on != output.invert)
+        )
+        if not self._scheduled:
+            self._scheduled = True
+            hass.loop.call_soon(self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        self._scheduled = False
+        buses, self._buses = self._buses, set()
+        for bus in buses:
+            bus.submit(bus.write_outputs)
+
+
+output_writer = OutputWriter()
+
+
+class SweetHomeOutput(Entity):
+    """Base of the switch and light entities on an output pin.
+
+    The state is read from the latch shadow, never from the bus.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        kind: str,
+        address: int,
+        pin: int,
+        bus: int = DEFAULT_BUS,
+        invert: bool = False,
+        name: str | None = None,
+    ) -> None:
+        self.bus = bus
+        self.address = address
+        self.pin = pin
+        self.invert = invert
+        if bus == DEFAULT_BUS:
+            self._attr_unique_id = f"{DOMAIN}-{kind}-{hex(address)}-{pin}"
+            default_name = f"{kind.capitalize()} {hex(address)}-{pin}"
+        else:
+            self._attr_unique_id = f"{DOMAIN}-{kind}-{bus}-{hex(address)}-{pin}"
+            default_name = f"{kind.capitalize()} {bus}-{hex(address)}-{pin}"
+        self._attr_name = name or default_name
+
+        from .mcp23017 import addOutput
+        addOutput(self)
+
+    @property
+    def is_on(self) -> bool:
+        from .mcp23017 import get_output
+
+        return get_output(self.bus, self.address, self.pin) != self.invert
+
+    def set_available(self, available: bool) -> None:
+        """Called while the chip is offline after repeated I2C failures."""
+        if self._attr_available == available:
+            return
+        self._attr_available = available
+        if self.hass is not None:
+            bridge.write_state(self)
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        output_writer.set(self.hass, self, True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        output_writer.set(self.hass, self, False)
+        self.async_write_ha_state()
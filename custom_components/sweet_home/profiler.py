@@ -0,0 +1,138 @@
+"""On-demand sampling profiler for the interrupt path.
+
+Started by the sweet_home.profile service. A sampler thread walks the stacks
+of the bus workers and of the event loop every interval with
+sys._current_frames(), so nothing is added to the hot path while it runs or
+while it is off. Loop samples are kept only while the loop is inside this
+integration (gesture engines, sensors, event delivery, timers).
+
+Two files are written: PATH.folded, one "thread;frame;frame count" line per
+stack for flamegraph.pl, speedscope and similar, and PATH.pstats, loadable
+with pstats.Stats or snakeviz, with sample counts as call counts and sampled
+time as tottime/cumtime.
+"""
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+import threading as th
+import time
+from collections import Counter
+from types import FrameType
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_INTERVAL = 1  # milliseconds
+
+FrameKey = tuple[str, int, str]  # pstats function key: file, line, name
+
+
+def frame_key(frame: FrameType) -> FrameKey:
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def sample_stack(frame: FrameType, package_only: bool) -> tuple[FrameKey, ...] | None:
+    """Root-first stack of frame, for package_only cut at the first frame
+    of this integration and None when there is none."""
+    stack = []
+    start = None
+    while frame is not None:
+        stack.append(frame_key(frame))
+        if package_only and frame.f_code.co_filename.startswith(PACKAGE_DIR):
+            start = len(stack)
+        frame = frame.f_back
+    if package_only:
+        if start is None:
+            return None
+        del stack[start:]
+    stack.reverse()
+    return tuple(stack)
+
+
+class PathProfiler:
+    """Collects stack samples of the given threads for a while."""
+
+    def __init__(self) -> None:
+        self._lock = th.Lock()
+        self.running = False
+
+    def profile(
+        self,
+        threads: dict[int, tuple[str, bool]],
+        duration: float,
+        interval: float,
+    ) -> tuple[Counter, float]:
+        """Sample threads (ident -> (label, package_only)) for duration seconds.
+
+        Blocks the calling thread. Returns a Counter of (label, *stack) and
+        the average time between samples, the time each sample stands for.
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profile is already running")
+            self.running = True
+        samples: Counter = Counter()
+        rounds = 0
+        try:
+            me = th.get_ident()
+            start = time.monotonic()
+            end = start + duration
+            while time.monotonic() < end:
+                rounds += 1
+                frames = sys._current_frames()
+                for ident, (label, package_only) in threads.items():
+                    frame = frames.get(ident)
+                    if frame is None or ident == me:
+                        continue
+                    stack = sample_stack(frame, package_only)
+                    if stack is not None:
+                        samples[(label, *stack)] += 1
+                del frames
+                time.sleep(interval)
+        finally:
+            self.running = False
+        return samples, (time.monotonic() - start) / max(rounds, 1)
+
+
+def write_folded(samples: Counter, path: str) -> None:
+    with open(path, "w") as file:
+        for (label, *stack), count in samples.most_common():
+            frames = ";".join(
+                f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack
+            )
+            file.write(f"{label};{frames} {count}\n")
+
+
+def write_pstats(samples: Counter, interval: float, path: str) -> None:
+    """Write samples in the marshalled format pstats.Stats loads."""
+    stats: dict[FrameKey, list] = {}
+    for (_, *stack), count in samples.items():
+        weight = count * interval
+        seen = set()
+        caller = None
+        for key in stack:
+            entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            if key not in seen:
+                # Recursion counts once towards cumulative time
+                seen.add(key)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += weight
+            if caller is not None:
+                nc, cc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                entry[4][caller] = (nc + count, cc + count, tt, ct + weight)
+            caller = key
+        if stack:
+            stats[stack[-1]][2] += weight
+            leaf_callers = stats[stack[-1]][4]
+            if len(stack) > 1:
+                nc, cc, tt, ct = leaf_callers[stack[-2]]
+                leaf_callers[stack[-2]] = (nc, cc, tt + weight, ct)
+
+    with open(path, "wb") as file:
+        marshal.dump({key: tuple(entry) for key, entry in stats.items()}, file)
+
+
+profiler = PathProfiler()
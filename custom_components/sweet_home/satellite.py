@@ -0,0 +1,687 @@
+"""Remote satellite mode: expander chips served by a node on another machine.
+
+A satellite Pi near the wall panels runs the node:
+
+    python custom_components/sweet_home/satellite.py --token TOKEN [--host HOST] [--port 7017 | --path SOCKET]
+
+Started by its path it imports the node's modules from this directory
+without the integration's __init__, so it needs the I2C and GPIO libraries
+but not Home Assistant. python -m custom_components.sweet_home.satellite
+works too where Home Assistant is installed.
+
+The node runs the same bus workers, debouncer, gesture engines and chords
+as the integration does locally, and streams compact binary frames to a
+SatelliteClient inside the integration. The client fires the gestures as
+sweet_home_event, so device triggers work as for local buttons, and updates
+the satellite's binary sensors. The node keeps no configuration of its own:
+the client sends the chips, buttons and sensors on every connect. The node listens on localhost unless told
+otherwise, and only takes a client that proves it knows the shared token:
+the HMAC of the node's nonce with the token, so the token itself is never
+sent.
+
+Every frame is a 3 byte header, type and payload length in network order,
+followed by the payload:
+
+    HELLO      node -> client   JSON {"version", "node", "nonce"}
+    HELLO      client -> node   JSON {"version", "auth"}, HMAC-SHA256 of the nonce
+    ACCEPT     node -> client   empty, the client's HELLO is valid
+    CONFIG     client -> node   JSON, see SatelliteClient.config()
+    DEMAND     client -> node   !HB  button id, press demand (0 unknown)
+    GESTURE    node -> client   !HB  trigger id, event (index in EVENTS)
+    EDGE       node -> client   !HB  sensor id, level
+    AVAILABLE  node -> client   !HB  sensor id, chip online
+
+Frames the node produces in one loop iteration, i.e. one interrupt pass,
+go out in a single write, and the client handles everything one read
+returned as one event bridge delivery.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import socket
+import struct
+from typing import TYPE_CHECKING, Any
+
+if not __package__:
+    # Started by path: make this directory a package of its own, without
+    # running the integration's __init__ and its Home Assistant imports
+    import sys
+    import types
+
+    _package = types.ModuleType("sweet_home")
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[_package.__name__] = _package
+    __package__ = _package.__name__
+
+from .bridge import bridge
+from .button import Button
+from .chord import Chord
+from .const import (
+    CONF_DEVICE_ID,
+    CONF_SUBTYPE,
+    CONF_TYPE,
+    DEFAULT_SATELLITE_PORT,
+    DOMAIN,
+    EVENT_DOUBLE_PRESS,
+    EVENT_LONG_PRESS,
+    EVENT_SINGLE_PRESS,
+    EVENT_TRIPLE_PRESS,
+    EVENT_TYPE,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .binary_sensor import SweetHomeBinarySensor
+
+_LOGGER = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 2
+
+HEADER = struct.Struct("!BH")
+ID_VALUE = struct.Struct("!HB")
+
+FRAME_HELLO = 1
+FRAME_CONFIG = 2
+FRAME_DEMAND = 3
+FRAME_GESTURE = 4
+FRAME_EDGE = 5
+FRAME_AVAILABLE = 6
+FRAME_ACCEPT = 7
+
+EVENTS = (EVENT_SINGLE_PRESS, EVENT_DOUBLE_PRESS, EVENT_TRIPLE_PRESS, EVENT_LONG_PRESS)
+EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENTS)}
+
+DEFAULT_HOST = "127.0.0.1"
+# Environment variable the node reads the token from, keeps it off the command line
+TOKEN_ENV = "SWEET_HOME_TOKEN"
+# Seconds a new connection has to send a valid HELLO
+HELLO_TIMEOUT = 10
+
+READ_SIZE = 65536
+# Bytes queued for a client that does not read before it is dropped
+MAX_BUFFERED = 1 << 20
+
+# Reconnect backoff of the client, seconds
+RECONNECT_MIN_INTERVAL = 1
+RECONNECT_MAX_INTERVAL = 60
+
+
+class ProtocolError(Exception):
+    """Malformed frame or incompatible peer."""
+
+
+def encode(frame_type: int, payload: bytes) -> bytes:
+    if len(payload) > 0xFFFF:
+        raise ProtocolError(f"Frame of {len(payload)} bytes does not fit the header")
+    return HEADER.pack(frame_type, len(payload)) + payload
+
+
+def encode_json(frame_type: int, data: Any) -> bytes:
+    return encode(frame_type, json.dumps(data, separators=(",", ":")).encode())
+
+
+def sign(token: str, nonce: str) -> str:
+    """The auth of a client HELLO: proves the token without sending it."""
+    return hmac.new(token.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+
+
+def split_frames(buffer: bytes) -> tuple[list[tuple[int, bytes]], int]:
+    """Complete frames at the start of buffer and the bytes they take up."""
+    frames = []
+    offset = 0
+    end = len(buffer)
+    while end - offset >= HEADER.size:
+        frame_type, length = HEADER.unpack_from(buffer, offset)
+        start = offset + HEADER.size
+        if end - start < length:
+            break
+        frames.append((frame_type, buffer[start : start + length]))
+        offset = start + length
+    return frames, offset
+
+
+class NodeBus:
+    """Event bus of the node's stand-in hass, gesture events become frames."""
+
+    def __init__(self, node: SatelliteNode) -> None:
+        self.node = node
+
+    def async_fire(self, event_type: str, data: dict[str, Any]) -> None:
+        self.node.gesture(data[CONF_SUBTYPE], data[CONF_TYPE])
+
+
+class NodeHass:
+    """Just the loop and event bus the event bridge and buttons use."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, node: SatelliteNode) -> None:
+        self.loop = loop
+        self.bus = NodeBus(node)
+
+
+class RemoteSensor:
+    """Node side of a satellite binary sensor, its updates become frames.
+
+    Registered in the bus tables like SweetHomeBinarySensor and, like it,
+    called in the event loop.
+    """
+
+    def __init__(
+        self, node: SatelliteNode, sensor_id: int, bus: int, address: int, pin: int, debounce: int
+    ) -> None:
+        self.node = node
+        self.sensor_id = sensor_id
+        self.bus = bus
+        self.address = address
+        self.pin = pin
+        self.debounce = debounce
+
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
+        self.node.send(FRAME_EDGE, ID_VALUE.pack(self.sensor_id, 1 if value else 0))
+
+    def set_available(self, available: bool) -> None:
+        self.node.send(FRAME_AVAILABLE, ID_VALUE.pack(self.sensor_id, 1 if available else 0))
+
+
+class SatelliteNode:
+    """Serves the chips of this machine to one SatelliteClient at a time.
+
+    The buses keep running while no client is connected. Gestures in that
+    time are lost, sensor levels are sent again once a client connects.
+    """
+
+    def __init__(self, token: str, logger: logging.Logger = _LOGGER) -> None:
+        if not token:
+            raise ValueError("The satellite node needs a token")
+        self.token = token
+        self.logger = logger
+        self.hass: NodeHass | None = None
+        self.server: asyncio.AbstractServer | None = None
+        self.config: dict | None = None
+        self.buttons: dict[int, Button] = {}
+        self.sensors: list[RemoteSensor] = []
+        # Button or chord subtype -> trigger id
+        self.triggers: dict[str, int] = {}
+        self.writer: asyncio.StreamWriter | None = None
+        self.buffer = bytearray()
+        self.scheduled = False
+        self.frames = 0
+        self.writes = 0
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_SATELLITE_PORT, path: str | None = None) -> None:
+        self.hass = NodeHass(asyncio.get_running_loop(), self)
+        bridge.setup(self.hass)
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+            self.logger.info(f"Satellite node listening on {path}")
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+            self.logger.info(f"Satellite node listening on {host}:{port}")
+
+    def close(self) -> None:
+        """Stop listening and release the buses, in the node's loop."""
+        from .mcp23017 import close
+        from .scheduler import scheduler
+
+        if self.server is not None:
+            self.server.close()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        close()
+        scheduler.stop()
+        bridge.stop()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_SATELLITE_PORT, path: str | None = None) -> None:
+        await self.start(host, port, path)
+        try:
+            await self.server.serve_forever()
+        finally:
+            self.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection.
+
+        Until its HELLO carries the right auth the connection gets nothing but
+        the node's HELLO, and the current client keeps being served.
+        """
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info("peername")
+        peer = f"{peer[0]}:{peer[1]}" if isinstance(peer, tuple) else "the Unix socket"
+        nonce = secrets.token_hex(16)
+        writer.write(
+            encode_json(
+                FRAME_HELLO,
+                {"version": PROTOCOL_VERSION, "node": socket.gethostname(), "nonce": nonce},
+            )
+        )
+        deadline = loop.time() + HELLO_TIMEOUT
+        accepted = False
+        buffer = b""
+        try:
+            while True:
+                if accepted:
+                    data = await reader.read(READ_SIZE)
+                else:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), deadline - loop.time())
+                if not data:
+                    break
+                buffer += data
+                frames, used = split_frames(buffer)
+                buffer = buffer[used:]
+                for frame_type, payload in frames:
+                    if not accepted:
+                        if frame_type != FRAME_HELLO:
+                            raise ProtocolError("Client did not start with HELLO")
+                        self.check_hello(json.loads(payload), nonce)
+                        self.accept(writer)
+                        accepted = True
+                    elif frame_type == FRAME_CONFIG:
+                        self.apply(json.loads(payload))
+                    elif frame_type == FRAME_DEMAND:
+                        button_id, demand = ID_VALUE.unpack(payload)
+                        button = self.buttons.get(button_id)
+                        if button is not None:
+                            button.set_demand(demand or None)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Client at {peer} did not send a HELLO in time")
+        except (OSError, ValueError, TypeError, IndexError, KeyError, struct.error, ProtocolError) as e:
+            self.logger.warning(f"Client at {peer} failed: {e}")
+        finally:
+            if self.writer is writer:
+                self.writer = None
+                self.buffer.clear()
+            writer.close()
+
+    def check_hello(self, hello: Any, nonce: str) -> None:
+        if not isinstance(hello, dict):
+            raise ProtocolError("Malformed HELLO")
+        if hello.get("version") != PROTOCOL_VERSION:
+            raise ProtocolError(
+                f"Client speaks protocol {hello.get('version')}, expected {PROTOCOL_VERSION}"
+            )
+        auth = str(hello.get("auth", "")).encode()
+        if not hmac.compare_digest(auth, sign(self.token, nonce).encode()):
+            raise ProtocolError("Wrong token")
+
+    def accept(self, writer: asyncio.StreamWriter) -> None:
+        """Make writer the client, frames queued for the previous one are dropped."""
+        if self.writer is not None:
+            self.logger.warning("New client connected, dropping the previous one")
+            self.writer.close()
+        self.writer = writer
+        self.buffer.clear()
+        writer.write(encode(FRAME_ACCEPT, b""))
+
+    def apply(self, config: dict) -> None:
+        """Serve the chips, buttons, chords and sensors the client sent.
+
+        The whole payload is decoded before anything running is touched, a
+        malformed one raises and leaves the node as it was.
+        """
+        from .mcp23017 import (
+            PINS_PER_CHIP,
+            Run,
+            addBynarySensor,
+            removeBinarySensor,
+            setButtons,
+            setChords,
+        )
+
+        if config == self.config:
+            # Reconnect, gestures in progress carry on
+            self.sync()
+            return
+
+        def check_pin(pin: Any) -> None:
+            if not isinstance(pin, int) or not 0 <= pin < PINS_PER_CHIP:
+                raise ProtocolError(f"Invalid pin {pin!r}")
+
+        buttons: dict[int, Button] = {}
+        triggers: dict[str, int] = {}
+        for button_id, bus, address, pin, presses, debounce, next_press, demand in config["buttons"]:
+            check_pin(pin)
+            button = Button(self.hass, "", str(button_id), address, pin, presses, bus, debounce, next_press)
+            button.demand = demand or None
+            buttons[button_id] = button
+            triggers[button.subtype] = button_id
+        chords = []
+        for chord_id, members, window in config["chords"]:
+            chord = Chord("", [buttons[member] for member in members], window)
+            chords.append(chord)
+            triggers[chord.subtype] = chord_id
+        sensors = []
+        for sensor_id, bus, address, pin, debounce in config["sensors"]:
+            check_pin(pin)
+            sensors.append(RemoteSensor(self, sensor_id, bus, address, pin, debounce))
+        window = config["event_window"] / 1000
+        bus_configs = [{"bus": bus, "chips": dict(chips)} for bus, chips in config["buses"]]
+
+        for sensor in self.sensors:
+            removeBinarySensor(sensor)
+        self.buttons = buttons
+        self.triggers = triggers
+        self.sensors = sensors
+        setButtons({"": list(buttons.values())})
+        setChords({"": chords})
+        for sensor in sensors:
+            addBynarySensor(sensor)
+        bridge.window = window
+        Run(self.logger, bus_configs)
+        self.config = config
+        self.logger.info(
+            f"Serving {len(self.buttons)} buttons, {len(chords)} chords and {len(self.sensors)} binary sensors"
+        )
+        self.sync()
+
+    def sync(self) -> None:
+        """Send the level and availability of every sensor.
+
+        Queued behind the mask updates pending on each bus worker, so sensors
+        added by this configuration report the level their chip was seeded with.
+        """
+        from .mcp23017 import get_bus
+
+        for number in {sensor.bus for sensor in self.sensors}:
+            bus = get_bus(number)
+            if bus.worker is None:
+                self.report(number)
+            else:
+                bus.submit(lambda number=number: bridge.call(self.report, number))
+
+    def report(self, number: int) -> None:
+        from .mcp23017 import get_bus, get_pin_index
+
+        bus = get_bus(number)
+        for sensor in self.sensors:
+            if sensor.bus != number:
+                continue
+            online = sensor.address in bus.online
+            sensor.set_available(online)
+            if online:
+                idx = get_pin_index(sensor.address, sensor.pin)
+                sensor.onChange(bus.prev_datas[idx >> 3] & (1 << (idx & 7)))
+
+    def gesture(self, subtype: str, event_type: str) -> None:
+        trigger_id = self.triggers.get(subtype)
+        if trigger_id is not None:
+            self.send(FRAME_GESTURE, ID_VALUE.pack(trigger_id, EVENT_CODES[event_type]))
+
+    def send(self, frame_type: int, payload: bytes) -> None:
+        """Queue a frame, everything queued in this loop iteration goes out together."""
+        if self.writer is None:
+            return
+        self.buffer += HEADER.pack(frame_type, len(payload))
+        self.buffer += payload
+        self.frames += 1
+        if not self.scheduled:
+            self.scheduled = True
+            self.hass.loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        self.scheduled = False
+        writer = self.writer
+        if writer is None or not self.buffer:
+            self.buffer.clear()
+            return
+        if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            self.logger.warning("Client does not keep up, dropping it")
+            writer.close()
+            self.writer = None
+            self.buffer.clear()
+            return
+        writer.write(bytes(self.buffer))
+        self.buffer.clear()
+        self.writes += 1
+
+
+class SatelliteClient:
+    """Home Assistant end of the connection to one satellite node.
+
+    Runs as a background task in the event loop and reconnects with backoff
+    (RECONNECT_MIN_INTERVAL doubling up to RECONNECT_MAX_INTERVAL), also
+    when the node closes the connection without accepting the token. While
+    disconnected the satellite's binary sensors are unavailable. writer is
+    only set once the node accepted the client.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        buses: list[dict],
+        buttons: list[Button],
+        chords: list[Chord],
+        sensors: list[SweetHomeBinarySensor],
+        token: str,
+        host: str | None = None,
+        port: int = DEFAULT_SATELLITE_PORT,
+        path: str | None = None,
+        event_window: int = 0,
+    ) -> None:
+        self.hass = hass
+        self.name = name
+        self.buses = buses
+        self.buttons = buttons
+        self.chords = chords
+        self.sensors = sensors
+        self.token = token
+        self.host = host
+        self.port = port
+        self.path = path
+        self.event_window = event_window
+        # Trigger id -> (device_id, subtype), buttons first, then chords
+        self.triggers = [(b.device_id, b.subtype) for b in buttons] + [
+            (chord.device_id, chord.subtype) for chord in chords
+        ]
+        self.button_ids = {id(button): n for n, button in enumerate(buttons)}
+        self.writer: asyncio.StreamWriter | None = None
+        self.task: asyncio.Task | None = None
+        self.node: str | None = None
+
+        self.connects = 0
+        self.frames = 0  # received
+        self.reads = 0  # reads that returned frames
+
+    @property
+    def endpoint(self) -> str:
+        return self.path if self.path is not None else f"{self.host}:{self.port}"
+
+    def config(self) -> dict:
+        """The CONFIG frame: ids are positions in the lists, chords follow buttons.
+
+        buses    [bus, [[address, interrupt_pin], ...]]
+        buttons  [id, bus, address, pin, presses, debounce, next_press, demand]
+        chords   [id, [member button ids], window]
+        sensors  [id, bus, address, pin, debounce]
+        """
+        offset = len(self.buttons)
+        return {
+            "buses": [[bus["bus"], list(bus["chips"].items())] for bus in self.buses],
+            "buttons": [
+                [n, b.bus, b.address, b.pin, b.presses, b.debounce, b.next_press, b.demand or 0]
+                for n, b in enumerate(self.buttons)
+            ],
+            "chords": [
+                [offset + n, [self.button_ids[id(b)] for b in chord.members], chord.window]
+                for n, chord in enumerate(self.chords)
+            ],
+            "sensors": [
+                [n, sensor.bus, sensor.address, sensor.pin, sensor.debounce]
+                for n, sensor in enumerate(self.sensors)
+            ],
+            "event_window": self.event_window,
+        }
+
+    def start(self) -> None:
+        self.task = self.hass.async_create_background_task(
+            self.run(), f"{DOMAIN} satellite {self.name}"
+        )
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def send_demand(self, button: Button) -> None:
+        """Forward a changed press demand, the node fires early or waits."""
+        button_id = self.button_ids.get(id(button))
+        if self.writer is not None and button_id is not None:
+            self.writer.write(encode(FRAME_DEMAND, ID_VALUE.pack(button_id, button.demand or 0)))
+
+    async def run(self) -> None:
+        interval = RECONNECT_MIN_INTERVAL
+        failures = 0
+        while True:
+            try:
+                if self.path is not None:
+                    reader, writer = await asyncio.open_unix_connection(self.path)
+                else:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                failures += 1
+                log = _LOGGER.warning if failures == 1 else _LOGGER.debug
+                log(f"Cannot connect to satellite {self.name} at {self.endpoint}, retry in {interval}s: {e}")
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, RECONNECT_MAX_INTERVAL)
+                continue
+
+            try:
+                await self.receive(reader, writer)
+                error = "closed the connection"
+            except (OSError, ValueError, IndexError, KeyError, struct.error, ProtocolError) as e:
+                error = f"connection failed: {e}"
+            finally:
+                served = self.writer is not None
+                self.writer = None
+                writer.close()
+                for sensor in self.sensors:
+                    sensor.set_available(False)
+            if served:
+                interval = RECONNECT_MIN_INTERVAL
+                failures = 0
+                _LOGGER.warning(f"Satellite {self.name} {error}")
+                await asyncio.sleep(RECONNECT_MIN_INTERVAL)
+                continue
+
+            failures += 1
+            log = _LOGGER.warning if failures == 1 else _LOGGER.debug
+            log(
+                f"Satellite {self.name} at {self.endpoint} did not accept the client, "
+                f"check the token, retry in {interval}s: {error}"
+            )
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, RECONNECT_MAX_INTERVAL)
+
+    async def receive(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buffer = b""
+        triggers = self.triggers
+        sensors = self.sensors
+        unpack = ID_VALUE.unpack
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return
+            buffer += data
+            frames, used = split_frames(buffer)
+            buffer = buffer[used:]
+            if not frames:
+                continue
+            self.reads += 1
+            self.frames += len(frames)
+            bridge.begin()
+            try:
+                for frame_type, payload in frames:
+                    if frame_type == FRAME_GESTURE:
+                        trigger_id, code = unpack(payload)
+                        device_id, subtype = triggers[trigger_id]
+                        bridge.fire_event(
+                            EVENT_TYPE,
+                            {CONF_DEVICE_ID: device_id, CONF_TYPE: EVENTS[code], CONF_SUBTYPE: subtype},
+                        )
+                    elif frame_type == FRAME_EDGE:
+                        sensor_id, level = unpack(payload)
+                        sensors[sensor_id].onChange(level)
+                    elif frame_type == FRAME_AVAILABLE:
+                        sensor_id, available = unpack(payload)
+                        sensors[sensor_id].set_available(bool(available))
+                    elif frame_type == FRAME_HELLO:
+                        self.hello(json.loads(payload), writer)
+                    elif frame_type == FRAME_ACCEPT:
+                        self.accepted(writer)
+            finally:
+                bridge.end()
+
+    def hello(self, hello: dict, writer: asyncio.StreamWriter) -> None:
+        if hello.get("version") != PROTOCOL_VERSION:
+            raise ProtocolError(
+                f"Satellite speaks protocol {hello.get('version')}, expected {PROTOCOL_VERSION}"
+            )
+        self.node = hello.get("node")
+        auth = sign(self.token, str(hello.get("nonce", "")))
+        writer.write(encode_json(FRAME_HELLO, {"version": PROTOCOL_VERSION, "auth": auth}))
+
+    def accepted(self, writer: asyncio.StreamWriter) -> None:
+        """Send the configuration, demand changes from now on go out as they happen."""
+        self.writer = writer
+        self.connects += 1
+        writer.write(encode_json(FRAME_CONFIG, self.config()))
+        _LOGGER.info(f"Connected to satellite {self.name} ({self.node}) at {self.endpoint}")
+
+    def as_dict(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "node": self.node,
+            "connected": self.writer is not None,
+            "connects": self.connects,
+            "frames": self.frames,
+            "reads": self.reads,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweet Home satellite node")
+    parser.add_argument(
+        "--host", default=DEFAULT_HOST, help=f"address to listen on, default {DEFAULT_HOST}"
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_SATELLITE_PORT)
+    parser.add_argument("--path", default=None, help="listen on this Unix socket instead")
+    parser.add_argument("--gpio-backend", choices=["rpi_gpio", "gpiod"], default="rpi_gpio")
+    parser.add_argument("--gpio-chip", default="/dev/gpiochip0")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get(TOKEN_ENV),
+        help=f"shared token the client has to know, default ${TOKEN_ENV}",
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error(f"a token is required, pass --token or set {TOKEN_ENV}")
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if args.gpio_backend == "gpiod":
+        from .hardware import GpiodBackend
+        from .mcp23017 import set_backends
+
+        set_backends(gpio=GpiodBackend(args.gpio_chip))
+    try:
+        asyncio.run(SatelliteNode(args.token).serve(args.host, args.port, args.path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading as th
+import time
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Handle for a pending callback, cancel() is O(1)."""
+
+    __slots__ = ("when", "callback")
+
+    def __init__(self, when: float, callback: Callable[[], None]) -> None:
+        self.when = when
+        self.callback = callback
+
+    @property
+    def cancelled(self) -> bool:
+        return self.callback is None
+
+    def cancel(self) -> None:
+        # Cancelled entries stay in the heap and are dropped when they reach the top
+        self.callback = None
+
+
+class DeadlineScheduler:
+    """Single thread owning the deadlines set from the bus worker threads.
+
+    Replaces one threading.Timer (and one OS thread) per deadline with a heap
+    served by a single worker thread, started on first use.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, Deadline]] = []
+        self._counter = itertools.count()
+        self._condition = th.Condition()
+        self._thread: th.Thread | None = None
+        self._running = False
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Deadline:
+        """Run callback after delay seconds on the scheduler thread."""
+        deadline = Deadline(time.monotonic() + delay, callback)
+        with self._condition:
+            if not self._running:
+                self._start()
+            heapq.heappush(self._heap, (deadline.when, next(self._counter), deadline))
+            if self._heap[0][2] is deadline:
+                self._condition.notify()
+        return deadline
+
+    def _start(self) -> None:
+        self._running = True
+        self._thread = th.Thread(
+            target=self._run, name="sweet_home_scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker thread and drop every pending deadline."""
+        with self._condition:
+            self._running = False
+            for _, _, deadline in self._heap:
+                deadline.cancel()
+            self._heap.clear()
+            self._condition.notify()
+        if self._thread is not None and self._thread is not th.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            due = []
+            with self._condition:
+                while self._running and not due:
+                    heap = self._heap
+                    while heap and heap[0][2].cancelled:
+                        heapq.heappop(heap)
+                    if not heap:
+                        self._condition.wait()
+                        continue
+                    now = time.monotonic()
+                    if heap[0][0] > now:
+                        self._condition.wait(heap[0][0] - now)
+                        continue
+                    while heap and heap[0][0] <= now:
+                        deadline = heapq.heappop(heap)[2]
+                        if deadline.callback is not None:
+                            due.append(deadline.callback)
+                            deadline.callback = None
+                if not self._running:
+                    return
+
+            for callback in due:
+                try:
+                    callback()
+                except Exception as e:
+                    _LOGGER.error(f"Error in scheduled callback: {e}")
+
+
+class LoopScheduler:
+    """Deadlines for code that runs in the Home Assistant event loop.
+
+    Gesture timers are plain loop timers, so they fire in the same thread as
+    the gesture updates and need no locking. The loop clock is
+    time.monotonic(), like the edge timestamps.
+    """
+
+    def __init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> asyncio.TimerHandle:
+        """Run callback after delay seconds, must be called in the loop."""
+        return self.loop.call_later(delay, callback)
+
+
+scheduler = DeadlineScheduler()
+loop_scheduler = LoopScheduler()
@@ -0,0 +1,94 @@
+"""Diagnostic sensors for the Sweet Home interrupt pipeline."""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .stats import pipeline_stats
+
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the diagnostic sensors, disabled by default."""
+    async_add_entities(
+        [
+            EdgeToEventLatencySensor(0.5),
+            EdgeToEventLatencySensor(0.99),
+            InterruptRateSensor(),
+            I2CErrorsSensor(),
+        ]
+    )
+
+
+class SweetHomeDiagnosticSensor(SensorEntity):
+    """Base class for the pipeline diagnostic sensors."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+
+class EdgeToEventLatencySensor(SweetHomeDiagnosticSensor):
+    """Percentile of the GPIO edge to HA event latency."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, quantile: float) -> None:
+        self.quantile = quantile
+        percent = int(quantile * 100)
+        self._attr_unique_id = f"{DOMAIN}-latency-p{percent}"
+        self._attr_name = f"Sweet Home latency p{percent}"
+
+    async def async_update(self) -> None:
+        self._attr_native_value = pipeline_stats.edge_to_event.percentile(
+            self.quantile
+        )
+
+
+class InterruptRateSensor(SweetHomeDiagnosticSensor):
+    """Interrupts per second over the last scan interval, all chips."""
+
+    _attr_native_unit_of_measurement = "interrupts/s"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_unique_id = f"{DOMAIN}-interrupt-rate"
+    _attr_name = "Sweet Home interrupts per second"
+
+    def __init__(self) -> None:
+        self._last: tuple[float, int] | None = None
+
+    async def async_update(self) -> None:
+        from .mcp23017 import iter_chip_stats
+
+        now = time.monotonic()
+        interrupts = sum(stats.interrupts for stats in iter_chip_stats())
+        if self._last is not None and now > self._last[0]:
+            self._attr_native_value = round(
+                (interrupts - self._last[1]) / (now - self._last[0]), 2
+            )
+        self._last = (now, interrupts)
+
+
+class I2CErrorsSensor(SweetHomeDiagnosticSensor):
+    """Total failed I2C transactions in the interrupt path."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_unique_id = f"{DOMAIN}-i2c-errors"
+    _attr_name = "Sweet Home I2C errors"
+
+    async def async_update(self) -> None:
+        from .mcp23017 import iter_chip_stats
+
+        self._attr_native_value = sum(stats.i2c_errors for stats in iter_chip_stats())
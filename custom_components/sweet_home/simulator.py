@@ -0,0 +1,716 @@
+"""In-process MCP23017 simulator implementing the hardware backend interfaces.
+
+Lets the interrupt pipeline run on any Linux box: FakeI2CBackend hands out
+FakeSMBus objects whose chips are register-level MCP23017 models, FakeGPIO
+delivers their INT line edges to the registered callbacks, FakeGpioChip turns
+them into timestamped edge events for GpiodBackend.
+
+Rig wires simulated chips to the real bus workers, buttons and event bridge
+for the tests and benchmarks. SatelliteLink runs a satellite node on
+simulated chips in a child process (python -m of this module) and connects
+a SatelliteClient to it.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import errno
+import logging
+import os
+import subprocess
+import sys
+import threading as th
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, NamedTuple
+
+# Registers in IOCON.BANK = 0 layout, port B is always port A + 1
+IODIR = 0x00
+IPOL = 0x02
+GPINTEN = 0x04
+DEFVAL = 0x06
+INTCON = 0x08
+IOCON = 0x0A
+GPPU = 0x0C
+INTF = 0x0E
+INTCAP = 0x10
+GPIO = 0x12
+OLAT = 0x14
+REGISTER_COUNT = 0x16
+
+IOCON_INTPOL = 1 << 1
+IOCON_ODR = 1 << 2
+IOCON_SEQOP = 1 << 5
+IOCON_MIRROR = 1 << 6
+IOCON_BANK = 1 << 7
+
+
+class FakeGPIO:
+    """GPIO backend whose line levels are driven by simulated chips."""
+
+    def __init__(self) -> None:
+        self.levels: dict[int, int] = {}
+        self.callbacks: dict[int, Callable[[int], None]] = {}
+
+    def add_edge_callback(self, pin: int, callback: Callable[[int], None]) -> None:
+        self.callbacks[pin] = callback
+
+    def remove_edge_callback(self, pin: int) -> None:
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self) -> None:
+        self.callbacks.clear()
+
+    def set_level(self, pin: int, level: int) -> None:
+        previous = self.levels.get(pin, 0)
+        self.levels[pin] = level
+        if level and not previous:
+            callback = self.callbacks.get(pin)
+            if callback is not None:
+                callback(pin)
+
+
+class FakeEdgeEvent(NamedTuple):
+    line_offset: int
+    timestamp_ns: int
+
+
+class FakeLineRequest:
+    """Edge event source shaped like a gpiod v2 LineRequest.
+
+    Events are queued with their timestamp and signalled through a pipe, so
+    the backend's select() loop and batched reads run unchanged.
+    """
+
+    def __init__(self, offset: int) -> None:
+        self.offset = offset
+        self.events: deque[FakeEdgeEvent] = deque()
+        self._r, self._w = os.pipe()
+        self.released = False
+        self.reads = 0
+
+    @property
+    def fd(self) -> int:
+        return self._r
+
+    def push(self, timestamp_ns: int) -> None:
+        self.events.append(FakeEdgeEvent(self.offset, timestamp_ns))
+        os.write(self._w, b"\0")
+
+    def read_edge_events(self, max_events: int | None = None) -> list[FakeEdgeEvent]:
+        if self.released:
+            raise OSError(errno.EBADF, "Request released")
+        self.reads += 1
+        events = []
+        while self.events and (max_events is None or len(events) < max_events):
+            events.append(self.events.popleft())
+        os.read(self._r, max(1, len(events)))
+        return events
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            os.close(self._w)
+            os.close(self._r)
+
+
+class FakeGpioChip:
+    """GPIO character device stand-in, pass open_line to GpiodBackend.
+
+    Rising edges driven by simulated chips become timestamped edge events,
+    stamped when the level changes like the kernel does in its IRQ handler.
+    """
+
+    def __init__(self) -> None:
+        self.levels: dict[int, int] = {}
+        self.requests: dict[int, FakeLineRequest] = {}
+        # Seconds edges are backdated by, as if they had waited in the
+        # kernel's event FIFO that long before being read
+        self.age = 0.0
+
+    def open_line(self, pin: int) -> FakeLineRequest:
+        request = self.requests[pin] = FakeLineRequest(pin)
+        return request
+
+    def set_level(self, pin: int, level: int) -> None:
+        previous = self.levels.get(pin, 0)
+        self.levels[pin] = level
+        if level and not previous:
+            request = self.requests.get(pin)
+            if request is not None and not request.released:
+                request.push(time.monotonic_ns() - int(self.age * 1e9))
+
+
+class Mcp23017Simulator:
+    """Register-level model of one MCP23017.
+
+    Covers IOCON (BANK, SEQOP, MIRROR, INTPOL, ODR), IODIR/IPOL/OLAT, GPINTEN
+    with INTCON/DEFVAL compare modes, INTF/INTCAP capture and clear-on-read,
+    and the INTA line level.
+    """
+
+    def __init__(
+        self, gpio: FakeGPIO | FakeGpioChip | None = None, int_pin: int | None = None
+    ) -> None:
+        self.gpio = gpio
+        self.int_pin = int_pin
+        self.lock = th.RLock()
+        self.registers = bytearray(REGISTER_COUNT)
+        self.registers[IODIR] = self.registers[IODIR + 1] = 0xFF
+        # Level applied to the pins from outside, idle high through pull-ups
+        self.inputs = [0xFF, 0xFF]
+        # Unpowered chips do not answer on the bus, like a brown-out or a
+        # loose cable
+        self.powered = True
+        self._int_level = None
+        self._update_int_line()
+
+    def power(self, on: bool) -> None:
+        """Cut or restore power, registers come back at their reset values."""
+        with self.lock:
+            if on and not self.powered:
+                self.registers[:] = bytes(REGISTER_COUNT)
+                self.registers[IODIR] = self.registers[IODIR + 1] = 0xFF
+                self._update_int_line()
+            self.powered = on
+
+    # Pin side
+
+    def set_input(self, pin: int, level: int) -> None:
+        """Drive pin 0-15 from outside, e.g. a contact closing to GND."""
+        port, bit = pin >> 3, 1 << (pin & 7)
+        with self.lock:
+            old = self.inputs[port]
+            new = old | bit if level else old & ~bit
+            if new == old:
+                return
+            self.inputs[port] = new
+            self._check_interrupt(port, old ^ new)
+
+    def set_port(self, port: int, value: int) -> None:
+        """Drive all 8 pins of a port at once."""
+        with self.lock:
+            old = self.inputs[port]
+            if old == value:
+                return
+            self.inputs[port] = value
+            self._check_interrupt(port, old ^ value)
+
+    def port_value(self, port: int) -> int:
+        registers = self.registers
+        inputs = registers[IODIR + port]
+        value = (self.inputs[port] ^ registers[IPOL + port]) & inputs
+        return value | (registers[OLAT + port] & ~inputs & 0xFF)
+
+    # Interrupt logic
+
+    def _check_interrupt(self, port: int, changed: int) -> None:
+        registers = self.registers
+        if registers[INTF + port]:
+            # INTCAP holds the first capture until the interrupt is cleared
+            return
+        intcon = registers[INTCON + port]
+        value = self.port_value(port)
+        triggered = (
+            (intcon & (value ^ registers[DEFVAL + port]))
+            | (~intcon & changed)
+        ) & registers[GPINTEN + port] & registers[IODIR + port]
+        if triggered:
+            registers[INTF + port] = triggered & 0xFF
+            registers[INTCAP + port] = value
+            self._update_int_line()
+
+    def _clear_interrupt(self, port: int) -> None:
+        if self.registers[INTF + port]:
+            self.registers[INTF + port] = 0
+            self._update_int_line()
+            # DEFVAL compare keeps interrupting while the condition persists
+            self._check_interrupt(port, 0)
+
+    @property
+    def int_active(self) -> bool:
+        return bool(self.registers[INTF] or self.registers[INTF + 1])
+
+    def _update_int_line(self) -> None:
+        iocon = self.registers[IOCON]
+        active = bool(self.registers[INTF]) or (
+            bool(iocon & IOCON_MIRROR) and bool(self.registers[INTF + 1])
+        )
+        if iocon & IOCON_ODR:
+            level = 0 if active else 1
+        else:
+            level = int(active) if iocon & IOCON_INTPOL else int(not active)
+        if level != self._int_level:
+            self._int_level = level
+            if self.gpio is not None and self.int_pin is not None:
+                self.gpio.set_level(self.int_pin, level)
+
+    # Register side
+
+    def _canonical(self, register: int) -> int:
+        """Translate a bus register address into the BANK = 0 layout."""
+        if self.registers[IOCON] & IOCON_BANK:
+            offset, port = register & 0x0F, register >> 4
+            if offset > 0x0A or port > 1:
+                raise OSError(errno.EIO, f"Invalid register {hex(register)}")
+            return offset * 2 + port
+        if register >= REGISTER_COUNT:
+            raise OSError(errno.EIO, f"Invalid register {hex(register)}")
+        return register
+
+    def _next_address(self, register: int) -> int:
+        iocon = self.registers[IOCON]
+        if iocon & IOCON_BANK:
+            if iocon & IOCON_SEQOP:
+                return register
+            register += 1
+            if (register & 0x0F) > 0x0A:
+                register = 0x10 if register < 0x10 else 0x00
+            return register
+        if iocon & IOCON_SEQOP:
+            return register ^ 1  # toggles between the A/B pair
+        return (register + 1) % REGISTER_COUNT
+
+    def read(self, register: int) -> int:
+        with self.lock:
+            reg = self._canonical(register)
+            base, port = reg & ~1, reg & 1
+            if base == GPIO:
+                value = self.port_value(port)
+                self._clear_interrupt(port)
+                return value
+            value = self.registers[reg]
+            if base == INTCAP:
+                self._clear_interrupt(port)
+            return value
+
+    def write(self, register: int, value: int) -> None:
+        with self.lock:
+            reg = self._canonical(register)
+            base, port = reg & ~1, reg & 1
+            value &= 0xFF
+            if base == IOCON:
+                self.registers[IOCON] = self.registers[IOCON + 1] = value & 0xFE
+                self._update_int_line()
+            elif base == GPIO or base == OLAT:
+                self.registers[OLAT + port] = value
+            elif base in (INTF, INTCAP):
+                pass  # read-only
+            else:
+                self.registers[reg] = value
+                if base in (GPINTEN, INTCON, DEFVAL, IODIR, IPOL):
+                    self._check_interrupt(port, 0)
+
+    def read_block(self, register: int, length: int) -> list[int]:
+        with self.lock:
+            data = []
+            for _ in range(length):
+                data.append(self.read(register))
+                register = self._next_address(register)
+            return data
+
+    def write_block(self, register: int, values: list[int]) -> None:
+        with self.lock:
+            for value in values:
+                self.write(register, value)
+                register = self._next_address(register)
+
+
+class FakeSMBus:
+    """SMBus stand-in routing transactions to simulated chips.
+
+    transaction_time is spent on every transaction and absent_delay on every
+    transaction to an address without a chip, to model bus speed and NACK or
+    timeout costs.
+    """
+
+    def __init__(
+        self,
+        number: int,
+        chips: dict[int, Mcp23017Simulator],
+        transaction_time: float = 0.0,
+        absent_delay: float = 0.0,
+    ) -> None:
+        self.number = number
+        self.chips = chips
+        self.transaction_time = transaction_time
+        self.absent_delay = absent_delay
+        self.transactions = 0
+
+    def _chip(self, address: int) -> Mcp23017Simulator:
+        self.transactions += 1
+        if self.transaction_time:
+            time.sleep(self.transaction_time)
+        chip = self.chips.get(address)
+        if chip is None or not chip.powered:
+            if self.absent_delay:
+                time.sleep(self.absent_delay)
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        return chip
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        return self._chip(address).read(register)
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self._chip(address).write(register, value)
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> list[int]:
+        return self._chip(address).read_block(register, length)
+
+    def write_i2c_block_data(self, address: int, register: int, data: list[int]) -> None:
+        self._chip(address).write_block(register, data)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeI2CBackend:
+    """I2C backend serving FakeSMBus objects for the chips added to it."""
+
+    def __init__(
+        self,
+        gpio: FakeGPIO | FakeGpioChip | None = None,
+        transaction_time: float = 0.0,
+        absent_delay: float = 0.0,
+    ) -> None:
+        self.gpio = gpio
+        self.transaction_time = transaction_time
+        self.absent_delay = absent_delay
+        self.chips: dict[int, dict[int, Mcp23017Simulator]] = {}
+        self.buses: dict[int, FakeSMBus] = {}
+
+    def add_chip(self, bus: int, address: int, int_pin: int | None = None) -> Mcp23017Simulator:
+        chip = Mcp23017Simulator(self.gpio, int_pin)
+        self.chips.setdefault(bus, {})[address] = chip
+        return chip
+
+    def open_bus(self, number: int) -> FakeSMBus:
+        bus = self.buses.get(number)
+        if bus is None:
+            bus = self.buses[number] = FakeSMBus(
+                number,
+                self.chips.setdefault(number, {}),
+                self.transaction_time,
+                self.absent_delay,
+            )
+        return bus
+
+    def list_buses(self) -> list[int]:
+        return sorted(self.chips)
+
+    @property
+    def transactions(self) -> int:
+        return sum(bus.transactions for bus in self.buses.values())
+
+
+# Simulated chips wired to the integration pipeline, for the tests and the
+# benchmarks
+
+CHIPS_PER_BUS = 8
+FIRST_INTERRUPT_PIN = 100
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def chip_location(idx: int) -> tuple[int, int]:
+    """Bus and address of the idx-th simulated chip, eight per bus."""
+    from .mcp23017 import MCP23017_BASE_ADDRESS
+
+    return 1 + idx // CHIPS_PER_BUS, MCP23017_BASE_ADDRESS + idx % CHIPS_PER_BUS
+
+
+class FakeEventBus:
+    def __init__(self) -> None:
+        self.fired: list[tuple[float, str, dict]] = []
+        self.condition = th.Condition()
+
+    def async_fire(self, event_type, data) -> None:
+        with self.condition:
+            self.fired.append((time.perf_counter(), event_type, data))
+            self.condition.notify_all()
+
+    def wait_for(self, count: int, timeout: float = 10.0) -> bool:
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.fired) >= count, timeout)
+
+
+class FakeHass:
+    """Just enough of HomeAssistant for Button, the event bridge and SatelliteClient."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.bus = FakeEventBus()
+        self.thread = th.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def async_create_background_task(self, target, name):
+        return self.loop.create_task(target, name=name)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class Rig:
+    """Simulated chips wired to the integration pipeline, every pin a button."""
+
+    def __init__(
+        self, chip_count: int, debounce: int, presses: int = 1, gpiod: bool = False
+    ) -> None:
+        from . import mcp23017
+        from .bridge import bridge
+        from .button import Button
+        from .hardware import GpiodBackend
+
+        if gpiod:
+            self.gpio = FakeGpioChip()
+            gpio_backend = GpiodBackend(open_line=self.gpio.open_line)
+        else:
+            self.gpio = gpio_backend = FakeGPIO()
+        self.i2c = FakeI2CBackend(self.gpio)
+        self.hass = FakeHass()
+        self.chips = []
+        self.buttons: dict[str, Button] = {}
+        bus_configs: dict[int, dict[int, int]] = {}
+
+        for idx in range(chip_count):
+            bus, address = chip_location(idx)
+            interrupt_pin = FIRST_INTERRUPT_PIN + idx
+            chip = self.i2c.add_chip(bus, address, interrupt_pin)
+            bus_configs.setdefault(bus, {})[address] = interrupt_pin
+            self.chips.append(chip)
+            for pin in range(mcp23017.PINS_PER_CHIP):
+                subtype = f"{bus}-{hex(address)}-{pin}"
+                self.buttons[subtype] = Button(
+                    hass=self.hass,
+                    device_id="benchmark",
+                    subtype=subtype,
+                    address=address,
+                    pin=pin,
+                    presses=presses,
+                    bus=bus,
+                    debounce=debounce,
+                )
+
+        mcp23017.set_backends(self.i2c, gpio_backend)
+        bridge.setup(self.hass, 0)
+        mcp23017.setButtons({"benchmark": list(self.buttons.values())})
+        mcp23017.Run(
+            _LOGGER,
+            [{"bus": bus, "chips": chips} for bus, chips in bus_configs.items()],
+        )
+        wait_online(chip_count)
+
+    def close(self) -> None:
+        from . import mcp23017
+        from .bridge import bridge
+        from .scheduler import scheduler
+
+        mcp23017.close()
+        mcp23017.buses.clear()
+        scheduler.stop()
+        bridge.flush()
+        self.hass.stop()
+
+
+def wait_online(chip_count: int, timeout: float = 10.0) -> float:
+    """Wait until the bus workers report chip_count chips online."""
+    from .mcp23017 import buses
+
+    start = time.perf_counter()
+    while sum(len(bus.online) for bus in buses.values()) < chip_count:
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("Chips did not come online")
+        time.sleep(0.0005)
+    return time.perf_counter() - start
+
+
+@contextmanager
+def rig(chip_count: int, debounce: int, presses: int = 1, gpiod: bool = False):
+    r = Rig(chip_count, debounce, presses, gpiod)
+    try:
+        yield r
+    finally:
+        r.close()
+
+
+# A satellite node in a child process and a SatelliteClient talking to it.
+# The node and the client each need the module level bus and bridge state
+# of their own, hence the two processes.
+
+# Pins 0-7 of every chip are buttons, pins 8-15 binary sensors
+BUTTON_PINS = range(0, 8)
+SENSOR_PINS = range(8, 16)
+
+
+class RecordingSensor:
+    """Stands in for SweetHomeBinarySensor, records when updates arrive."""
+
+    def __init__(self, bus: int, address: int, pin: int) -> None:
+        self.bus = bus
+        self.address = address
+        self.pin = pin
+        self.debounce = 1
+        self.available = False
+        self.changes: list[tuple[float, int]] = []
+
+    def onChange(self, value: int, timestamp: float | None = None) -> None:
+        self.changes.append((time.perf_counter(), value))
+
+    def set_available(self, available: bool) -> None:
+        self.available = available
+
+
+def serve_node(endpoint: str, chip_count: int, token: str) -> None:
+    """Serve simulated chips as a satellite node, driven by commands on stdin.
+
+    endpoint is tcp:PORT, 0 picks a free port, or unix:PATH. Prints
+    "ready PORT" once listening, then for every command the perf_counter()
+    time it was carried out:
+
+        set CHIP PIN LEVEL   drive one input pin
+        burst CYCLES         press and release every pin of every chip
+    """
+    from .mcp23017 import set_backends
+    from .satellite import SatelliteNode
+
+    gpio = FakeGPIO()
+    i2c = FakeI2CBackend(gpio)
+    chips = [
+        i2c.add_chip(*chip_location(idx), FIRST_INTERRUPT_PIN + idx) for idx in range(chip_count)
+    ]
+    set_backends(i2c, gpio)
+    satellite = SatelliteNode(token)
+    stop = asyncio.Event()
+
+    def commands() -> None:
+        for line in sys.stdin:
+            command, *args = line.split()
+            if command == "set":
+                chip, pin, level = map(int, args)
+                stamp = time.perf_counter()
+                chips[chip].set_input(pin, level)
+                print(stamp, flush=True)
+            elif command == "burst":
+                start = time.perf_counter()
+                for _ in range(int(args[0])):
+                    for value in (0x00, 0xFF):
+                        for chip in chips:
+                            chip.set_port(0, value)
+                            chip.set_port(1, value)
+                        time.sleep(0.002)
+                print(start, flush=True)
+        satellite.hass.loop.call_soon_threadsafe(stop.set)
+
+    async def serve() -> None:
+        kind, _, address = endpoint.partition(":")
+        if kind == "unix":
+            await satellite.start(path=address)
+            port = 0
+        else:
+            await satellite.start(port=int(address))
+            port = satellite.server.sockets[0].getsockname()[1]
+        print(f"ready {port}", flush=True)
+        th.Thread(target=commands, daemon=True).start()
+        await stop.wait()
+        satellite.close()
+        # Let the connection handler see the close before the loop goes away
+        await asyncio.sleep(0.01)
+
+    asyncio.run(serve())
+
+
+class SatelliteLink:
+    """A serve_node() child process and a SatelliteClient connected to it."""
+
+    def __init__(self, endpoint: str, chip_count: int, token: str) -> None:
+        from .bridge import bridge
+        from .button import Button
+        from .satellite import SatelliteClient
+
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                __name__,
+                endpoint,
+                "--chips",
+                str(chip_count),
+                "--token",
+                token,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        ready, _, port = self.process.stdout.readline().partition(" ")
+        if ready != "ready":
+            self.process.kill()
+            raise RuntimeError("Satellite node did not start")
+
+        self.hass = FakeHass()
+        bridge.setup(self.hass, 0)
+        buttons = []
+        self.sensors: list[RecordingSensor] = []
+        buses: dict[int, dict[int, int]] = {}
+        for idx in range(chip_count):
+            bus, address = chip_location(idx)
+            for pin in BUTTON_PINS:
+                buttons.append(
+                    Button(self.hass, "benchmark", f"{idx}-{pin}", address, pin, 1, bus, debounce=1)
+                )
+            self.sensors.extend(RecordingSensor(bus, address, pin) for pin in SENSOR_PINS)
+            buses.setdefault(bus, {})[address] = FIRST_INTERRUPT_PIN + idx
+        kind, _, address = endpoint.partition(":")
+        self.client = SatelliteClient(
+            self.hass,
+            "benchmark",
+            [{"bus": bus, "chips": chips} for bus, chips in buses.items()],
+            buttons,
+            [],
+            self.sensors,
+            token,
+            host="127.0.0.1" if kind == "tcp" else None,
+            port=int(port) if kind == "tcp" else 0,
+            path=address if kind == "unix" else None,
+        )
+        self.hass.loop.call_soon_threadsafe(self.client.start)
+
+        start = time.perf_counter()
+        while not all(sensor.available for sensor in self.sensors):
+            if time.perf_counter() - start > 10:
+                self.close()
+                raise RuntimeError("Satellite chips did not come online")
+            time.sleep(0.001)
+
+    def command(self, line: str) -> float:
+        """Run a command in the node, returns its perf_counter() stamp."""
+        self.process.stdin.write(line + "\n")
+        self.process.stdin.flush()
+        return float(self.process.stdout.readline())
+
+    async def stop_client(self) -> None:
+        task = self.client.task
+        self.client.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.stop_client(), self.hass.loop).result()
+        self.process.stdin.close()
+        self.process.wait(timeout=10)
+        self.hass.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Satellite node on simulated chips")
+    parser.add_argument("endpoint", help="tcp:PORT or unix:PATH")
+    parser.add_argument("--chips", type=int, default=1)
+    parser.add_argument("--token", required=True)
+    args = parser.parse_args()
+    serve_node(args.endpoint, args.chips, args.token)
+
+
+if __name__ == "__main__":
+    main()
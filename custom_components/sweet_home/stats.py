@@ -0,0 +1,109 @@
+"""Always-on, preallocated counters and latency histograms for the hot path."""
+from __future__ import annotations
+
+from array import array
+
+HISTOGRAM_BUCKETS = 32  # bucket i counts samples in [2^(i-1), 2^i) microseconds
+# edge_to_read: GPIO edge -> interrupt state read back
+# gesture: gesture engine / binary sensor update, run in the event loop
+STAGES = ("edge_to_read", "i2c_read", "decode", "gesture")
+
+
+class Histogram:
+    """Log2 bucketed latency histogram over a preallocated array."""
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        self.buckets = array("Q", bytes(8 * HISTOGRAM_BUCKETS))
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        us = int(seconds * 1_000_000)
+        idx = us.bit_length() if us > 0 else 0
+        self.buckets[idx if idx < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile, in milliseconds."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return (1 << idx) / 1000
+        return (1 << (HISTOGRAM_BUCKETS - 1)) / 1000
+
+    def reset(self) -> None:
+        for idx in range(HISTOGRAM_BUCKETS):
+            self.buckets[idx] = 0
+        self.count = 0
+        self.total = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "buckets_us": {
+                f"<{1 << idx}": n for idx, n in enumerate(self.buckets) if n
+            },
+        }
+
+
+class ChipStats:
+    """Counters of one MCP23017, per stage histograms and per pin counters."""
+
+    __slots__ = (
+        "interrupts",
+        "i2c_errors",
+        "breaker_trips",
+        "missed_interrupts",
+        "reconciled_changes",
+        "output_writes",
+        "stages",
+        "pin_changes",
+    )
+
+    def __init__(self) -> None:
+        self.interrupts = 0
+        self.i2c_errors = 0
+        self.breaker_trips = 0  # taken offline after repeated failures
+        # Found by the reconciliation poll
+        self.missed_interrupts = 0
+        self.reconciled_changes = 0
+        self.output_writes = 0  # OLATA/OLATB transactions
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.pin_changes = array("Q", bytes(8 * 16))
+
+    def as_dict(self) -> dict:
+        return {
+            "interrupts": self.interrupts,
+            "i2c_errors": self.i2c_errors,
+            "breaker_trips": self.breaker_trips,
+            "missed_interrupts": self.missed_interrupts,
+            "reconciled_changes": self.reconciled_changes,
+            "output_writes": self.output_writes,
+            "stages": {stage: h.as_dict() for stage, h in self.stages.items()},
+            "pin_changes": list(self.pin_changes),
+        }
+
+
+class PipelineStats:
+    """Integration wide figures that are not tied to one chip."""
+
+    def __init__(self) -> None:
+        # GPIO edge -> event fired / state written in the HA loop
+        self.edge_to_event = Histogram()
+
+    def as_dict(self) -> dict:
+        return {"edge_to_event": self.edge_to_event.as_dict()}
+
+
+pipeline_stats = PipelineStats()
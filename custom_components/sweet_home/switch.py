@@ -0,0 +1,53 @@
+from homeassistant.components.switch import PLATFORM_SCHEMA, SwitchEntity
+from homeassistant.const import CONF_NAME
+import logging
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+_LOGGER = logging.getLogger(__name__)
+
+from . import PIN_SCHEMA, validate_address
+from .const import CONF_ADDRESS, CONF_BUS, CONF_INVERT, CONF_PIN, DEFAULT_BUS
+from .output import SweetHomeOutput
+
+PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
+    {
+        vol.Required(CONF_ADDRESS): vol.All(cv.string, validate_address),
+        vol.Required(CONF_PIN): PIN_SCHEMA,
+        vol.Optional(CONF_BUS, default=DEFAULT_BUS): cv.positive_int,
+        vol.Optional(CONF_INVERT, default=False): cv.boolean,
+        vol.Optional(CONF_NAME): cv.string,
+    }
+)
+
+
+def setup_platform(
+    hass: HomeAssistant,
+    config: dict,
+    add_entities: AddEntitiesCallback,
+    discovery_info: dict | None = None,
+) -> None:
+    """Set up a relay on an output pin (legacy YAML support)."""
+    try:
+        add_entities(
+            [
+                SweetHomeSwitch(
+                    int(config[CONF_ADDRESS], 16),
+                    int(config[CONF_PIN]),
+                    int(config.get(CONF_BUS, DEFAULT_BUS)),
+                    bool(config.get(CONF_INVERT, False)),
+                    config.get(CONF_NAME),
+                )
+            ]
+        )
+    except (ValueError, KeyError) as err:
+        _LOGGER.error("Error setting up switch: %s", err)
+
+
+class SweetHomeSwitch(SweetHomeOutput, SwitchEntity):
+    """Relay or other on/off load on an MCP23017 output pin."""
+
+    def __init__(self, address, pin, bus=DEFAULT_BUS, invert=False, name=None) -> None:
+        super().__init__("switch", address, pin, bus, invert, name)
@@ -0,0 +1,149 @@
+"""Satellite node and client on one machine.
+
+Runs a node on simulated chips in a child process and connects
+SatelliteClients to it over localhost TCP and a Unix socket. Only a client
+with the node's token is served, others do not take its place.
+
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from custom_components.sweet_home.button import Button
+from custom_components.sweet_home.const import CONF_TYPE, EVENT_SINGLE_PRESS
+from custom_components.sweet_home.satellite import (
+    FRAME_ACCEPT,
+    FRAME_CONFIG,
+    FRAME_HELLO,
+    PROTOCOL_VERSION,
+    SatelliteClient,
+    encode_json,
+    sign,
+    split_frames,
+)
+from custom_components.sweet_home.simulator import (
+    RecordingSensor,
+    SatelliteLink,
+    chip_location,
+)
+
+PIN = 0
+TOKEN = "test"
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def link(request, tmp_path):
+    if request.param == "tcp":
+        endpoint = "tcp:0"
+    else:
+        endpoint = f"unix:{os.path.join(tmp_path, 'node.sock')}"
+    link = SatelliteLink(endpoint, 1, TOKEN)
+    yield link
+    link.close()
+
+
+def connect(link: SatelliteLink) -> socket.socket:
+    client = link.client
+    if client.path is not None:
+        sock = socket.socket(socket.AF_UNIX)
+        sock.connect(client.path)
+    else:
+        sock = socket.create_connection((client.host, client.port))
+    sock.settimeout(2)
+    return sock
+
+
+async def stop(client: SatelliteClient) -> None:
+    task = client.task
+    client.stop()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def press(link: SatelliteLink) -> bool:
+    """Press and release the button, True once the client fired the event."""
+    fired = len(link.hass.bus.fired)
+    link.command(f"set 0 {PIN} 0")
+    time.sleep(0.02)
+    link.command(f"set 0 {PIN} 1")
+    if not link.hass.bus.wait_for(fired + 1):
+        return False
+    return link.hass.bus.fired[fired][2][CONF_TYPE] == EVENT_SINGLE_PRESS
+
+
+def test_client_with_token_gets_gestures(link):
+    assert link.client.as_dict()["connected"]
+    assert press(link)
+
+
+def test_wrong_token_is_refused_and_keeps_client(link):
+    bus, address = chip_location(0)
+    sensor = RecordingSensor(bus, address, 8)
+    intruder = SatelliteClient(
+        link.hass,
+        "intruder",
+        [{"bus": bus, "chips": {address: 17}}],
+        [Button(link.hass, "intruder", "0", address, PIN, 1, bus, debounce=1)],
+        [],
+        [sensor],
+        "wrong",
+        host=link.client.host,
+        port=link.client.port,
+        path=link.client.path,
+    )
+    link.hass.loop.call_soon_threadsafe(intruder.start)
+    time.sleep(0.5)
+    try:
+        assert intruder.connects == 0
+        assert not sensor.available
+        assert link.client.as_dict()["connected"]
+        assert press(link)
+    finally:
+        asyncio.run_coroutine_threadsafe(stop(intruder), link.hass.loop).result()
+
+
+def test_config_before_hello_closes_connection(link):
+    with connect(link) as sock:
+        frames, _ = split_frames(sock.recv(65536))
+        assert frames[0][0] == FRAME_HELLO
+        assert json.loads(frames[0][1])["version"] == PROTOCOL_VERSION
+        sock.sendall(encode_json(FRAME_CONFIG, link.client.config()))
+        assert sock.recv(65536) == b""
+    assert link.client.as_dict()["connected"]
+    assert press(link)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"buttons": [], "chords": 5, "sensors": [], "event_window": 0, "buses": []},
+        {"buttons": [[0, 1, 32, 99, 1, 1, 300, 0]], "chords": [], "sensors": [], "event_window": 0, "buses": []},
+    ],
+)
+def test_malformed_config_leaves_node_serving(link, config):
+    connects = link.client.connects
+    with connect(link) as sock:
+        frames, _ = split_frames(sock.recv(65536))
+        nonce = json.loads(frames[0][1])["nonce"]
+        sock.sendall(
+            encode_json(FRAME_HELLO, {"version": PROTOCOL_VERSION, "auth": sign(TOKEN, nonce)})
+            + encode_json(FRAME_CONFIG, config)
+        )
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+        # Accepted, then dropped for the malformed configuration
+        assert split_frames(data)[0] == [(FRAME_ACCEPT, b"")]
+
+    # The dropped client reconnects and is served the unchanged configuration
+    deadline = time.perf_counter() + 5
+    while link.client.connects == connects or not all(s.available for s in link.sensors):
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+    assert press(link)
@@ -0,0 +1,63 @@
+"""Gesture decisions follow the kernel edge timestamps, not delivery time.
+
+Runs the simulator through GpiodBackend with edges backdated as if they had
+sat in the kernel's event FIFO, and checks the gestures are decided on the
+edge times.
+
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from custom_components.sweet_home.const import CONF_TYPE, EVENT_LONG_PRESS, EVENT_SINGLE_PRESS
+from custom_components.sweet_home.gesture import LONG_PRESS_THRESHOLD, NEXT_PRESS_THRESHOLD
+from custom_components.sweet_home.simulator import rig
+
+PIN = 3
+
+
+def fired_types(r, start: int) -> list[str]:
+    return [data[CONF_TYPE] for _, _, data in r.hass.bus.fired[start:]]
+
+
+@pytest.fixture
+def gpiod_rig():
+    with rig(1, debounce=1, presses=2, gpiod=True) as r:
+        yield r
+
+
+def test_old_press_edge_fires_long_press_at_once(gpiod_rig):
+    r = gpiod_rig
+    chip = r.chips[0]
+
+    # Pressed well past the long press threshold ago by its timestamp
+    r.gpio.age = 2 * LONG_PRESS_THRESHOLD / 1000
+    delivered = time.perf_counter()
+    chip.set_input(PIN, 0)
+    assert r.hass.bus.wait_for(1, timeout=LONG_PRESS_THRESHOLD / 2000)
+    assert r.hass.bus.fired[0][0] - delivered < LONG_PRESS_THRESHOLD / 2000
+
+    r.gpio.age = 0.0
+    chip.set_input(PIN, 1)
+    time.sleep(2 * NEXT_PRESS_THRESHOLD / 1000)
+    assert fired_types(r, 0) == [EVENT_LONG_PRESS]
+
+
+def test_old_release_edge_ends_multi_press_wait(gpiod_rig):
+    r = gpiod_rig
+    chip = r.chips[0]
+
+    chip.set_input(PIN, 0)
+    time.sleep(0.5)
+    # Released 50 ms after the press by its timestamp, so the wait for a
+    # second press ran out long before the edge was read
+    r.gpio.age = 0.45
+    delivered = time.perf_counter()
+    chip.set_input(PIN, 1)
+    assert r.hass.bus.wait_for(1, timeout=NEXT_PRESS_THRESHOLD / 2000)
+    assert r.hass.bus.fired[0][0] - delivered < NEXT_PRESS_THRESHOLD / 2000
+    assert fired_types(r, 0) == [EVENT_SINGLE_PRESS]
+